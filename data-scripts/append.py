@@ -0,0 +1,145 @@
+import os
+import sys
+import glob
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Existing-dataset state for --append-days: last ids, last screening day and seats per theater.
+
+APPEND_TABLES = ["screenings", "bookings", "tickets", "payments"]
+REFERENCE_TABLES = ["movies", "theaters", "customers", "staff", "seats"]
+TAIL_BLOCK = 4096
+EXTENSIONS = [".csv", ".csv.gz", ".csv.zst", ".parquet"]  # every --output file format
+
+def delta_dir(out_dir, first_day):
+    return os.path.join(out_dir, f"append-{first_day:%Y%m%d}")
+
+def _dataset_dirs(out_dir):
+    return [out_dir] + sorted(glob.glob(os.path.join(out_dir, "append-*")))
+
+def _table_files(directory, table):
+    paths = [os.path.join(directory, table + extension) for extension in EXTENSIONS]
+    return [path for path in paths if os.path.exists(path)] or \
+        sorted(glob.glob(os.path.join(directory, f"{table}.part-*.csv")))
+
+def _read_columns(path, columns):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)  # compression follows the extension
+
+def last_line(path):
+    """Last non-empty line of a file, read backwards from the end"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0:
+            step = min(TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+            if data.strip().count(b"\n") >= 1:
+                break
+    lines = data.strip().splitlines()
+    return lines[-1].decode() if lines else ""
+
+def last_id_from_tail(files):
+    """Highest id in a table's files, 0 when they only hold a header; plain CSVs are read from their last line"""
+    last_id = 0
+    for path in files:
+        if not path.endswith(".csv"):
+            last_id = max(last_id, last_id_from_column([path]))
+            continue
+        try:
+            last_id = max(last_id, int(last_line(path).split(",", 1)[0]))
+        except ValueError:
+            pass  # header only
+    return last_id
+
+def last_id_from_column(files):
+    return max([int(_read_columns(path, ["id"])["id"].max() or 0) for path in files] or [0])
+
+def seats_per_theater(seat_ids, theater_ids, theater_count):
+    """Seats per theater when the seat ids run theater by theater, the same count in each, else None"""
+    seat_ids, theater_ids = np.asarray(seat_ids), np.asarray(theater_ids)
+    if not theater_count or not len(seat_ids) or len(seat_ids) % theater_count:
+        return None
+    count = len(seat_ids) // theater_count
+    if len(np.unique(seat_ids)) != len(seat_ids) or theater_ids.min() < 1 or theater_ids.max() > theater_count:
+        return None
+    return count if ((seat_ids - 1) // count + 1 == theater_ids).all() else None
+
+def state_from_csv(out_dir):
+    """Last ids and last screening day of the CSV dataset in out_dir"""
+    files = {table: [] for table in APPEND_TABLES + REFERENCE_TABLES}
+    for directory in _dataset_dirs(out_dir):
+        for table in files:
+            files[table] += _table_files(directory, table)
+    missing = [table for table, paths in files.items() if not paths]
+    if missing:
+        print(f"❌ No existing {', '.join(missing)} files found in {out_dir}")
+        print("💡 Generate the base dataset first (--output csv, csv.gz, csv.zst or parquet), "
+              "or use --append-from database")
+        sys.exit(1)
+
+    last_ids = {table: last_id_from_tail(files[table]) for table in APPEND_TABLES}
+    last_ids.update({table: last_id_from_column(files[table]) for table in REFERENCE_TABLES})
+    seats = pd.concat([_read_columns(path, ["id", "theater_id"]) for path in files["seats"]])
+    # Screening dates are not ordered by id, only this column needs a full scan
+    last_screening_date = None
+    for path in files["screenings"]:
+        if path.endswith(".parquet"):
+            chunks = [pd.read_parquet(path, columns=["screening_date"])]
+        else:
+            chunks = pd.read_csv(path, usecols=["screening_date"], chunksize=1_000_000)
+        for chunk in chunks:
+            if len(chunk):
+                latest = pd.to_datetime(chunk["screening_date"]).max().date()
+                last_screening_date = max(last_screening_date or latest, latest)
+    return {"last_ids": last_ids, "last_screening_date": last_screening_date,
+            "seats_per_theater": seats_per_theater(seats["id"], seats["theater_id"], last_ids["theaters"])}
+
+def state_from_database(database_url):
+    """Last ids (MAX(id)) and last screening day of the loaded database"""
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ psycopg2 is required for --append-from database")
+        print("💡 pip install psycopg2-binary")
+        sys.exit(1)
+    if not database_url:
+        print("❌ DATABASE_URL not found!")
+        print("💡 Pass --database-url or set DATABASE_URL in your .env file")
+        sys.exit(1)
+    with psycopg2.connect(database_url) as conn, conn.cursor() as cursor:
+        last_ids = {}
+        for table in APPEND_TABLES + REFERENCE_TABLES:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+            last_ids[table] = cursor.fetchone()[0]
+        cursor.execute("SELECT MAX(screening_date) FROM screenings")
+        last_screening_date = cursor.fetchone()[0]
+        cursor.execute("SELECT id, theater_id FROM seats")
+        seats = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    conn.close()
+    return {"last_ids": last_ids, "last_screening_date": last_screening_date,
+            "seats_per_theater": seats_per_theater(seats[:, 0], seats[:, 1], last_ids["theaters"])}
+
+def check_references(state):
+    """Appended rows point at existing movies/theaters/customers/staff/seats, those must exist"""
+    empty = [table for table in REFERENCE_TABLES if state["last_ids"][table] == 0]
+    if empty:
+        print(f"❌ The existing dataset has no {', '.join(empty)}")
+        print("💡 Generate or load the base dataset before appending")
+        sys.exit(1)
+    if state["seats_per_theater"] is None:
+        print("❌ The existing seats don't run theater by theater with the same count in each theater, "
+              "so appended tickets can't be seated")
+        print("💡 Append to a dataset generated by csv_convert.py, or regenerate it")
+        sys.exit(1)
+
+def first_append_day(state, today):
+    """The day after the last existing screening (today for a dataset without screenings)"""
+    last = state["last_screening_date"]
+    return today if last is None else last + timedelta(days=1)
@@ -0,0 +1,83 @@
+import os
+import json
+import sys
+
+# Checkpoints for resumable loads: the chunk plan in load_manifest.jsonl, finished chunks in
+# load_checkpoints, written in the same transaction as each COPY.
+
+MANIFEST_FILE = "load_manifest.jsonl"
+CHECKPOINT_TABLE = "load_checkpoints"
+
+INSERT_CHECKPOINT = f"INSERT INTO {CHECKPOINT_TABLE} (chunk, rows) VALUES (%s, %s)"
+SELECT_CHECKPOINT = f"SELECT rows FROM {CHECKPOINT_TABLE} WHERE chunk = %s"
+
+def create_table(unlogged=False):
+    # UNLOGGED when the data is, so a server crash empties both
+    return f"""
+        CREATE {'UNLOGGED ' if unlogged else ''}TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            chunk     text PRIMARY KEY,
+            rows      bigint NOT NULL,
+            loaded_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+def chunk_key(path, start, end):
+    # Absolute, so checkpoints left by an interrupted load of another dataset never match
+    return f"{os.path.abspath(path)}:{start}-{end}"
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+class Manifest:
+    """Chunk plan and completed chunks of one dataset directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_FILE)
+        self.completed = {}  # chunk key -> rows, filled from the database
+
+    def open(self, database, build_plans):
+        """Resume the saved plan, or build a new one with build_plans() and save it"""
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                header = json.loads(f.readline())
+            if header["database"] != database:
+                print(f"❌ {self.path} belongs to a load into {header['database']}, not {database}")
+                print("💡 Use --restart to load from scratch")
+                sys.exit(1)
+            changed = [name for name, fingerprint in header["files"].items()
+                       if not os.path.exists(os.path.join(self.directory, name))
+                       or _fingerprint(os.path.join(self.directory, name)) != fingerprint]
+            if changed:
+                print(f"❌ {', '.join(changed)} changed since the interrupted load")
+                print("💡 Use --restart to load from scratch")
+                sys.exit(1)
+            plans = {table: [(columns, os.path.join(self.directory, name), start, end)
+                             for columns, name, start, end in chunks]
+                     for table, chunks in header["plans"].items()}
+            return plans
+
+        plans = build_plans()
+        files = {os.path.basename(path) for chunks in plans.values() for _, path, _, _ in chunks}
+        header = {
+            "database": database,
+            "files": {name: _fingerprint(os.path.join(self.directory, name)) for name in sorted(files)},
+            "plans": {table: [(columns, os.path.basename(path), start, end) for columns, path, start, end in chunks]
+                      for table, chunks in plans.items()},
+        }
+        with open(self.path, 'w') as f:
+            f.write(json.dumps(header) + "\n")
+        return plans
+
+    def record(self, key, rows):
+        """Append a committed chunk, flushed to disk before the next one is recorded"""
+        self.completed[key] = rows
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({"chunk": key, "rows": rows}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
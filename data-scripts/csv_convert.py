@@ -1,18 +1,32 @@
 from faker import Faker
 import pandas as pd
+import numpy as np
+import os
 import random
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime, timedelta, time
+from itertools import islice
+import vector_engine
+import sharding
+import append
+import profiles
+import estimate
+from sinks import CsvSink, ParquetSink, PostgresCopySink
+from dotenv import load_dotenv
 
-# change the values file to the one you want to use
-
-# from values_medium import *
-# from values_large import *
+# Default dataset size; pick another one with --profile/--scale instead of editing this import
 from values_large import *
 
+# Load environment variables (DATABASE_URL for --output postgres)
+load_dotenv()
+
 fake = Faker()
 Faker.seed(42)
 random.seed(42)
 
+# Rows buffered in memory per table before they are flushed to disk
+DEFAULT_CHUNK_SIZE = 100_000
+
 def getDirPath(value_type):
     return f"csv_{value_type}"
 
@@ -22,209 +36,519 @@ def get_timestamps():
     updated = fake.date_time_between(start_date=created, end_date='now')
     return created, updated
 
-print("🎬 Starting data generation...")
+# Group a row generator into DataFrames of at most chunk_size rows
+def row_frames(rows, chunk_size, dtypes=None):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        df = pd.DataFrame(chunk)
+        yield df.astype(dtypes) if dtypes else df
 
 # 1. Cinemas
-print("\n📍 Generating cinemas...")
-cinemas = []
-for i in range(CINEMAS):
-    created, updated = get_timestamps()
-    cinemas.append({
-        "id": i + 1,
-        "name": f"Cinema {i + 1}",
-        "address": fake.address(),
-        "city": fake.city(),
-        "state": fake.state(),
-        "country": fake.country(),
-        "phone": fake.phone_number()[:20],
-        "email": fake.company_email() + str(i), # to remove possible duplicates
-        "is_active": True,
-        "created_at": created,
-        "updated_at": updated
-    })
-pd.DataFrame(cinemas).to_csv(getDirPath(VALUE_TYPE) + "/cinemas.csv", index=False)
-print("✅ Cinemas generated")
+def cinema_rows():
+    for i in range(CINEMAS):
+        created, updated = get_timestamps()
+        yield {
+            "id": i + 1,
+            "name": f"Cinema {i + 1}",
+            "address": fake.address(),
+            "city": fake.city(),
+            "state": fake.state(),
+            "country": fake.country(),
+            "phone": fake.phone_number()[:20],
+            "email": fake.company_email() + str(i), # to remove possible duplicates
+            "is_active": True,
+            "created_at": created,
+            "updated_at": updated
+        }
 
 # 2. Movies
-print("\n🎥 Generating movies...")
-movies = []
-for i in range(MOVIES):
-    created, updated = get_timestamps()
-    movies.append({
-        "id": i + 1,
-        "title": fake.catch_phrase(),
-        "description": fake.text(max_nb_chars=200),
-        "duration": random.randint(80, 180),
-        "genre": random.choice(['Action', 'Comedy', 'Drama', 'Horror', 'Sci-Fi']),
-        "rating": random.choice(['G', 'PG', 'PG-13', 'R']),
-        "poster_url": f"https://example.com/posters/movie_{i+1}.jpg",
-        "release_date": fake.date_between(start_date='-1y', end_date='+6m'),
-        "created_at": created,
-        "updated_at": updated
-    })
-pd.DataFrame(movies).to_csv(getDirPath(VALUE_TYPE) + "/movies.csv", index=False)
-print("✅ Movies generated")
-
-# 3. Theaters
-print("\n🏛️ Generating theaters...")
-theaters = []
-for cinema in cinemas:
-    for i in range(FIXED_THEATERS_PER_CINEMA):
+def movie_rows():
+    for i in range(MOVIES):
         created, updated = get_timestamps()
-        theaters.append({
-            "id": len(theaters) + 1,
-            "name": f"Theater {i + 1}",
-            "cinema_id": cinema["id"],
+        yield {
+            "id": i + 1,
+            "title": fake.catch_phrase(),
+            "description": fake.text(max_nb_chars=200),
+            "duration": random.randint(80, 180),
+            "genre": random.choice(['Action', 'Comedy', 'Drama', 'Horror', 'Sci-Fi']),
+            "rating": random.choice(['G', 'PG', 'PG-13', 'R']),
+            "poster_url": f"https://example.com/posters/movie_{i+1}.jpg",
+            "release_date": fake.date_between(start_date='-1y', end_date='+6m'),
             "created_at": created,
             "updated_at": updated
-        })
-pd.DataFrame(theaters).to_csv(getDirPath(VALUE_TYPE) + "/theaters.csv", index=False)
-print("✅ Theaters generated")
+        }
 
-# 4. Seats
-print("\n💺 Generating seats...")
-seat_id = 1
-seats = []
-for theater in theaters:
-    for row in range(10):  # 10 rows
-        for seat_num in range(10):  # 10 seats per row
+# 3. Theaters
+def theater_rows(cinema_count):
+    theater_id = 0
+    for cinema_id in range(1, cinema_count + 1):
+        for i in range(FIXED_THEATERS_PER_CINEMA):
             created, updated = get_timestamps()
-            seats.append({
-                "id": seat_id,
-                "theater_id": theater["id"],
-                "row_number": chr(65 + row),  # A, B, C, etc.
-                "seat_number": seat_num + 1,
-                "seat_type": random.choice(['regular', 'premium', 'vip']),
+            theater_id += 1
+            yield {
+                "id": theater_id,
+                "name": f"Theater {i + 1}",
+                "cinema_id": cinema_id,
                 "created_at": created,
                 "updated_at": updated
-            })
-            seat_id += 1
-            if seat_id % 1000 == 0:
-                print(f"Generated {seat_id} seats...")
-pd.DataFrame(seats).to_csv(getDirPath(VALUE_TYPE) + "/seats.csv", index=False)
-print("✅ Seats generated")
+            }
 
-# 5. Customers
-print("\n👥 Generating customers...")
-customers = []
-for i in range(CUSTOMERS):
-    created, updated = get_timestamps()
-    customers.append({
-        "id": i + 1,
-        "name": fake.name(),
-        "email": fake.email() + str(i), # to remove possible duplicates
-        "phone": fake.phone_number()[:20],
-        "password": fake.sha256(),  # Hashed password
-        "date_of_birth": fake.date_of_birth(minimum_age=18, maximum_age=80),
-        "created_at": created,
-        "updated_at": updated
-    })
-    if (i + 1) % 50000 == 0:
-        print(f"Generated {i + 1} customers...")
-pd.DataFrame(customers).to_csv(getDirPath(VALUE_TYPE) + "/customers.csv", index=False)
-print("✅ Customers generated")
+# 4. Seats
+def seat_rows(theater_count):
+    seat_id = 1
+    for theater_id in range(1, theater_count + 1):
+        for row in range(10):  # 10 rows
+            for seat_num in range(10):  # 10 seats per row
+                created, updated = get_timestamps()
+                yield {
+                    "id": seat_id,
+                    "theater_id": theater_id,
+                    "row_number": chr(65 + row),  # A, B, C, etc.
+                    "seat_number": seat_num + 1,
+                    "seat_type": random.choice(['regular', 'premium', 'vip']),
+                    "created_at": created,
+                    "updated_at": updated
+                }
+                seat_id += 1
+                if seat_id % 1000 == 0:
+                    print(f"Generated {seat_id} seats...")
 
-# 6. Staff
-print("\n👨‍💼 Generating staff...")
-staff = []
-for cinema in cinemas:
-    for i in range(FIXED_STAFF_PER_CINEMA):
+# 5. Customers
+def customer_rows():
+    for i in range(CUSTOMERS):
         created, updated = get_timestamps()
-        hired_date = fake.date_between(start_date='-2y', end_date='today')
-        staff.append({
-            "id": len(staff) + 1,
+        yield {
+            "id": i + 1,
             "name": fake.name(),
             "email": fake.email() + str(i), # to remove possible duplicates
-            "password": fake.sha256(),
-            "role": random.choice(['cashier', 'admin', 'manager']),
             "phone": fake.phone_number()[:20],
-            "hired_date": hired_date,
-            "is_active": True,
+            "password": fake.sha256(),  # Hashed password
+            "date_of_birth": fake.date_of_birth(minimum_age=18, maximum_age=80),
             "created_at": created,
             "updated_at": updated
-        })
-pd.DataFrame(staff).to_csv(getDirPath(VALUE_TYPE) + "/staff.csv", index=False)
-print("✅ Staff generated")
+        }
+        if (i + 1) % 50000 == 0:
+            print(f"Generated {i + 1} customers...")
+
+# 6. Staff
+def staff_rows(cinema_count):
+    staff_id = 0
+    for _ in range(cinema_count):
+        for i in range(FIXED_STAFF_PER_CINEMA):
+            created, updated = get_timestamps()
+            hired_date = fake.date_between(start_date='-2y', end_date='today')
+            staff_id += 1
+            yield {
+                "id": staff_id,
+                "name": fake.name(),
+                "email": fake.email() + str(i), # to remove possible duplicates
+                "password": fake.sha256(),
+                "role": random.choice(['cashier', 'admin', 'manager']),
+                "phone": fake.phone_number()[:20],
+                "hired_date": hired_date,
+                "is_active": True,
+                "created_at": created,
+                "updated_at": updated
+            }
 
 # 7. Screenings
-print("\n🎦 Generating screenings...")
-screenings = []
-base_date = datetime.now().date()
-for i in range(SCREENINGS):
-    created, updated = get_timestamps()
-    screening_date = base_date + timedelta(days=random.randint(0, 30))
-    screening_time = f"{random.randint(10, 22):02d}:00:00"
-    screenings.append({
-        "id": i + 1,
-        "movie_id": random.randint(1, MOVIES),
-        "theater_id": random.randint(1, len(theaters)),
-        "screening_date": screening_date,
-        "screening_time": screening_time,
-        "price": random.choice([10.00, 12.50, 15.00, 20.00]),
-        "created_at": created,
-        "updated_at": updated
-    })
-    if (i + 1) % 100000 == 0:
-        print(f"Generated {i + 1} screenings...")
-pd.DataFrame(screenings).to_csv(getDirPath(VALUE_TYPE) + "/screenings.csv", index=False)
-print("✅ Screenings generated")
+def screening_rows(theater_count):
+    base_date = datetime.now().date()
+    for i in range(SCREENINGS):
+        created, updated = get_timestamps()
+        screening_date = base_date + timedelta(days=random.randint(0, 30))
+        screening_time = f"{random.randint(10, 22):02d}:00:00"
+        yield {
+            "id": i + 1,
+            "movie_id": random.randint(1, MOVIES),
+            "theater_id": random.randint(1, theater_count),
+            "screening_date": screening_date,
+            "screening_time": screening_time,
+            "price": random.choice([10.00, 12.50, 15.00, 20.00]),
+            "created_at": created,
+            "updated_at": updated
+        }
+        if (i + 1) % 100000 == 0:
+            print(f"Generated {i + 1} screenings...")
 
 # 8. Bookings
-print("\n📝 Generating bookings...")
-bookings = []
-for i in range(BOOKINGS):
-    created, updated = get_timestamps()
-    bookings.append({
-        "id": i + 1,
-        "customer_id": random.randint(1, CUSTOMERS),
-        "screening_id": random.randint(1, SCREENINGS),
-        "status": 'confirmed',
-        "created_by_staff_id": random.randint(1, len(staff)) if random.random() < 0.3 else None,
-        "created_at": created,
-        "updated_at": updated
-    })
-    if (i + 1) % 100000 == 0:
-        print(f"Generated {i + 1} bookings...")
-# Convert to DataFrame with explicit Int64 type for created_by_staff_id
-df_bookings = pd.DataFrame(bookings)
-df_bookings['created_by_staff_id'] = df_bookings['created_by_staff_id'].astype('Int64')
-df_bookings.to_csv(getDirPath(VALUE_TYPE) + "/bookings.csv", index=False)
-print("✅ Bookings generated")
+def booking_rows(staff_count):
+    for i in range(BOOKINGS):
+        created, updated = get_timestamps()
+        yield {
+            "id": i + 1,
+            "customer_id": random.randint(1, CUSTOMERS),
+            "screening_id": random.randint(1, SCREENINGS),
+            "status": 'confirmed',
+            "created_by_staff_id": random.randint(1, staff_count) if random.random() < 0.3 else None,
+            "created_at": created,
+            "updated_at": updated
+        }
+        if (i + 1) % 100000 == 0:
+            print(f"Generated {i + 1} bookings...")
 
 # 9. Tickets
-print("\n🎟️ Generating tickets...")
-tickets = []
-for i in range(TICKETS):
-    created = fake.date_time_between(start_date='-1y', end_date='now')
-    booking_id = random.randint(1, BOOKINGS)
-    tickets.append({
-        "id": i + 1,
-        "booking_id": booking_id,
-        "seat_id": random.randint(1, len(seats)),
-        "created_at": created
-    })
-    if (i + 1) % 1_000_000 == 0:
-        print(f"Generated {i + 1} tickets...")
-pd.DataFrame(tickets).to_csv(getDirPath(VALUE_TYPE) + "/tickets.csv", index=False)
-print("✅ Tickets generated")
+def ticket_rows(seat_count):
+    for i in range(TICKETS):
+        created = fake.date_time_between(start_date='-1y', end_date='now')
+        booking_id = random.randint(1, BOOKINGS)
+        yield {
+            "id": i + 1,
+            "booking_id": booking_id,
+            "seat_id": random.randint(1, seat_count),
+            "created_at": created
+        }
+        if (i + 1) % 1_000_000 == 0:
+            print(f"Generated {i + 1} tickets...")
 
 # 10. Payments
-print("\n💳 Generating payments...")
-payments = []
-for i in range(PAYMENTS):
-    created, updated = get_timestamps()
-    payments.append({
-        "id": i + 1,
-        "booking_id": i + 1,
-        "amount": random.choice([20.00, 25.00, 30.00, 40.00]),  # Based on ticket prices
-        "method": random.choice(['cash', 'card', 'digital_wallet', 'bank_transfer']),
-        "status": 'completed',
-        "created_at": created,
-        "updated_at": updated
-    })
-    if (i + 1) % 1_000_000 == 0:
-        print(f"Generated {i + 1} payments...")
-pd.DataFrame(payments).to_csv(getDirPath(VALUE_TYPE) + "/payments.csv", index=False)
-print("✅ Payments generated")
-
-print("\n🎉 All CSVs generated successfully!")
\ No newline at end of file
+def payment_rows():
+    for i in range(PAYMENTS):
+        created, updated = get_timestamps()
+        yield {
+            "id": i + 1,
+            "booking_id": i + 1,
+            "amount": random.choice([20.00, 25.00, 30.00, 40.00]),  # Based on ticket prices
+            "method": random.choice(['cash', 'card', 'digital_wallet', 'bank_transfer']),
+            "status": 'completed',
+            "created_at": created,
+            "updated_at": updated
+        }
+        if (i + 1) % 1_000_000 == 0:
+            print(f"Generated {i + 1} payments...")
+
+def write_vector_table(sink, table, total, args, **params):
+    """Generate a vectorized table sequentially, with a process pool, or as part-files"""
+    if args.part_files:
+        return sharding.write_part_files(table, total, args.chunk_size, args.workers, args.out_dir, **params)
+    if args.workers > 1:
+        frames = sharding.shard_frames(table, total, args.chunk_size, args.workers, **params)
+    else:
+        frames = vector_engine.table_frames(table, total, args.chunk_size, **params)
+    return sink.write(table, frames)
+
+def make_sink(args):
+    if args.output == 'postgres':
+        return PostgresCopySink(args.database_url)
+    if args.output == 'parquet':
+        # One row group per generated chunk
+        return ParquetSink(args.out_dir, row_group_size=args.chunk_size)
+    compression = {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}[args.output]
+    return CsvSink(args.out_dir, compression)
+
+def apply_profile(name, scale):
+    """Replace the imported values with those of values_<name>.py at the given scale"""
+    globals().update(profiles.load_profile(name, scale))
+
+def sample_frame(rows, count, dtypes=None):
+    df = pd.DataFrame(list(islice(rows, count)))
+    return df.astype(dtypes) if dtypes else df
+
+def dry_run(args):
+    """Print estimated rows, CSV size, peak RAM and time per table without generating anything"""
+    now = datetime.now()
+    vectorized = args.engine == 'numpy'
+    theaters = CINEMAS * FIXED_THEATERS_PER_CINEMA
+    staff = CINEMAS * FIXED_STAFF_PER_CINEMA
+    seats_per_theater = FIXED_SEATS_PER_THEATER if vectorized else 100
+    seats = theaters * seats_per_theater
+    n = lambda rows: max(1, min(rows, estimate.SAMPLE_ROWS))
+    build = lambda table, rows, **params: lambda: vector_engine.build_chunk(table, 0, 1, n(rows), {"now": now, **params})
+    queued = 4 if args.output == 'postgres' else 0  # chunks waiting for COPY
+    sharded = args.workers > 1 or args.part_files
+
+    print(f"📊 Dry run: {VALUE_TYPE} profile ({OCCUPANCY_RATE:.0f}% occupancy), {args.engine} engine, "
+          f"{args.workers} worker(s), {args.output} output, chunks of {args.chunk_size:,} rows")
+    # (table, rows, sample builder, sharded over the workers, whole-table arrays in bytes)
+    if vectorized:
+        sample_bookings = n(BOOKINGS)
+        sample_screenings = max(1, SCREENINGS * sample_bookings // BOOKINGS)
+        def tickets_sample():
+            keys = vector_engine.screening_keys(sample_screenings, sample_bookings, MOVIES, theaters,
+                                                first_day=now.date(), skew=args.skew)
+            return next(vector_engine.ticket_frames(
+                sample_bookings, sample_bookings, now, CUSTOMERS, sample_screenings, staff, *keys,
+                FIXED_SEATS_PER_THEATER, TICKETS / BOOKINGS, np.zeros(sample_bookings + 1, dtype=np.int64),
+                skew=args.skew))
+        payment_cents = (BOOKINGS + 1) * 8
+        # Zipf rank tables: a cumulative probability and an id per customer
+        customer_ranks = CUSTOMERS * 16 if args.skew["customers"] else 0
+        # Seat bitsets, screening theater/price keys and the payment amounts live for the whole ticket pass
+        ticket_arrays = ((SCREENINGS + 1) * ((FIXED_SEATS_PER_THEATER + 63) // 64) * 8
+                         + (SCREENINGS + 1) * 8 + payment_cents + customer_ranks)
+        tables = [
+            ("cinemas", CINEMAS, build("cinemas", CINEMAS), False, 0),
+            ("movies", MOVIES, lambda: sample_frame(movie_rows(), n(MOVIES)), False, 0),
+            ("theaters", theaters, lambda: sample_frame(theater_rows(CINEMAS), n(theaters)), False, 0),
+            ("seats", seats, build("seats", seats, seats_per_theater=FIXED_SEATS_PER_THEATER), False, 0),
+            ("customers", CUSTOMERS, build("customers", CUSTOMERS), True, 0),
+            ("staff", staff, build("staff", staff), False, 0),
+            ("screenings", SCREENINGS, build("screenings", SCREENINGS, movie_count=MOVIES,
+                                             theater_count=theaters, skew=args.skew), True, 0),
+            ("bookings", BOOKINGS, build("bookings", BOOKINGS, customer_count=CUSTOMERS, screening_count=SCREENINGS,
+                                         staff_count=staff, skew=args.skew), True, customer_ranks),
+            ("tickets", TICKETS, tickets_sample, False, ticket_arrays),
+            ("payments", PAYMENTS, build("payments", PAYMENTS, amounts=np.full(n(PAYMENTS), 25.0)), True,
+             payment_cents),
+        ]
+    else:
+        tables = [
+            ("cinemas", CINEMAS, lambda: sample_frame(cinema_rows(), n(CINEMAS)), False, 0),
+            ("movies", MOVIES, lambda: sample_frame(movie_rows(), n(MOVIES)), False, 0),
+            ("theaters", theaters, lambda: sample_frame(theater_rows(CINEMAS), n(theaters)), False, 0),
+            ("seats", seats, lambda: sample_frame(seat_rows(theaters), n(seats)), False, 0),
+            ("customers", CUSTOMERS, lambda: sample_frame(customer_rows(), n(CUSTOMERS)), False, 0),
+            ("staff", staff, lambda: sample_frame(staff_rows(CINEMAS), n(staff)), False, 0),
+            ("screenings", SCREENINGS, lambda: sample_frame(screening_rows(theaters), n(SCREENINGS)), False, 0),
+            ("bookings", BOOKINGS, lambda: sample_frame(booking_rows(staff), n(BOOKINGS),
+                                                        dtypes={'created_by_staff_id': 'Int64'}), False, 0),
+            ("tickets", TICKETS, lambda: sample_frame(ticket_rows(seats), n(TICKETS)), False, 0),
+            ("payments", PAYMENTS, lambda: sample_frame(payment_rows(), n(PAYMENTS)), False, 0),
+        ]
+
+    estimates = []
+    for table, rows, sample_builder, parallel, resident in tables:
+        sample = estimate.measure(sample_builder)
+        if vectorized and parallel and sharded:
+            # Each worker builds a shard while the writer holds up to 2 x workers finished ones
+            workers, in_flight = args.workers, args.workers * 3
+        else:
+            workers, in_flight = 1, 1
+        estimates.append((table, rows, *estimate.estimate_table(
+            sample, rows, args.chunk_size, workers, in_flight + queued, resident)))
+    estimate.print_estimates(estimates)
+
+def append_dataset(args):
+    """Extend an existing dataset by --append-days days of screenings, bookings, tickets and payments"""
+    if args.append_from == 'database':
+        state = append.state_from_database(args.database_url)
+    else:
+        state = append.state_from_csv(getDirPath(VALUE_TYPE))
+    append.check_references(state)
+    last_ids = state["last_ids"]
+    chunk_size = args.chunk_size
+    days = args.append_days
+    first_day = append.first_append_day(state, datetime.now().date())
+    # Timestamps of the new rows fall inside the appended days
+    now = datetime.combine(first_day + timedelta(days=days), time.min)
+    span = np.timedelta64(days, 'D')
+    # Same daily volume as the base profile
+    screening_count = round(SCREENINGS * days / FIXED_SCREENING_DAYS)
+    booking_count = round(BOOKINGS * days / FIXED_SCREENING_DAYS)
+    first_screening_id = last_ids["screenings"] + 1
+    first_booking_id = last_ids["bookings"] + 1
+    first_payment_id = last_ids["payments"] + 1
+
+    if args.output != 'postgres':
+        # Only the delta is written, next to the base files
+        args.out_dir = append.delta_dir(getDirPath(VALUE_TYPE), first_day)
+    sink = make_sink(args)
+
+    print(f"🎬 Appending {days} day(s) from {first_day} ({args.output} output)...")
+    print(f"📍 Continuing after screening {last_ids['screenings']}, booking {last_ids['bookings']}, "
+          f"ticket {last_ids['tickets']}, payment {last_ids['payments']}; "
+          f"{state['seats_per_theater']} seats per theater")
+
+    print("\n🎦 Generating screenings...")
+    write_vector_table(sink, "screenings", screening_count, args, first_id=first_screening_id, now=now,
+                       movie_count=last_ids["movies"], theater_count=last_ids["theaters"],
+                       first_day=first_day, days=days, span=span, skew=args.skew)
+    print("✅ Screenings generated")
+
+    print("\n📝 Generating bookings...")
+    # New bookings are for the new screenings, by existing customers and staff
+    write_vector_table(sink, "bookings", booking_count, args, first_id=first_booking_id, now=now,
+                       customer_count=last_ids["customers"], screening_count=screening_count,
+                       staff_count=last_ids["staff"], first_screening_id=first_screening_id, span=span,
+                       skew=args.skew)
+    print("✅ Bookings generated")
+
+    print("\n🎟️ Generating tickets...")
+    screening_theaters, screening_prices = vector_engine.screening_keys(
+        screening_count, chunk_size, last_ids["movies"], last_ids["theaters"], first_screening_id, days,
+        first_day, args.skew)
+    payment_cents = np.zeros(booking_count + 1, dtype=np.int64)
+    sink.write("tickets", vector_engine.ticket_frames(
+        booking_count, chunk_size, now, last_ids["customers"], screening_count, last_ids["staff"],
+        screening_theaters, screening_prices, state["seats_per_theater"], TICKETS / BOOKINGS, payment_cents,
+        first_booking_id=first_booking_id, first_screening_id=first_screening_id,
+        first_ticket_id=last_ids["tickets"] + 1, span=span, skew=args.skew))
+    print("✅ Tickets generated")
+
+    print("\n💳 Generating payments...")
+    offset = first_payment_id - 1
+    write_vector_table(sink, "payments", booking_count, args, first_id=first_payment_id, now=now,
+                       booking_id_offset=first_booking_id - first_payment_id, span=span,
+                       chunk_params=lambda start, count: {
+                           "amounts": payment_cents[start - offset:start - offset + count] / 100})
+    print("✅ Payments generated")
+
+    sink.close()
+    print(f"\n🎉 Appended {days} day(s): screenings {first_screening_id}-{first_screening_id + screening_count - 1}, "
+          f"bookings {first_booking_id}-{first_booking_id + booking_count - 1}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Cinema CSV Data Generator')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Rows held in memory per table before flushing to disk; with the numpy '
+                             f'engine this is also the shard size (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--engine', choices=['faker', 'numpy'], default='faker',
+                        help='faker: row-by-row, reproduces existing datasets; '
+                             'numpy: vectorized, shardable customers/screenings/bookings/tickets/payments '
+                             'with pooled names/emails/phones (default: faker)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help=f'Processes generating shards of the big tables, numpy engine only '
+                             f'(default: 1, this machine has {sharding.default_workers()})')
+    parser.add_argument('--part-files', action='store_true',
+                        help='Write every shard of the big tables to its own <table>.part-NNNNN.csv')
+    parser.add_argument('--output', choices=['csv', 'csv.gz', 'csv.zst', 'parquet', 'postgres'], default='csv',
+                        help='csv/csv.gz/csv.zst/parquet: files under csv_<size>/, with size and write throughput '
+                             'logged to output_stats.csv; postgres: stream rows into COPY ... FROM STDIN (default: csv)')
+    parser.add_argument('--database-url', default=os.getenv("DATABASE_URL"),
+                        help='Connection string for --output postgres and --append-from database (default: $DATABASE_URL)')
+    parser.add_argument('--movie-skew', type=float, default=0.0,
+                        help='Zipf exponent for movie popularity (screenings per movie), e.g. 1.0; '
+                             '0 is uniform (default: 0, numpy engine only)')
+    parser.add_argument('--customer-skew', type=float, default=0.0,
+                        help='Zipf exponent for customer activity (bookings per customer), e.g. 0.8; '
+                             '0 is uniform (default: 0, numpy engine only)')
+    parser.add_argument('--peaks', action='store_true',
+                        help='Weight screening days/times and booking times towards weekends and evenings '
+                             '(numpy engine only)')
+    parser.add_argument('--profile', choices=profiles.PROFILES, default=VALUE_TYPE,
+                        help=f'Dataset size, the counts of values_<profile>.py (default: {VALUE_TYPE})')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply the profile\'s cinemas and customers, every other count follows its '
+                             'formulas; output goes to csv_<profile>_x<scale>/ (default: 1)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Only print estimated rows, CSV size, peak RAM and time per table')
+    parser.add_argument('--append-days', type=int,
+                        help='Extend the existing dataset by N days of screenings with their bookings, tickets and '
+                             'payments, continuing every id sequence; only the new rows are written, to '
+                             'csv_<size>/append-YYYYMMDD/ or the database (numpy engine only)')
+    parser.add_argument('--append-from', choices=['csv', 'database'],
+                        help='Where the existing ids come from: the files under csv_<size>/ (any --output format) '
+                             'or MAX(id) in the database (default: database for --output postgres, csv otherwise)')
+    args = parser.parse_args()
+    chunk_size = args.chunk_size
+    vectorized = args.engine == 'numpy'
+    if (args.workers > 1 or args.part_files) and not vectorized:
+        parser.error("--workers and --part-files need --engine numpy")
+    if args.part_files and args.output != 'csv':
+        parser.error("--part-files only applies to --output csv")
+    if args.append_days is not None and (not vectorized or args.append_days < 1):
+        parser.error("--append-days needs --engine numpy and at least one day")
+    if args.scale <= 0:
+        parser.error("--scale must be positive")
+    if (args.movie_skew or args.customer_skew or args.peaks) and not vectorized:
+        parser.error("--movie-skew, --customer-skew and --peaks need --engine numpy")
+    if args.movie_skew < 0 or args.customer_skew < 0:
+        parser.error("skew exponents cannot be negative")
+    args.skew = {"movies": args.movie_skew, "customers": args.customer_skew, "peaks": args.peaks}
+    args.workers = max(args.workers, 1)
+    apply_profile(args.profile, args.scale)
+    args.out_dir = getDirPath(VALUE_TYPE)
+    if args.dry_run:
+        dry_run(args)
+        return
+    if args.append_days:
+        args.append_from = args.append_from or ('database' if args.output == 'postgres' else 'csv')
+        append_dataset(args)
+        return
+    # One reference time for the whole run keeps every shard's timestamps consistent
+    now = datetime.now()
+
+    sink = make_sink(args)
+
+    print(f"🎬 Starting data generation ({args.engine} engine, {args.workers} worker(s), {args.output} output)...")
+
+    print("\n📍 Generating cinemas...")
+    if vectorized:
+        cinema_count = sink.write("cinemas", vector_engine.table_frames("cinemas", CINEMAS, chunk_size, now=now))
+    else:
+        cinema_count = sink.write("cinemas", row_frames(cinema_rows(), chunk_size))
+    print("✅ Cinemas generated")
+
+    print("\n🎥 Generating movies...")
+    sink.write("movies", row_frames(movie_rows(), chunk_size))
+    print("✅ Movies generated")
+
+    print("\n🏛️ Generating theaters...")
+    theater_count = sink.write("theaters", row_frames(theater_rows(cinema_count), chunk_size))
+    print("✅ Theaters generated")
+
+    print("\n💺 Generating seats...")
+    if vectorized:
+        # FIXED_SEATS_PER_THEATER seats per theater, in rows of 10
+        seat_count = sink.write("seats", vector_engine.table_frames(
+            "seats", theater_count * FIXED_SEATS_PER_THEATER, chunk_size, now=now,
+            seats_per_theater=FIXED_SEATS_PER_THEATER))
+    else:
+        seat_count = sink.write("seats", row_frames(seat_rows(theater_count), chunk_size))
+    print("✅ Seats generated")
+
+    print("\n👥 Generating customers...")
+    if vectorized:
+        write_vector_table(sink, "customers", CUSTOMERS, args, now=now)
+    else:
+        sink.write("customers", row_frames(customer_rows(), chunk_size))
+    print("✅ Customers generated")
+
+    print("\n👨‍💼 Generating staff...")
+    if vectorized:
+        staff_count = sink.write("staff", vector_engine.table_frames(
+            "staff", cinema_count * FIXED_STAFF_PER_CINEMA, chunk_size, now=now))
+    else:
+        staff_count = sink.write("staff", row_frames(staff_rows(cinema_count), chunk_size))
+    print("✅ Staff generated")
+
+    print("\n🎦 Generating screenings...")
+    if vectorized:
+        write_vector_table(sink, "screenings", SCREENINGS, args, now=now, movie_count=MOVIES,
+                           theater_count=theater_count, skew=args.skew)
+    else:
+        sink.write("screenings", row_frames(screening_rows(theater_count), chunk_size))
+    print("✅ Screenings generated")
+
+    print("\n📝 Generating bookings...")
+    if vectorized:
+        write_vector_table(sink, "bookings", BOOKINGS, args, now=now, customer_count=CUSTOMERS,
+                           screening_count=SCREENINGS, staff_count=staff_count, skew=args.skew)
+    else:
+        # Explicit Int64 type keeps created_by_staff_id as integers next to empty values
+        sink.write("bookings", row_frames(booking_rows(staff_count), chunk_size,
+                                           dtypes={'created_by_staff_id': 'Int64'}))
+    print("✅ Bookings generated")
+
+    print("\n🎟️ Generating tickets...")
+    if vectorized:
+        # Seats are assigned per screening from its own theater without double-booking;
+        # this pass is sequential because every booking chunk updates the shared occupancy
+        screening_theaters, screening_prices = vector_engine.screening_keys(
+            SCREENINGS, chunk_size, MOVIES, theater_count, first_day=now.date(), skew=args.skew)
+        payment_cents = np.zeros(BOOKINGS + 1, dtype=np.int64)
+        sink.write("tickets", vector_engine.ticket_frames(
+            BOOKINGS, chunk_size, now, CUSTOMERS, SCREENINGS, staff_count,
+            screening_theaters, screening_prices, FIXED_SEATS_PER_THEATER, TICKETS / BOOKINGS, payment_cents,
+            skew=args.skew))
+    else:
+        sink.write("tickets", row_frames(ticket_rows(seat_count), chunk_size))
+    print("✅ Tickets generated")
+
+    print("\n💳 Generating payments...")
+    if vectorized:
+        # One payment per booking for the tickets it actually got
+        write_vector_table(sink, "payments", PAYMENTS, args, now=now,
+                           chunk_params=lambda start, count: {"amounts": payment_cents[start:start + count] / 100})
+    else:
+        sink.write("payments", row_frames(payment_rows(), chunk_size))
+    print("✅ Payments generated")
+
+    sink.close()
+    print("\n🎉 All tables generated successfully!")
+
+if __name__ == "__main__":
+    main()
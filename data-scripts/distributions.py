@@ -0,0 +1,68 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Skewed workload distributions for the vectorized engine: Zipf popularity and day/hour peaks.
+
+UNIFORM = {"movies": 0.0, "customers": 0.0, "peaks": False}
+
+DAY_OF_WEEK_WEIGHTS = np.array([0.8, 0.8, 0.9, 1.0, 1.5, 1.9, 1.6])  # Monday .. Sunday
+# Screening start hours 10:00 .. 22:00, evenings sell best
+SCREENING_HOUR_WEIGHTS = np.array([1.0, 1.0, 1.2, 1.5, 1.8, 2.0, 2.5, 3.2, 4.5, 5.0, 4.5, 3.0, 1.8])
+# Bookings by hour of day 00 .. 23: quiet nights, a lunch bump, an evening peak
+BOOKING_HOUR_WEIGHTS = np.array([0.3, 0.2, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.7, 1.0, 1.3, 1.6,
+                                 2.0, 1.9, 1.6, 1.5, 1.7, 2.2, 2.9, 3.2, 2.8, 2.0, 1.2, 0.6])
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 24 * US_PER_HOUR
+
+def _probabilities(weights):
+    return weights / weights.sum()
+
+@lru_cache(maxsize=8)
+def _zipf_table(n, exponent, seed):
+    # Cumulative rank probabilities and the rank -> id permutation, built once per process
+    cdf = np.cumsum(np.arange(1, n + 1, dtype=np.float64) ** -exponent)
+    cdf /= cdf[-1]
+    return cdf, np.random.default_rng(seed).permutation(n) + 1
+
+def zipf_ids(rng, count, n, exponent, seed, first_id=1):
+    """count ids in first_id .. first_id + n - 1, Zipf-distributed (uniform for exponent 0)"""
+    if not exponent:
+        return rng.integers(first_id, first_id + n, size=count)
+    cdf, ids = _zipf_table(n, float(exponent), seed)
+    ranks = np.minimum(np.searchsorted(cdf, rng.random(count), side='right'), n - 1)
+    return ids[ranks] + (first_id - 1)
+
+def weekday(day):
+    """Monday = 0 for datetime64[D] values"""
+    return (day.astype(np.int64) + EPOCH_WEEKDAY) % 7
+
+def day_offsets(rng, count, first_day, days, peaks):
+    """Offsets 0 .. days - 1 from first_day, weighted by day of week with peaks"""
+    if not peaks:
+        return rng.integers(0, days, size=count)
+    weights = DAY_OF_WEEK_WEIGHTS[weekday(np.datetime64(first_day, 'D') + np.arange(days))]
+    return rng.choice(days, size=count, p=_probabilities(weights))
+
+def screening_hours(rng, count, peaks):
+    """Indexes into the 10:00 .. 22:00 screening start times"""
+    if not peaks:
+        return rng.integers(0, len(SCREENING_HOUR_WEIGHTS), size=count)
+    return rng.choice(len(SCREENING_HOUR_WEIGHTS), size=count, p=_probabilities(SCREENING_HOUR_WEIGHTS))
+
+def peak_instants(rng, count, now, span):
+    """datetime64[us] values in [now - span, now] weighted by day of week and hour of day"""
+    now = np.datetime64(now, 'us')
+    start = now - span
+    first_day = start.astype('datetime64[D]')
+    days = int((now.astype('datetime64[D]') - first_day) / np.timedelta64(1, 'D')) + 1
+    day = rng.choice(days, size=count, p=_probabilities(DAY_OF_WEEK_WEIGHTS[weekday(first_day + np.arange(days))]))
+    hour = rng.choice(24, size=count, p=_probabilities(BOOKING_HOUR_WEIGHTS))
+    offset = day * US_PER_DAY + hour * US_PER_HOUR + rng.integers(0, US_PER_HOUR, size=count)
+    values = first_day.astype('datetime64[us]') + offset.astype('timedelta64[us]')
+    # The first and last day are partial, redraw what fell outside the window uniformly
+    outside = np.flatnonzero((values < start) | (values > now))
+    span_us = int(span / np.timedelta64(1, 'us'))
+    values[outside] = start + rng.integers(0, span_us + 1, size=outside.size).astype('timedelta64[us]')
+    return values
@@ -0,0 +1,149 @@
+import os
+import json
+import time
+from concurrent.futures import wait
+
+# Load-optimized ingest for load_database.py --ingest: secondary indexes, foreign keys and triggers
+# are dropped or disabled before the load and restored after it.
+
+RESTORE_FILE = "ingest_restore.sql"
+STATE_FILE = "ingest_state.json"  # what was dropped, so a resumed load restores the same objects
+
+SECONDARY_INDEXES = """
+    SELECT i.indexrelid::regclass::text, i.indrelid::regclass::text, pg_get_indexdef(i.indexrelid),
+           pg_relation_size(i.indrelid)
+    FROM pg_index i
+    WHERE i.indrelid = ANY(%s::regclass[])
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c
+                      WHERE c.conindid = i.indexrelid AND c.contype IN ('p', 'u', 'x'))
+"""
+
+FOREIGN_KEYS = """
+    SELECT conname, conrelid::regclass::text, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))
+"""
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+class Ingest:
+    """Defers index, constraint and trigger work of the loaded tables until after the COPYs"""
+
+    def __init__(self, loader, tables, unlogged=False, maintenance_work_mem="1GB", restore_dir="."):
+        self.loader = loader
+        self.tables = tables
+        self.unlogged = unlogged
+        self.maintenance_work_mem = maintenance_work_mem
+        self.restore_path = os.path.join(restore_dir, RESTORE_FILE)
+        self.state_path = os.path.join(restore_dir, STATE_FILE)
+        self.timings = {}
+
+    def phase(self, name, fn, *args):
+        print(f"\n⏱️  {name}...")
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[name] = time.perf_counter() - start
+        print(f"✅ {name} done in {self.timings[name]:.1f}s")
+        return result
+
+    def _query(self, sql, params):
+        conn = self.loader.connection()
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+        conn.commit()
+        return rows
+
+    def _parallel(self, groups, settings=()):
+        """Run groups of statements concurrently, each group in order on one connection"""
+        futures = [self.loader.pool.submit(self.loader.execute, group, settings) for group in groups if group]
+        wait(futures)
+        for future in futures:
+            future.result()  # re-raise the first failure
+
+    def prepare(self):
+        """Save the restore script, then drop indexes and foreign keys and disable triggers"""
+        if os.path.exists(self.state_path):
+            # An interrupted ingest already dropped them, the catalog no longer knows them
+            with open(self.state_path) as f:
+                state = json.load(f)
+            self.indexes, self.foreign_keys = state["indexes"], state["foreign_keys"]
+            print(f"📍 Resuming an interrupted ingest, definitions read from {self.state_path}")
+        else:
+            self.indexes = self._query(SECONDARY_INDEXES, (self.tables,))
+            self.foreign_keys = self._query(FOREIGN_KEYS, (self.tables, self.tables))
+            with open(self.state_path, 'w') as f:
+                json.dump({"indexes": self.indexes, "foreign_keys": self.foreign_keys}, f)
+        # If the run dies half-way, `psql -f ingest_restore.sql` puts everything back
+        with open(self.restore_path, 'w') as f:
+            for _, _, definition, _ in self.indexes:
+                f.write(f"{definition};\n")
+            for name, table, definition in self.foreign_keys:
+                f.write(f"ALTER TABLE {table} ADD CONSTRAINT {quote_ident(name)} {definition};\n")
+            for table in self.tables:
+                if self.unlogged:
+                    f.write(f"ALTER TABLE {table} SET LOGGED;\n")
+                f.write(f"ALTER TABLE {table} ENABLE TRIGGER USER;\n")
+        print(f"💾 Restore script written to {self.restore_path}")
+
+        statements = [f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {quote_ident(name)}"
+                      for name, table, _ in self.foreign_keys]
+        statements += [f"DROP INDEX IF EXISTS {index}" for index, _, _, _ in self.indexes]
+        statements += [f"ALTER TABLE {table} DISABLE TRIGGER USER" for table in self.tables]
+        # Foreign keys are gone, so no logged table references an unlogged one
+        if self.unlogged:
+            statements += [f"ALTER TABLE {table} SET UNLOGGED" for table in self.tables]
+        self.loader.execute(statements)
+        print(f"🗑️  Dropped {len(self.indexes)} index(es) and {len(self.foreign_keys)} foreign key(s), "
+              f"disabled triggers on {len(self.tables)} table(s)")
+
+    def set_logged(self):
+        # Rewrites each table into the WAL, tables are independent
+        self._parallel([[f"ALTER TABLE {table} SET LOGGED"] for table in self.tables])
+
+    def rebuild_indexes(self):
+        # Biggest tables first so the longest builds don't start last
+        ordered = sorted(self.indexes, key=lambda index: -index[3])
+        self._parallel([[definition] for _, _, definition, _ in ordered],
+                       settings=[f"SET maintenance_work_mem = '{self.maintenance_work_mem}'"])
+        print(f"📇 Rebuilt {len(self.indexes)} index(es) with maintenance_work_mem={self.maintenance_work_mem}")
+
+    def restore_foreign_keys(self):
+        # Adding NOT VALID is instant; validation scans without blocking writes, one table at a time
+        # (concurrent validations of the same table would wait on each other's lock)
+        self.loader.execute([f"ALTER TABLE {table} ADD CONSTRAINT {quote_ident(name)} {definition} NOT VALID"
+                             for name, table, definition in self.foreign_keys])
+        by_table = {}
+        for name, table, _ in self.foreign_keys:
+            by_table.setdefault(table, []).append(f"ALTER TABLE {table} VALIDATE CONSTRAINT {quote_ident(name)}")
+        self._parallel(list(by_table.values()), settings=[f"SET maintenance_work_mem = '{self.maintenance_work_mem}'"])
+        print(f"🔗 Validated {len(self.foreign_keys)} foreign key(s)")
+
+    def enable_triggers(self):
+        self.loader.execute([f"ALTER TABLE {table} ENABLE TRIGGER USER" for table in self.tables])
+
+    def reset_sequences(self):
+        self.loader.reset_sequences(self.tables)
+
+    def analyze(self):
+        self._parallel([[f"ANALYZE {table}"] for table in self.tables])
+
+    def finish(self):
+        """Everything after the COPYs, phase by phase"""
+        if self.unlogged:
+            self.phase("Switching tables back to LOGGED", self.set_logged)
+        self.phase("Rebuilding indexes", self.rebuild_indexes)
+        self.phase("Validating foreign keys", self.restore_foreign_keys)
+        self.phase("Re-enabling triggers", self.enable_triggers)
+        self.phase("Resetting sequences", self.reset_sequences)
+        self.phase("Analyzing", self.analyze)
+        os.remove(self.restore_path)
+        os.remove(self.state_path)
+
+    def print_timings(self):
+        total = sum(self.timings.values())
+        print("\n📊 Ingest phases:")
+        for name, seconds in self.timings.items():
+            print(f"   {name:<36}{seconds:>9.1f}s {seconds / max(total, 1e-9) * 100:>5.1f}%")
+        print(f"   {'total':<36}{total:>9.1f}s")
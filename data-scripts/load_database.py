@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Parallel Bulk Loader
+Loads a generated CSV dataset into PostgreSQL in foreign-key order over several connections
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dotenv import load_dotenv
+from ingest import Ingest, quote_ident
+import checkpoints
+
+# Load environment variables from .env file
+load_dotenv()
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DDL = os.path.join(SCRIPT_DIR, '..', 'schema', 'DDL_UPDATED.sql')
+DEFAULT_CHUNK_MB = 64
+READ_SIZE = 1 << 20  # bytes per file read and per COPY read
+RETRY_DELAY = 2  # seconds before the first retry of a chunk, doubled on every further attempt
+
+SERIAL_COLUMNS = """
+    SELECT attname FROM pg_attribute
+    WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+      AND pg_get_serial_sequence(%s, attname) IS NOT NULL
+"""
+
+# Every table whose parents are loaded is copied at the same time, big files in chunks of whole records.
+
+def _matching_paren(text, open_index):
+    depth = 0
+    for index in range(open_index, len(text)):
+        if text[index] == '(':
+            depth += 1
+        elif text[index] == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    return len(text)
+
+def parse_dependencies(ddl_path):
+    """{table: set of tables it references} from the CREATE TABLE statements of a DDL file"""
+    with open(ddl_path) as f:
+        ddl = re.sub(r'--[^\n]*', '', f.read())  # drop comments, including commented-out tables
+    dependencies = {}
+    for match in re.finditer(r'create\s+table\s+(?:if\s+not\s+exists\s+)?(?:\w+\.)?"?(\w+)"?\s*\(', ddl, re.I):
+        table = match.group(1).lower()
+        body = ddl[match.end() - 1:_matching_paren(ddl, match.end() - 1)]
+        parents = {name.lower() for name in re.findall(r'references\s+(?:\w+\.)?"?(\w+)"?', body, re.I)}
+        dependencies[table] = parents - {table}  # self-references don't order tables
+    return dependencies
+
+def csv_files(directory, table):
+    """<table>.csv, or the <table>.part-NNNNN.csv shards written by csv_convert.py --part-files"""
+    path = os.path.join(directory, f"{table}.csv")
+    if os.path.exists(path):
+        return [path]
+    return sorted(glob.glob(os.path.join(directory, f"{table}.part-*.csv")))
+
+def plan_chunks(path, chunk_bytes):
+    """(columns, [(start, end), ...]): byte ranges of whole CSV records after the header.
+
+    A newline ends a record only outside quotes, i.e. when the number of quote characters before
+    it is even, so multi-line text fields are never split."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        bounds = [len(header)]
+        target = len(header) + chunk_bytes
+        position = len(header)
+        quotes = 0
+        while target < size:
+            block = f.read(READ_SIZE)
+            if not block:
+                break
+            while target < position + len(block):
+                newline = block.find(b'\n', target - position)
+                while newline >= 0 and (quotes + block.count(b'"', 0, newline)) % 2:
+                    newline = block.find(b'\n', newline + 1)
+                if newline < 0:
+                    target = position + len(block)  # keep looking in the next block
+                    break
+                bounds.append(position + newline + 1)
+                target = bounds[-1] + chunk_bytes
+            quotes += block.count(b'"')
+            position += len(block)
+    if bounds[-1] < size:
+        bounds.append(size)
+    columns = header.decode().strip()
+    return columns, list(zip(bounds, bounds[1:]))
+
+class RangeReader:
+    """File-like view of bytes [start, end) of a file for COPY FROM STDIN"""
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self.f = f
+        self.remaining = end - start
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    # psycopg2 may call readline() on the source file
+    def readline(self, size=-1):
+        return self.read(size)
+
+class Loader:
+    """Copies planned chunks over a pool of connections, one connection per worker thread"""
+
+    def __init__(self, database_url, jobs, settings=(), retries=3):
+        import psycopg2
+        self.psycopg2 = psycopg2
+        self.database_url = database_url
+        self.settings = settings  # session settings for every connection
+        self.retries = retries
+        self.pool = ThreadPoolExecutor(max_workers=jobs)
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connection(self):
+        if getattr(self.local, "conn", None) is None:
+            self.local.conn = self.psycopg2.connect(self.database_url)
+            if self.settings:
+                self.execute(self.settings)
+            with self.lock:
+                self.connections.append(self.local.conn)
+        return self.local.conn
+
+    def _drop_connection(self):
+        conn, self.local.conn = self.local.conn, None
+        with self.lock:
+            self.connections.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def database_name(self):
+        info = self.connection().info
+        return f"{info.dbname}@{info.host}:{info.port}"
+
+    def checkpointed(self):
+        """{chunk key: rows} of the chunks committed by earlier runs"""
+        conn = self.connection()
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT chunk, rows FROM {checkpoints.CHECKPOINT_TABLE}")
+            rows = dict(cursor.fetchall())
+        conn.commit()
+        return rows
+
+    def execute(self, statements, settings=()):
+        """Run statements in one transaction on this thread's connection"""
+        conn = self.connection()
+        try:
+            with conn.cursor() as cursor:
+                for statement in [*settings, *statements]:
+                    cursor.execute(statement)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def reset_sequences(self, tables):
+        """Move the serial sequences of the loaded tables past the ids COPY gave explicitly"""
+        conn = self.connection()
+        statements = []
+        with conn.cursor() as cursor:
+            for table in tables:
+                cursor.execute(SERIAL_COLUMNS, (table, table))
+                for (column,) in cursor.fetchall():
+                    statements.append(f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                                      f"COALESCE(MAX({quote_ident(column)}), 1), "
+                                      f"MAX({quote_ident(column)}) IS NOT NULL) FROM {table}")
+        conn.commit()
+        self.execute(statements)
+        print(f"🔢 Reset {len(statements)} sequence(s)")
+
+    def copy_chunk(self, table, columns, path, start, end):
+        """COPY one byte range and its checkpoint in one transaction, returns (row count, time the copy
+        began). Dropped connections are retried with a growing delay."""
+        key = checkpoints.chunk_key(path, start, end)
+        for attempt in range(self.retries + 1):
+            began = time.perf_counter()
+            conn = None
+            try:
+                conn = self.connection()
+                with conn.cursor() as cursor:
+                    if attempt:
+                        # The commit may have gone through before the connection dropped
+                        cursor.execute(checkpoints.SELECT_CHECKPOINT, (key,))
+                        done = cursor.fetchone()
+                        if done:
+                            conn.commit()
+                            return done[0], began
+                    with open(path, 'rb') as f:
+                        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                                           RangeReader(f, start, end), size=READ_SIZE)
+                    rows = cursor.rowcount
+                    cursor.execute(checkpoints.INSERT_CHECKPOINT, (key, rows))
+                conn.commit()
+                return rows, began
+            except (self.psycopg2.OperationalError, self.psycopg2.InterfaceError) as e:
+                if conn is not None:
+                    self._drop_connection()
+                if attempt == self.retries:
+                    raise
+                delay = RETRY_DELAY * 2 ** attempt
+                reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+                print(f"⚠️  {table} chunk {key} failed ({reason}), "
+                      f"retrying in {delay}s...")
+                time.sleep(delay)
+            except Exception:
+                if conn is not None:
+                    conn.rollback()
+                raise
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        for conn in self.connections:
+            conn.close()
+
+def format_rate(rows, size, seconds):
+    seconds = max(seconds, 1e-9)
+    return (f"{rows:,} rows, {size / (1024 * 1024):.1f}MB in {seconds:.1f}s "
+            f"({rows / seconds:,.0f} rows/s, {size / (1024 * 1024) / seconds:.1f}MB/s)")
+
+def plan_tables(directory, dependencies, chunk_bytes):
+    """{table: [(columns, path, start, end), ...]} for every table with CSV files in directory"""
+    plans = {}
+    for table in dependencies:
+        files = csv_files(directory, table)
+        if not files:
+            print(f"⚠️  No CSV for {table} in {directory}, skipping it")
+            continue
+        chunks = []
+        for path in files:
+            columns, ranges = plan_chunks(path, chunk_bytes)
+            chunks += [(columns, path, start, end) for start, end in ranges]
+        plans[table] = chunks
+    return plans
+
+def load(loader, plans, dependencies, manifest):
+    """Load the planned chunks not yet in the manifest, parents before children, returns per-table stats"""
+    skipped = {table: sum(checkpoints.chunk_key(path, start, end) in manifest.completed
+                          for _, path, start, end in chunks)
+               for table, chunks in plans.items()}
+    plans = {table: [chunk for chunk in chunks if checkpoints.chunk_key(*chunk[1:]) not in manifest.completed]
+             for table, chunks in plans.items()}
+
+    # Parents without a CSV are assumed to be loaded already
+    waiting = {table: dependencies[table] & plans.keys() for table in plans}
+    stats = {table: {"rows": 0, "bytes": sum(end - start for _, _, start, end in chunks),
+                     "chunks": len(chunks), "done": 0}
+             for table, chunks in plans.items()}
+    futures = {}
+    future_chunks = {}
+
+    def start(table):
+        del waiting[table]
+        # Chunks may queue behind other tables, the clock starts when the first one runs
+        stats[table]["start"] = float("inf")
+        resumed = f", {skipped[table]} already loaded" if skipped[table] else ""
+        print(f"📤 Loading {table} ({stats[table]['chunks']} chunk(s), "
+              f"{stats[table]['bytes'] / (1024 * 1024):.1f}MB{resumed})...")
+        for columns, path, chunk_start, chunk_end in plans[table]:
+            future = loader.pool.submit(loader.copy_chunk, table, columns, path, chunk_start, chunk_end)
+            futures[future] = table
+            future_chunks[future] = (path, chunk_start, chunk_end)
+        if not plans[table]:
+            finish(table)
+
+    def finish(table):
+        stats[table]["seconds"] = max(time.perf_counter() - stats[table]["start"], 0)
+        print(f"✅ {table}: {format_rate(stats[table]['rows'], stats[table]['bytes'], stats[table]['seconds'])}")
+        for parents in waiting.values():
+            parents.discard(table)
+        start_ready()
+
+    def start_ready():
+        for table in [t for t, parents in waiting.items() if not parents]:
+            if table in waiting:  # an empty table started just before may have started it already
+                start(table)
+
+    start_ready()
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            table = futures.pop(future)
+            try:
+                rows, began = future.result()
+                stats[table]["rows"] += rows
+                stats[table]["start"] = min(stats[table]["start"], began)
+            except Exception as e:
+                for pending in futures:
+                    pending.cancel()
+                print(f"❌ Loading {table} failed: {e}")
+                print(f"💡 Rerun the same command to resume, {len(manifest.completed)} chunk(s) are checkpointed")
+                sys.exit(1)
+            manifest.record(checkpoints.chunk_key(*future_chunks.pop(future)), rows)
+            stats[table]["done"] += 1
+            if stats[table]["done"] == stats[table]["chunks"]:
+                finish(table)
+
+    if waiting:
+        print(f"❌ Circular foreign keys, could not order: {', '.join(sorted(waiting))}")
+        sys.exit(1)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel CSV Bulk Loader')
+    parser.add_argument('--dir', default=os.path.join(SCRIPT_DIR, 'csv_large'),
+                        help='Dataset directory with <table>.csv or <table>.part-NNNNN.csv files (default: csv_large)')
+    parser.add_argument('--ddl', default=DEFAULT_DDL,
+                        help='Schema file the foreign-key graph is read from (default: schema/DDL_UPDATED.sql)')
+    parser.add_argument('--database-url', default=os.getenv("DATABASE_URL"),
+                        help='Connection string (default: $DATABASE_URL)')
+    parser.add_argument('--jobs', type=int, default=min(8, os.cpu_count() or 1),
+                        help='Parallel connections (default: min(8, CPU count))')
+    parser.add_argument('--ingest', action='store_true',
+                        help='Load-optimized mode: drop secondary indexes and foreign keys and disable triggers '
+                             'during the load, then rebuild indexes in parallel, validate foreign keys, reset '
+                             'sequences and ANALYZE, with per-phase timings')
+    parser.add_argument('--unlogged', action='store_true',
+                        help='With --ingest, load into UNLOGGED tables and switch them back to LOGGED afterwards')
+    parser.add_argument('--maintenance-work-mem', default='1GB',
+                        help='maintenance_work_mem for index builds and foreign key validation with --ingest '
+                             '(default: 1GB)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries per chunk after a dropped connection (default: 3)')
+    parser.add_argument('--restart', action='store_true',
+                        help=f'Ignore the checkpoints of an interrupted load ({checkpoints.MANIFEST_FILE}) '
+                             f'and plan from scratch; rows it already loaded are not removed')
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_MB,
+                        help=f'Split CSV files into byte ranges of about this size, copied in parallel '
+                             f'(default: {DEFAULT_CHUNK_MB})')
+    args = parser.parse_args()
+
+    try:
+        import psycopg2
+    except ImportError:
+        print("❌ psycopg2 is required to load the database")
+        print("💡 pip install psycopg2-binary")
+        sys.exit(1)
+    if not args.database_url:
+        print("❌ DATABASE_URL not found!")
+        print("💡 Pass --database-url or set DATABASE_URL in your .env file")
+        sys.exit(1)
+
+    dependencies = parse_dependencies(args.ddl)
+    if not dependencies:
+        print(f"❌ No CREATE TABLE statements found in {args.ddl}")
+        sys.exit(1)
+
+    print(f"🔗 Loading {args.dir} with {args.jobs} connection(s)")
+    for table, parents in dependencies.items():
+        print(f"   {table} <- {', '.join(sorted(parents)) or '(no dependencies)'}")
+    if args.unlogged and not args.ingest:
+        parser.error("--unlogged needs --ingest")
+    # Chunks commit one by one; with --ingest don't wait for fsync, a commit lost in a server crash
+    # loses its checkpoint too and is copied again on resume
+    loader = Loader(args.database_url, args.jobs,
+                    settings=["SET synchronous_commit = off"] if args.ingest else (), retries=args.retries)
+    manifest = checkpoints.Manifest(args.dir)
+    if args.restart:
+        manifest.remove()
+        loader.execute([f"DROP TABLE IF EXISTS {checkpoints.CHECKPOINT_TABLE}"])
+    loader.execute([checkpoints.create_table(args.unlogged)])
+    chunk_bytes = args.chunk_mb * 1024 * 1024
+    plans = manifest.open(loader.database_name(), lambda: plan_tables(args.dir, dependencies, chunk_bytes))
+    # The database decides what is loaded: it also knows chunks committed right before a crash
+    manifest.completed = loader.checkpointed()
+    if manifest.completed:
+        total = sum(len(chunks) for chunks in plans.values())
+        print(f"📍 Resuming: {len(manifest.completed)} of {total} chunk(s) already loaded")
+    ingest = None
+    if args.ingest:
+        tables = list(plans)
+        ingest = Ingest(loader, tables, args.unlogged, args.maintenance_work_mem, restore_dir=args.dir)
+    started = time.perf_counter()
+    try:
+        if ingest:
+            ingest.phase("Deferring indexes, FKs and triggers", ingest.prepare)
+            stats = ingest.phase("Loading", load, loader, plans, dependencies, manifest)
+            ingest.finish()
+        else:
+            stats = load(loader, plans, dependencies, manifest)
+            loader.reset_sequences(list(plans))
+        # Done, nothing to resume
+        loader.execute([f"DROP TABLE {checkpoints.CHECKPOINT_TABLE}"])
+        manifest.remove()
+    except BaseException:
+        if ingest and os.path.exists(ingest.restore_path):
+            print(f"💡 Indexes, foreign keys or triggers may still be missing, restore them with: "
+                  f"psql \"$DATABASE_URL\" -f {ingest.restore_path}")
+        raise
+    finally:
+        loader.close()
+    elapsed = time.perf_counter() - started
+    if ingest:
+        ingest.print_timings()
+
+    rows = sum(s["rows"] for s in stats.values())
+    size = sum(s["bytes"] for s in stats.values())
+    print(f"\n🎉 Loaded {len(stats)} tables: {format_rate(rows, size, elapsed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import numpy as np
+
+# Seat occupancy for the vectorized engine: one bitset per screening, one bit per seat.
+
+PROBE_ROUNDS = 8
+FULL_WORD = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+class SeatOccupancy:
+    """Per-screening seat bitsets"""
+
+    def __init__(self, screening_count, seats_per_theater):
+        self.seats = seats_per_theater
+        self.words = (seats_per_theater + 63) // 64
+        self.bitmap = np.zeros((screening_count + 1, self.words), dtype=np.uint64)  # row 0 unused (ids start at 1)
+        self.reserved = 0
+        # Padding bits past the last seat count as taken
+        padding = self.words * 64 - seats_per_theater
+        if padding:
+            self.bitmap[:, -1] = FULL_WORD << np.uint64(64 - padding)
+
+    def reserve(self, screening_ids, rng):
+        """Reserve one free seat per entry; returns 0-based seat numbers, -1 where sold out"""
+        seats = np.full(len(screening_ids), -1, dtype=np.int64)
+        pending = np.arange(len(screening_ids))
+        for _ in range(PROBE_ROUNDS):
+            if pending.size == 0:
+                break
+            screenings = screening_ids[pending]
+            candidates = rng.integers(0, self.seats, size=pending.size)
+            words = candidates >> 6
+            bits = np.uint64(1) << (candidates & 63).astype(np.uint64)
+            free = np.flatnonzero((self.bitmap[screenings, words] & bits) == 0)
+            # Several tickets may probe the same free seat, the first one wins it
+            _, first = np.unique(screenings[free] * self.seats + candidates[free], return_index=True)
+            winners = free[first]
+            seats[pending[winners]] = candidates[winners]
+            np.bitwise_or.at(self.bitmap, (screenings[winners], words[winners]), bits[winners])
+            pending = np.delete(pending, winners)
+        for i in pending:
+            seats[i] = self._first_free(screening_ids[i])
+        self.reserved += int((seats >= 0).sum())
+        return seats
+
+    def _first_free(self, screening_id):
+        for word_index, word in enumerate(self.bitmap[screening_id]):
+            if word != FULL_WORD:
+                free_bits = ~int(word) & 0xFFFFFFFFFFFFFFFF
+                bit = (free_bits & -free_bits).bit_length() - 1
+                self.bitmap[screening_id, word_index] |= np.uint64(1 << bit)
+                return word_index * 64 + bit
+        return -1
+
+    def fill_rate(self):
+        """Share of all screening seats that were sold"""
+        return self.reserved / max((len(self.bitmap) - 1) * self.seats, 1)
@@ -0,0 +1,38 @@
+import importlib
+
+# Dataset profiles: the constants of values_<profile>.py, with cinemas and customers optionally scaled
+
+PROFILES = ["small", "medium", "large"]
+
+# Counts proportional to each size driver in the values_* formulas
+# (totals only: MAXIMUM_TICKETS_PER_CINEMA is per cinema and stays as it is)
+CINEMA_COUNTS = ["SCREENINGS", "SEATS", "STAFF", "THEATERS", "TOTAL_THEATERS", "TOTAL_SEATS", "TOTAL_STAFF",
+                 "MAXIMUM_TICKETS_PER_LIFETIME"]
+CUSTOMER_COUNTS = ["BOOKINGS", "TICKETS", "PAYMENTS", "PURCHASED_BOOKINGS", "PURCHASED_TICKETS"]
+
+def profile_name(name, scale):
+    """Output directory suffix: large, large_x10, small_x0.5..."""
+    return name if scale == 1 else f"{name}_x{scale:g}"
+
+def load_profile(name, scale=1.0):
+    """Constants of values_<name>.py with cinemas and customers multiplied by scale"""
+    module = importlib.import_module(f"values_{name}")
+    values = {key: getattr(module, key) for key in dir(module) if key.isupper()}
+    if scale == 1:
+        return values
+
+    cinemas = max(1, round(values["FIXED_CINEMAS"] * scale))
+    customers = max(1, round(values["FIXED_CUSTOMERS"] * scale))
+    cinema_factor = cinemas / values["CINEMAS"]
+    customer_factor = customers / values["CUSTOMERS"]
+    for key in CINEMA_COUNTS:
+        if key in values:
+            values[key] = round(values[key] * cinema_factor)
+    for key in CUSTOMER_COUNTS:
+        if key in values:
+            values[key] = round(values[key] * customer_factor)
+    values.update(FIXED_CINEMAS=cinemas, CINEMAS=cinemas, FIXED_CUSTOMERS=customers, CUSTOMERS=customers)
+    # Both rates are ratios of scaled counts, recompute instead of scaling
+    values["OCCUPANCY_RATE"] = values["PURCHASED_TICKETS"] / values["MAXIMUM_TICKETS_PER_LIFETIME"] * 100
+    values["VALUE_TYPE"] = profile_name(name, scale)
+    return values
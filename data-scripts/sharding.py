@@ -0,0 +1,48 @@
+import os
+import glob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import vector_engine
+
+# Multi-process generation of the vectorized tables, one shard per chunk of ids.
+
+def default_workers():
+    return os.cpu_count() or 1
+
+def _write_part(table, chunk_index, start_id, count, params, path):
+    vector_engine.build_chunk(table, chunk_index, start_id, count, params).to_csv(path, index=False)
+    return count
+
+def _ordered(pool, fn, tasks, window):
+    """Run tasks on the pool, yielding results in submission order with at most `window` in flight"""
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(fn, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def shard_frames(table, total, chunk_size, workers, chunk_params=None, first_id=1, **params):
+    """Yield the table's DataFrame chunks in id order, generated by a process pool"""
+    tasks = vector_engine.chunk_tasks(table, total, chunk_size, params, chunk_params, first_id)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Bounding the window keeps only a few shards in memory while the writer catches up
+        for df in _ordered(pool, vector_engine.build_chunk, tasks, window=workers * 2):
+            yield df
+            print(f"Generated {df['id'].iloc[-1] - first_id + 1} {table}...")
+
+def write_part_files(table, total, chunk_size, workers, out_dir, chunk_params=None, first_id=1, **params):
+    """Have each worker write its shard to <table>.part-NNNNN.csv, returns the row count"""
+    tasks = ((*task, os.path.join(out_dir, f"{table}.part-{task[1]:05d}.csv"))
+             for task in vector_engine.chunk_tasks(table, total, chunk_size, params, chunk_params, first_id))
+    # Parts from an earlier run may use a different shard size
+    for stale in glob.glob(os.path.join(out_dir, f"{table}.part-*.csv")):
+        os.remove(stale)
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for count in _ordered(pool, _write_part, tasks, window=workers * 2):
+            written += count
+            print(f"Generated {written} {table}...")
+    return written
@@ -0,0 +1,247 @@
+import io
+import os
+import csv
+import sys
+import gzip
+import time
+import queue
+import threading
+from datetime import datetime
+from itertools import chain
+
+import pandas as pd
+
+COPY_READ_SIZE = 1 << 20  # bytes requested from the producer per COPY read
+STATS_FILE = "output_stats.csv"
+
+# Destinations for generated tables. Every sink consumes an iterator of DataFrame chunks
+# per table, so the generators never need to know where their rows end up.
+
+def record_stats(out_dir, fmt, table, rows, path, seconds):
+    """Print and append one table's size and write throughput to <out_dir>/output_stats.csv"""
+    size = os.path.getsize(path)
+    mb_per_s = size / (1024 * 1024) / max(seconds, 1e-9)
+    print(f"💾 Wrote {rows:,} rows to {os.path.basename(path)}: "
+          f"{size / (1024 * 1024):.1f}MB in {seconds:.1f}s ({mb_per_s:.1f}MB/s)")
+    stats_path = os.path.join(out_dir, STATS_FILE)
+    file_exists = os.path.isfile(stats_path)
+    with open(stats_path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(['written_at', 'format', 'table', 'rows', 'bytes', 'write_seconds',
+                             'rows_per_s', 'mb_per_s'])
+        writer.writerow([datetime.now().isoformat(timespec='seconds'), fmt, table, rows, size,
+                         round(seconds, 3), round(rows / max(seconds, 1e-9)), round(mb_per_s, 2)])
+
+class CsvSink:
+    """Write each table to <out_dir>/<table>.csv, optionally as a gzip or zstd stream"""
+
+    EXTENSIONS = {None: ".csv", "gzip": ".csv.gz", "zstd": ".csv.zst"}
+
+    def __init__(self, out_dir, compression=None):
+        self.out_dir = out_dir
+        self.compression = compression
+        self.format = self.EXTENSIONS[compression].lstrip(".")
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                print("❌ zstandard is required for --output csv.zst")
+                print("💡 pip install zstandard")
+                sys.exit(1)
+            self.zstd = zstandard
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _open(self, path):
+        if self.compression == "gzip":
+            return gzip.open(path, 'wt', compresslevel=6, newline='')
+        if self.compression == "zstd":
+            writer = self.zstd.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+            return io.TextIOWrapper(writer, encoding='utf-8', newline='')
+        return open(path, 'w', newline='')
+
+    def write(self, table, frames):
+        """Stream DataFrame chunks into one compressed or plain CSV, returns the row count"""
+        path = os.path.join(self.out_dir, table + self.EXTENSIONS[self.compression])
+        written = 0
+        busy = 0.0  # time spent encoding/writing, excluding generation
+        with self._open(path) as f:
+            for df in frames:
+                start = time.perf_counter()
+                # Only the first chunk writes the header
+                df.to_csv(f, index=False, header=written == 0)
+                busy += time.perf_counter() - start
+                written += len(df)
+            if written == 0:
+                pd.DataFrame().to_csv(f, index=False)
+        record_stats(self.out_dir, self.format, table, written, path, busy)
+        return written
+
+    def close(self):
+        pass
+
+class ParquetSink:
+    """Write each table to <out_dir>/<table>.parquet, one row group per chunk"""
+
+    def __init__(self, out_dir, row_group_size):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            print("❌ pyarrow is required for --output parquet")
+            print("💡 pip install pyarrow")
+            sys.exit(1)
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.out_dir = out_dir
+        self.row_group_size = row_group_size
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _schema(self, first):
+        # Timestamp and date columns may arrive pre-formatted as CSV strings, store them typed; an id
+        # column with missing values (created_by_staff_id) arrives as float64, store it as int64
+        fields = []
+        for field in first.schema:
+            if (field.name == "id" or field.name.endswith("_id")) and \
+                    (self.pa.types.is_floating(field.type) or self.pa.types.is_null(field.type)):
+                field = field.with_type(self.pa.int64())
+            elif field.name.endswith("_at"):
+                field = field.with_type(self.pa.timestamp('us'))
+            elif field.name.endswith("_date") or field.name == "date_of_birth":
+                field = field.with_type(self.pa.date32())
+            fields.append(field)
+        return self.pa.schema(fields)
+
+    def write(self, table, frames):
+        """Stream DataFrame chunks into a Parquet file, returns the row count"""
+        path = os.path.join(self.out_dir, f"{table}.parquet")
+        written = 0
+        busy = 0.0
+        writer = None
+        try:
+            for df in frames:
+                start = time.perf_counter()
+                chunk = self.pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    schema = self._schema(chunk)
+                    writer = self.pq.ParquetWriter(path, schema, compression='zstd')
+                writer.write_table(chunk.cast(schema), row_group_size=self.row_group_size)
+                busy += time.perf_counter() - start
+                written += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # No rows and so no columns either, like the empty file of the CSV sink
+            self.pq.write_table(self.pa.table({}), path)
+        record_stats(self.out_dir, "parquet", table, written, path, busy)
+        return written
+
+    def close(self):
+        pass
+
+class _QueueReader:
+    """File-like object handing COPY the CSV blocks produced by another thread"""
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.block = b""
+        self.pos = 0
+        self.done = False
+        self.error = None
+
+    def read(self, size=-1):
+        # Serve from the current block without re-slicing the remainder on every call
+        while self.pos >= len(self.block):
+            if self.done:
+                return b""
+            block = self.blocks.get()
+            if isinstance(block, BaseException):
+                self.error = block
+                raise block
+            if block is None:
+                self.done = True
+                return b""
+            self.block, self.pos = block, 0
+        if size < 0:
+            size = len(self.block) - self.pos
+        data = self.block[self.pos:self.pos + size]
+        self.pos += len(data)
+        return data
+
+    # psycopg2 may call readline() on the source file
+    def readline(self, size=-1):
+        return self.read(size)
+
+class PostgresCopySink:
+    """Stream each table straight into COPY ... FROM STDIN, nothing is written to disk"""
+
+    def __init__(self, database_url, queue_size=4):
+        try:
+            import psycopg2
+        except ImportError:
+            print("❌ psycopg2 is required for --output postgres")
+            print("💡 pip install psycopg2-binary")
+            sys.exit(1)
+        if not database_url:
+            print("❌ DATABASE_URL not found!")
+            print("💡 Pass --database-url or set DATABASE_URL in your .env file")
+            sys.exit(1)
+        self.conn = psycopg2.connect(database_url)
+        self.queue_size = queue_size
+
+    def _produce(self, frames, blocks, counter, stop):
+        # Producer thread: generate and encode chunks while the main thread feeds COPY
+        try:
+            for df in frames:
+                if stop.is_set():
+                    return
+                blocks.put(df.to_csv(index=False, header=False).encode())
+                counter[0] += len(df)
+            blocks.put(None)
+        except BaseException as e:
+            blocks.put(e)
+
+    def write(self, table, frames):
+        """COPY the table's chunks into the database, returns the row count"""
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            return 0
+        columns = ", ".join(first.columns)
+        # Bounded queue: the generator can only run a few chunks ahead of the server
+        blocks = queue.Queue(maxsize=self.queue_size)
+        counter = [0]
+        stop = threading.Event()
+        producer = threading.Thread(target=self._produce, args=(chain([first], frames), blocks, counter, stop),
+                                    daemon=True)
+        reader = _QueueReader(blocks)
+
+        start = time.perf_counter()
+        producer.start()
+        try:
+            with self.conn.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", reader,
+                                   size=COPY_READ_SIZE)
+                # Ids are copied explicitly, move the serial sequence past them
+                cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), MAX(id)) FROM {table}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            # Stop and unblock the producer so the thread can exit
+            stop.set()
+            while producer.is_alive():
+                try:
+                    blocks.get_nowait()
+                except queue.Empty:
+                    time.sleep(0.01)
+            if reader.error is not None:
+                raise reader.error
+            raise
+        producer.join()
+        elapsed = time.perf_counter() - start
+        print(f"📥 Copied {counter[0]:,} rows into {table} in {elapsed:.1f}s ({counter[0] / max(elapsed, 1e-9):,.0f} rows/s)")
+        return counter[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,31 @@
+import numpy as np
+
+import distributions
+
+# Batched created_at/updated_at generation for the vectorized engine, same window as get_timestamps()
+
+ONE_YEAR = np.timedelta64(365, 'D')
+
+def _as_us(now):
+    return np.datetime64(now, 'us')
+
+def created(rng, count, now, span=ONE_YEAR, peaks=False):
+    """created_at values spread over [now - span, now], uniformly or with day/hour peaks"""
+    if peaks:
+        return distributions.peak_instants(rng, count, now, span)
+    now = _as_us(now)
+    span_us = int(span / np.timedelta64(1, 'us'))
+    return now - rng.integers(0, span_us + 1, size=count).astype('timedelta64[us]')
+
+def created_updated(rng, count, now, span=ONE_YEAR, peaks=False):
+    """(created_at, updated_at) pairs with updated_at uniform between created_at and now"""
+    created_at = created(rng, count, now, span, peaks)
+    remaining = (_as_us(now) - created_at).astype(np.int64)
+    updated_at = created_at + (rng.random(count) * remaining).astype('timedelta64[us]')
+    return created_at, updated_at
+
+def to_csv_strings(values):
+    """Format datetime64 values like pandas writes them: 'YYYY-MM-DD HH:MM:SS.ffffff'"""
+    if len(values) == 0:
+        return np.array([], dtype=object)
+    return np.char.replace(np.datetime_as_string(values, unit='us'), 'T', ' ')
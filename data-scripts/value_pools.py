@@ -0,0 +1,99 @@
+import os
+import re
+import json
+from functools import lru_cache
+
+import numpy as np
+from faker import Faker
+
+# Faker vocabularies for the people/contact columns, cached on disk and sampled with NumPy.
+
+POOL_VERSION = 1  # bump when the pool layout or sizes change to invalidate old caches
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pool_cache')
+
+POOL_SIZES = {
+    "first_names": 2000,
+    "last_names": 2000,
+    "email_domains": 200,
+    "company_domains": 500,
+    "addresses": 2000,
+    "cities": 500,
+    "states": 200,
+    "countries": 500,
+    "phone_prefixes": 2000,
+}
+
+def _slug(value):
+    return re.sub(r'[^a-z0-9]', '', value.lower())
+
+def _phone_prefix(phone):
+    # Drop extensions and the last four digits, those are drawn per row
+    phone = phone.split('x')[0][:20]
+    return phone[:-4] if len(phone) > 4 and phone[-4:].isdigit() else None
+
+def _draw(method, size):
+    # Faker repeats itself, so the pools hold distinct values in first-seen order
+    return list(dict.fromkeys(method() for _ in range(size)))
+
+def _build_pools(seed, locale):
+    fake = Faker(locale)
+    fake.seed_instance(seed)
+    pools = {
+        "first_names": _draw(fake.first_name, POOL_SIZES["first_names"]),
+        "last_names": _draw(fake.last_name, POOL_SIZES["last_names"]),
+        "email_domains": _draw(fake.free_email_domain, POOL_SIZES["email_domains"]),
+        "company_domains": _draw(fake.domain_name, POOL_SIZES["company_domains"]),
+        "addresses": _draw(fake.address, POOL_SIZES["addresses"]),
+        "cities": _draw(fake.city, POOL_SIZES["cities"]),
+        "states": _draw(fake.state, POOL_SIZES["states"]),
+        "countries": _draw(fake.country, POOL_SIZES["countries"]),
+    }
+    prefixes = (_phone_prefix(fake.phone_number()) for _ in range(POOL_SIZES["phone_prefixes"]))
+    pools["phone_prefixes"] = list(dict.fromkeys(p for p in prefixes if p))
+    return pools
+
+def cache_path(seed, locale):
+    return os.path.join(CACHE_DIR, f"pools_{locale}_{seed}_v{POOL_VERSION}.json")
+
+@lru_cache(maxsize=None)
+def load_pools(seed, locale='en_US'):
+    """Load the value pools for (seed, locale), building and caching them on first use"""
+    path = cache_path(seed, locale)
+    if os.path.exists(path):
+        with open(path) as f:
+            pools = json.load(f)
+    else:
+        pools = _build_pools(seed, locale)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write then rename so parallel workers never read a half-written cache
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(pools, f)
+        os.replace(tmp_path, path)
+    pools = {name: np.array(values, dtype=object) for name, values in pools.items()}
+    pools["email_first"] = np.array([_slug(v) for v in pools["first_names"]], dtype=object)
+    pools["email_last"] = np.array([_slug(v) for v in pools["last_names"]], dtype=object)
+    return pools
+
+def sample(pools, name, rng, count):
+    values = pools[name]
+    return values[rng.integers(0, len(values), size=count)]
+
+def people(pools, rng, ids):
+    """Names and unique emails for the given row ids"""
+    count = len(ids)
+    first = rng.integers(0, len(pools["first_names"]), size=count)
+    last = rng.integers(0, len(pools["last_names"]), size=count)
+    domains = sample(pools, "email_domains", rng, count)
+    names = pools["first_names"][first] + " " + pools["last_names"][last]
+    emails = [f"{f}.{l}{i}@{d}" for f, l, i, d in
+              zip(pools["email_first"][first], pools["email_last"][last], ids, domains)]
+    return names, emails
+
+def phones(pools, rng, count):
+    suffixes = [f"{n:04d}" for n in rng.integers(0, 10000, size=count)]
+    return sample(pools, "phone_prefixes", rng, count) + np.array(suffixes, dtype=object)
+
+def sha256_hashes(rng, count):
+    digest = rng.bytes(32 * count).hex()
+    return [digest[i:i + 64] for i in range(0, len(digest), 64)]
@@ -0,0 +1,276 @@
+import numpy as np
+import pandas as pd
+
+import value_pools
+import timestamps
+import occupancy
+import distributions
+
+# Vectorized generation of the high-volume tables, one NumPy chunk at a time.
+# Every chunk is seeded from SEED, the table and its first id, so it can be rebuilt on its own.
+
+SEED = 42
+
+# Stable per-table keys used when deriving chunk seeds (never reorder)
+TABLE_KEYS = {
+    "cinemas": 1,
+    "seats": 4,
+    "customers": 5,
+    "staff": 6,
+    "screenings": 7,
+    "bookings": 8,
+    "tickets": 9,
+    "payments": 10,
+}
+
+STAFF_ROLES = np.array(['cashier', 'admin', 'manager'], dtype=object)
+SEAT_TYPES = np.array(['regular', 'premium', 'vip'], dtype=object)
+SEATS_PER_ROW = 10
+MAX_TICKETS_PER_BOOKING = 10
+SCREENING_PRICES = np.array([10.00, 12.50, 15.00, 20.00])
+PAYMENT_METHODS = np.array(['cash', 'card', 'digital_wallet', 'bank_transfer'], dtype=object)
+SCREENING_TIMES = np.array([f"{hour:02d}:00:00" for hour in range(10, 23)], dtype=object)  # 10:00 - 22:00
+
+def chunk_seed(table, first_id):
+    """Seed sequence for the chunk of a table starting at first_id"""
+    return np.random.SeedSequence([SEED, TABLE_KEYS[table], first_id])
+
+# created_at/updated_at columns formatted for CSV
+def timestamp_columns(rng, count, now, span=timestamps.ONE_YEAR, peaks=False):
+    created, updated = timestamps.created_updated(rng, count, now, span, peaks)
+    return {
+        "created_at": timestamps.to_csv_strings(created),
+        "updated_at": timestamps.to_csv_strings(updated)
+    }
+
+# Days back from today, as datetime64 dates
+def days_ago(rng, low, high, count, now):
+    return np.datetime64(now.date(), 'D') - rng.integers(low, high, size=count)
+
+def cinema_chunk(start_id, count, rng, now):
+    pools = value_pools.load_pools(SEED)
+    ids = np.arange(start_id, start_id + count)
+    return pd.DataFrame({
+        "id": ids,
+        "name": [f"Cinema {i}" for i in ids],
+        "address": value_pools.sample(pools, "addresses", rng, count),
+        "city": value_pools.sample(pools, "cities", rng, count),
+        "state": value_pools.sample(pools, "states", rng, count),
+        "country": value_pools.sample(pools, "countries", rng, count),
+        "phone": value_pools.phones(pools, rng, count),
+        "email": [f"info{i}@{d}" for i, d in zip(ids, value_pools.sample(pools, "company_domains", rng, count))],
+        "is_active": True,
+        **timestamp_columns(rng, count, now)
+    })
+
+def customer_chunk(start_id, count, rng, now):
+    pools = value_pools.load_pools(SEED)
+    ids = np.arange(start_id, start_id + count)
+    names, emails = value_pools.people(pools, rng, ids)
+    return pd.DataFrame({
+        "id": ids,
+        "name": names,
+        "email": emails,
+        "phone": value_pools.phones(pools, rng, count),
+        "password": value_pools.sha256_hashes(rng, count),  # Hashed password
+        "date_of_birth": days_ago(rng, 18 * 365, 81 * 365, count, now),  # 18 to 80 years old
+        **timestamp_columns(rng, count, now)
+    })
+
+def staff_chunk(start_id, count, rng, now):
+    pools = value_pools.load_pools(SEED)
+    ids = np.arange(start_id, start_id + count)
+    names, emails = value_pools.people(pools, rng, ids)
+    return pd.DataFrame({
+        "id": ids,
+        "name": names,
+        "email": emails,
+        "password": value_pools.sha256_hashes(rng, count),
+        "role": STAFF_ROLES[rng.integers(0, len(STAFF_ROLES), size=count)],
+        "phone": value_pools.phones(pools, rng, count),
+        "hired_date": days_ago(rng, 0, 2 * 365, count, now),  # within the last 2 years
+        "is_active": True,
+        **timestamp_columns(rng, count, now)
+    })
+
+# Seat ids are laid out theater by theater: theater t owns ids (t-1)*S+1 .. t*S
+def seat_chunk(start_id, count, rng, now, seats_per_theater):
+    ids = np.arange(start_id, start_id + count)
+    local = (ids - 1) % seats_per_theater
+    return pd.DataFrame({
+        "id": ids,
+        "theater_id": (ids - 1) // seats_per_theater + 1,
+        "row_number": row_labels(local // SEATS_PER_ROW),
+        "seat_number": local % SEATS_PER_ROW + 1,
+        "seat_type": SEAT_TYPES[rng.integers(0, len(SEAT_TYPES), size=count)],
+        **timestamp_columns(rng, count, now)
+    })
+
+# A, B, ... Z, AA, AB, ... for row indexes
+def row_labels(rows):
+    labels = []
+    for row in range(int(rows.max(initial=0)) + 1):
+        label = ""
+        row += 1
+        while row:
+            row, rem = divmod(row - 1, 26)
+            label = chr(65 + rem) + label
+        labels.append(label)
+    return np.array(labels, dtype=object)[rows]
+
+# The draws are shared with the replay helpers below, keep their order stable
+def screening_draws(rng, count, movie_count, theater_count, days=31, first_day=None, skew=None):
+    skew = skew or distributions.UNIFORM
+    return {
+        "day_offsets": distributions.day_offsets(rng, count, first_day, days, skew["peaks"]),
+        "movie_id": distributions.zipf_ids(rng, count, movie_count, skew["movies"], SEED),
+        "theater_id": rng.integers(1, theater_count + 1, size=count),
+        "time_index": distributions.screening_hours(rng, count, skew["peaks"]),
+        "price_index": rng.integers(0, len(SCREENING_PRICES), size=count),
+    }
+
+# Screenings fall on `days` consecutive days starting at first_day (default: today)
+def screening_chunk(start_id, count, rng, now, movie_count, theater_count, first_day=None, days=31,
+                    span=timestamps.ONE_YEAR, skew=None):
+    first_day = first_day or now.date()
+    draws = screening_draws(rng, count, movie_count, theater_count, days, first_day, skew)
+    return pd.DataFrame({
+        "id": np.arange(start_id, start_id + count),
+        "movie_id": draws["movie_id"],
+        "theater_id": draws["theater_id"],
+        "screening_date": np.datetime64(first_day, 'D') + draws["day_offsets"],
+        "screening_time": SCREENING_TIMES[draws["time_index"]],
+        "price": SCREENING_PRICES[draws["price_index"]],
+        **timestamp_columns(rng, count, now, span)
+    })
+
+# Bookings reference screenings first_screening_id .. first_screening_id + screening_count - 1
+def booking_draws(rng, count, customer_count, screening_count, staff_count, first_screening_id=1, skew=None):
+    skew = skew or distributions.UNIFORM
+    return {
+        "staff_id": rng.integers(1, staff_count + 1, size=count),
+        "walk_in": rng.random(count) < 0.3,  # 30% of bookings are made at the counter
+        "customer_id": distributions.zipf_ids(rng, count, customer_count, skew["customers"], SEED),
+        "screening_id": rng.integers(first_screening_id, first_screening_id + screening_count, size=count),
+    }
+
+def booking_chunk(start_id, count, rng, now, customer_count, screening_count, staff_count, first_screening_id=1,
+                  span=timestamps.ONE_YEAR, skew=None):
+    skew = skew or distributions.UNIFORM
+    draws = booking_draws(rng, count, customer_count, screening_count, staff_count, first_screening_id, skew)
+    return pd.DataFrame({
+        "id": np.arange(start_id, start_id + count),
+        "customer_id": draws["customer_id"],
+        "screening_id": draws["screening_id"],
+        "status": 'confirmed',
+        "created_by_staff_id": pd.arrays.IntegerArray(draws["staff_id"], ~draws["walk_in"]),
+        **timestamp_columns(rng, count, now, span, skew["peaks"])
+    })
+
+# One payment per booking; booking ids trail payment ids by booking_id_offset
+def payment_chunk(start_id, count, rng, now, amounts, booking_id_offset=0, span=timestamps.ONE_YEAR):
+    ids = np.arange(start_id, start_id + count)
+    return pd.DataFrame({
+        "id": ids,
+        "booking_id": ids + booking_id_offset,
+        "amount": amounts,  # tickets actually sold x screening price
+        "method": PAYMENT_METHODS[rng.integers(0, len(PAYMENT_METHODS), size=count)],
+        "status": 'completed',
+        **timestamp_columns(rng, count, now, span)
+    })
+
+CHUNK_BUILDERS = {
+    "cinemas": cinema_chunk,
+    "seats": seat_chunk,
+    "customers": customer_chunk,
+    "staff": staff_chunk,
+    "screenings": screening_chunk,
+    "bookings": booking_chunk,
+    "payments": payment_chunk,
+}
+
+def chunk_ranges(total, chunk_size, first_id=1):
+    """(chunk_index, start_id, count) for every chunk of ids first_id .. first_id + total - 1"""
+    for chunk_index, start in enumerate(range(0, total, chunk_size)):
+        yield chunk_index, first_id + start, min(chunk_size, total - start)
+
+def chunk_tasks(table, total, chunk_size, params, chunk_params=None, first_id=1):
+    """(table, chunk_index, start_id, count, params) per chunk; chunk_params(start_id, count) adds
+    chunk-specific arrays so large per-row inputs are never shipped whole to every worker"""
+    for chunk_index, start_id, count in chunk_ranges(total, chunk_size, first_id):
+        extra = chunk_params(start_id, count) if chunk_params else {}
+        yield table, chunk_index, start_id, count, {**params, **extra}
+
+def build_chunk(table, chunk_index, start_id, count, params):
+    """Build one chunk; depends only on its arguments so it can run in any process"""
+    rng = np.random.default_rng(chunk_seed(table, start_id))
+    return CHUNK_BUILDERS[table](start_id, count, rng, **params)
+
+def table_frames(table, total, chunk_size, chunk_params=None, first_id=1, **params):
+    """Yield DataFrame chunks covering ids first_id .. first_id + total - 1 for a vectorized table"""
+    for task in chunk_tasks(table, total, chunk_size, params, chunk_params, first_id):
+        yield build_chunk(*task)
+        print(f"Generated {task[2] + task[3] - first_id} {table}...")
+
+def screening_keys(total, chunk_size, movie_count, theater_count, first_id=1, days=31, first_day=None, skew=None):
+    """Replay the screening chunks' draws: theater id and price in cents per screening,
+    indexed by screening_id - first_id + 1"""
+    theaters = np.zeros(total + 1, dtype=np.int32)
+    price_cents = np.zeros(total + 1, dtype=np.int32)
+    for _, start_id, count in chunk_ranges(total, chunk_size, first_id):
+        rng = np.random.default_rng(chunk_seed("screenings", start_id))
+        draws = screening_draws(rng, count, movie_count, theater_count, days, first_day, skew)
+        offset = start_id - first_id + 1
+        theaters[offset:offset + count] = draws["theater_id"]
+        price_cents[offset:offset + count] = np.round(SCREENING_PRICES[draws["price_index"]] * 100)
+    return theaters, price_cents
+
+def ticket_frames(booking_count, chunk_size, now, customer_count, screening_count, staff_count,
+                  screening_theaters, screening_prices, seats_per_theater, tickets_per_booking, amounts_out,
+                  first_booking_id=1, first_screening_id=1, first_ticket_id=1, span=timestamps.ONE_YEAR, skew=None):
+    """Yield tickets booking chunk by booking chunk, seating every ticket in its screening's theater.
+
+    Each booking chunk is replayed from its seed to recover screening ids and created_at, the number
+    of tickets per booking is drawn around tickets_per_booking, and seats come from a SeatOccupancy
+    so no seat is sold twice for a screening. amounts_out[booking_id - first_booking_id + 1] receives
+    the payment amount (tickets actually seated x screening price, in cents).
+    """
+    skew = skew or distributions.UNIFORM
+    seating = occupancy.SeatOccupancy(screening_count, seats_per_theater)
+    next_ticket_id = first_ticket_id
+    dropped = 0
+    for _, start_id, count in chunk_ranges(booking_count, chunk_size, first_booking_id):
+        rng = np.random.default_rng(chunk_seed("bookings", start_id))
+        bookings = booking_draws(rng, count, customer_count, screening_count, staff_count, first_screening_id, skew)
+        booked_at, _ = timestamps.created_updated(rng, count, now, span, skew["peaks"])
+        # Screening ids relative to this run's first screening
+        booked = bookings["screening_id"] - first_screening_id + 1
+
+        # Every booking holds at least one ticket
+        rng = np.random.default_rng(chunk_seed("tickets", start_id))
+        wanted = 1 + rng.poisson(max(tickets_per_booking - 1, 0), size=count)
+        wanted = np.minimum(wanted, min(MAX_TICKETS_PER_BOOKING, seats_per_theater))
+        booking_index = np.repeat(np.arange(count), wanted)
+        screenings = booked[booking_index]
+        seats = seating.reserve(screenings, rng)
+
+        # Sold-out screenings: the booking keeps only the seats it got
+        seated = seats >= 0
+        dropped += int((~seated).sum())
+        booking_index, screenings, seats = booking_index[seated], screenings[seated], seats[seated]
+        seated_per_booking = np.bincount(booking_index, minlength=count)
+        offset = start_id - first_booking_id + 1
+        amounts_out[offset:offset + count] = seated_per_booking * screening_prices[booked]
+
+        ticket_count = len(seats)
+        if ticket_count == 0:
+            continue
+        yield pd.DataFrame({
+            "id": np.arange(next_ticket_id, next_ticket_id + ticket_count),
+            "booking_id": start_id + booking_index,
+            "seat_id": (screening_theaters[screenings].astype(np.int64) - 1) * seats_per_theater + seats + 1,
+            "created_at": timestamps.to_csv_strings(booked_at[booking_index])  # issued with the booking
+        })
+        next_ticket_id += ticket_count
+        print(f"Generated {next_ticket_id - first_ticket_id} tickets for {start_id + count - first_booking_id} bookings...")
+    print(f"🪑 Seat occupancy {seating.fill_rate():.1%}, {dropped} tickets dropped for sold-out screenings")
@@ -0,0 +1,420 @@
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import hashlib
+import functools
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import psycopg2
+from dotenv import load_dotenv
+
+import stats
+import plans
+import throughput
+import keys
+import results_store
+import server_stats
+
+# Benchmark engine shared by the query sets (simple.py, complex.py): every test's query is timed
+# without and with its index, and the results are appended as JSON Lines.
+
+# Load environment variables
+load_dotenv()
+
+# Create results directory if it doesn't exist
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+os.makedirs(RESULTS_DIR, exist_ok=True)
+
+# Database connection parameters from environment variables
+DB_PARAMS = {
+    "dbname": os.getenv("DB_NAME", "cinema"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "postgres"),
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5432")
+}
+
+DEFAULT_WARMUP = 2
+DEFAULT_ITERATIONS = 20
+DEFAULT_TIME_BUDGET = 30.0  # seconds per measurement, warmup excluded
+DEFAULT_DURATION = 10.0  # seconds per concurrency level
+STREAM_CURSOR = "benchmark_stream"
+
+# Planner and memory settings that change the timings, recorded with every run
+SERVER_SETTINGS = ["server_version", "shared_buffers", "effective_cache_size", "work_mem",
+                   "random_page_cost", "max_parallel_workers_per_gather", "jit"]
+
+def add_arguments(parser, throughput_mode=True):
+    """Options common to every query set"""
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'Untimed runs before measuring (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help=f'Timed runs per measurement (default: {DEFAULT_ITERATIONS})')
+    parser.add_argument('--time-budget', type=float, default=DEFAULT_TIME_BUDGET,
+                        help=f'Stop a measurement after this many seconds of timed runs, keeping at least one '
+                             f'(default: {DEFAULT_TIME_BUDGET:g})')
+    if throughput_mode:
+        parser.add_argument('--concurrency', type=throughput.parse_levels, metavar='LEVELS',
+                            help='Throughput mode: ramp through these client counts (e.g. 1,2,4,8,16) and report '
+                                 'queries/s and latency percentiles per level instead of single-client timings')
+        parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                            help=f'Seconds per concurrency level in throughput mode (default: {DEFAULT_DURATION:g})')
+    parser.add_argument('--itersize', type=int, metavar='ROWS',
+                        help='Stream results through a named server-side cursor, ROWS per round trip, and '
+                             'record the time to the first row (default: fetchall on a client-side cursor)')
+    parser.add_argument('--keys', choices=keys.MODES, default='uniform',
+                        help='Query parameters: uniform samples of real keys, a few hot keys, keys that '
+                             'match nothing, or the original literal constants (default: uniform)')
+    parser.add_argument('--key-sample', type=int, default=keys.DEFAULT_SAMPLE,
+                        help=f'Keys sampled per test in uniform mode (default: {keys.DEFAULT_SAMPLE:,})')
+    parser.add_argument('--no-explain', dest='explain', action='store_false',
+                        help='Skip capturing EXPLAIN (ANALYZE, BUFFERS) plans')
+    parser.add_argument('--no-server-stats', dest='server_stats', action='store_false',
+                        help='Skip the pg_stat_*/pg_statio_* (and pg_stat_statements) snapshots around measurements')
+    parser.add_argument('--only', nargs='+', metavar='INDEX',
+                        help='Only run the tests of these indexes')
+    parser.add_argument('--output',
+                        help='JSON Lines file the results are appended to (default: results/results_<suite>.jsonl)')
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment(conn):
+    """Client, server and repository details the timings depend on"""
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name, setting || COALESCE(unit, '') FROM pg_settings WHERE name = ANY(%s)",
+                       (SERVER_SETTINGS,))
+        settings = dict(cursor.fetchall())
+        cursor.execute("SELECT current_database(), pg_database_size(current_database())")
+        database, database_bytes = cursor.fetchone()
+    conn.commit()
+    return {
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "psycopg2": psycopg2.__version__.split()[0],
+        "git_revision": git_revision(),
+        "database": database,
+        "database_bytes": database_bytes,
+        "db_host": DB_PARAMS["host"],
+        "server_settings": settings,
+    }
+
+def schema_version(conn):
+    """Short hash of the tables' columns and types; indexes are left out, the benchmarks change them"""
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT table_name, column_name, data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() ORDER BY table_name, ordinal_position
+        """)
+        columns = cursor.fetchall()
+    conn.commit()
+    return hashlib.sha1(repr(columns).encode()).hexdigest()[:10]
+
+def dataset_profile(conn):
+    """DATASET_PROFILE from the environment (small, medium, large...), else the size of bookings"""
+    if os.getenv("DATASET_PROFILE"):
+        return os.getenv("DATASET_PROFILE")
+    with conn.cursor() as cursor:
+        # The planner's estimate, exact enough to tell the profiles apart without a count(*)
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass('bookings')")
+        row = cursor.fetchone()
+    conn.commit()
+    bookings = max(row[0], 0) if row else 0
+    return f"{bookings / 1e6:.1f}M bookings" if bookings >= 1e5 else f"{bookings / 1e3:.0f}K bookings"
+
+def connect():
+    try:
+        return psycopg2.connect(**DB_PARAMS)
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        sys.exit(1)
+
+def run_record(conn, suite, config):
+    """The "run" record opening a results file section; its run_id keys every following record"""
+    return {
+        "type": "run",
+        "run_id": uuid.uuid4().hex[:12],
+        "suite": suite,
+        "started_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "schema_version": schema_version(conn),
+        "dataset_profile": dataset_profile(conn),
+        "config": config,
+        "environment": environment(conn),
+    }
+
+def run_query(cursor, conn, query, params, itersize=None):
+    """One execution including the fetch: (milliseconds, rows, milliseconds to the first row).
+
+    With itersize the first row is fetched alone, then the others itersize rows per round trip through
+    a named server-side cursor, counted without being kept; otherwise fetchall() materializes them
+    and the time to the first row is None."""
+    start = time.perf_counter()
+    if not itersize:
+        cursor.execute(query, params)
+        rows = len(cursor.fetchall())  # Ensure query completes
+        conn.commit()  # Commit after each query
+        return (time.perf_counter() - start) * 1000, rows, None  # Convert to milliseconds
+    with conn.cursor(name=STREAM_CURSOR) as stream:
+        # DECLARE, no row is sent yet; planned for the first cursor_tuple_fraction (10%) of the rows
+        stream.execute(query, params)
+        rows = len(stream.fetchmany(1))
+        first_row = (time.perf_counter() - start) * 1000
+        while rows:
+            chunk = stream.fetchmany(itersize)
+            if not chunk:
+                break
+            rows += len(chunk)
+    conn.commit()
+    return (time.perf_counter() - start) * 1000, rows, first_row
+
+def _rss_kb(field):
+    """VmRSS/VmHWM of this process from /proc (Linux), None elsewhere"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def reset_peak_rss():
+    """Restart the peak RSS from the current RSS; False where the peak can't be reset"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_bytes():
+    """Peak resident memory of this process since the last reset (or since it started)"""
+    peak = _rss_kb("VmHWM")
+    if peak is not None:
+        return peak * 1024
+    import resource
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024  # bytes on macOS, KB elsewhere
+
+def measure(cursor, conn, query, next_params, warmup, iterations, time_budget, itersize=None):
+    """Warm up, then time up to iterations runs within time_budget seconds. None if the query fails,
+    else the raw timings_ms and rows per run, first_row_ms (streaming only) and the client's peak
+    RSS over the timed runs"""
+    result = {"timings_ms": [], "rows": [], "first_row_ms": [] if itersize else None}
+    try:
+        for _ in range(warmup):
+            run_query(cursor, conn, query, next_params(), itersize)
+        result["peak_rss_reset"] = reset_peak_rss()
+        result["rss_before_bytes"] = (_rss_kb("VmRSS") or 0) * 1024
+        deadline = time.perf_counter() + time_budget
+        while len(result["timings_ms"]) < iterations:
+            elapsed, count, first_row = run_query(cursor, conn, query, next_params(), itersize)
+            result["timings_ms"].append(elapsed)
+            result["rows"].append(count)
+            if itersize:
+                result["first_row_ms"].append(first_row)
+            if time.perf_counter() >= deadline:
+                break
+    except Exception as e:
+        print(f"Query failed: {e}")
+        conn.rollback()  # Rollback on error
+        return None
+    result["peak_rss_bytes"] = peak_rss_bytes()
+    return result
+
+def format_client(measured):
+    """Time to first row and fetch time when streaming, and the client's peak memory"""
+    line = ""
+    if measured["first_row_ms"]:
+        first_row = stats.summarize(measured["first_row_ms"])
+        fetch = stats.summarize([total - first for total, first in zip(measured["timings_ms"],
+                                                                       measured["first_row_ms"])])
+        line = f"first row p50 {first_row['p50']:.2f}ms, then fetch p50 {fetch['p50']:.2f}ms, "
+    growth = measured["peak_rss_bytes"] - measured["rss_before_bytes"]
+    return line + f"client peak RSS {measured['peak_rss_bytes'] / 1024 ** 2:,.1f}MB ({growth / 1024 ** 2:+,.1f}MB)"
+
+def format_summary(summary):
+    return (f"p50 {summary['p50']:.2f}ms  p95 {summary['p95']:.2f}ms  p99 {summary['p99']:.2f}ms  "
+            f"mean {summary['mean']:.2f}ms ±{summary['ci95_high'] - summary['mean']:.2f}  "
+            f"sd {summary['stddev']:.2f}  (n={summary['n']})")
+
+def write_records(path, records):
+    """Append the records to the JSON Lines file and save them in the results store"""
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+    try:
+        results_store.save(records)
+    except Exception as e:
+        print(f"⚠️  Could not save the run in {results_store.STORE_PATH}: {e}")
+
+def run_suite(suite, tests, args):
+    """Benchmark every test without and with its index.
+
+    tests is a list of dicts with "index" (name), "create" (CREATE INDEX statement) and "query"."""
+    if args.only:
+        tests = [test for test in tests if test["index"] in args.only]
+    output = args.output or os.path.join(RESULTS_DIR, f"results_{suite}.jsonl")
+    config = {"warmup": args.warmup, "iterations": args.iterations, "time_budget_s": args.time_budget,
+              "explain": args.explain, "concurrency": args.concurrency, "duration_s": args.duration,
+              "keys": args.keys, "key_sample": args.key_sample, "server_stats": args.server_stats,
+              "itersize": args.itersize}
+    conn = connect()
+    cursor = conn.cursor()
+    pool = None
+    if args.concurrency:
+        from psycopg2.pool import ThreadedConnectionPool
+        pool = ThreadedConnectionPool(1, max(args.concurrency), **DB_PARAMS)
+    records = [run_record(conn, suite, config)]
+    run_id = records[0]["run_id"]
+    if pool:
+        print(f"📍 Run {run_id}: {len(tests)} test(s), {args.warmup} warmup runs per client, then "
+              f"{args.duration:g}s at each of {', '.join(map(str, args.concurrency))} client(s)")
+    else:
+        print(f"📍 Run {run_id}: {len(tests)} test(s), {args.warmup} warmup + up to {args.iterations} runs "
+              f"or {args.time_budget:g}s per measurement")
+    print(f"🔑 Query keys: {args.keys}")
+    if args.itersize:
+        if pool:
+            print("⚠️  --itersize only applies to single-client measurements, the clients use fetchall")
+        else:
+            print(f"🚰 Streaming results {args.itersize:,} rows at a time through a server-side cursor")
+    statements = args.server_stats and server_stats.statements_available(cursor, conn)
+
+    unused = []
+    try:
+        for test in tests:
+            index_name = test["index"]
+            print(f"\nTesting {index_name}...")
+            summaries = {}
+            peaks = {}  # peak queries/s per index state in throughput mode
+
+            try:
+                next_params = keys.sampler(cursor, conn, index_name, args.keys, args.key_sample)
+            except Exception as e:
+                print(f"Failed to sample keys: {e}")
+                conn.rollback()
+                continue
+            if next_params is None:
+                continue
+
+            # Drop index if exists
+            try:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                conn.commit()
+            except Exception as e:
+                print(f"Failed to drop index: {e}")
+                conn.rollback()
+                continue
+
+            for applied in (False, True):
+                if applied:
+                    print(f"Creating index with: {test['create']}")
+                    try:
+                        cursor.execute(test["create"])
+                        conn.commit()
+                    except Exception as e:
+                        print(f"Failed to create index: {e}")
+                        conn.rollback()
+                        break
+
+                next_params.restart()
+                if pool:
+                    print(f"   {'with' if applied else 'without'} index:")
+                    snapshot = functools.partial(server_stats.snapshot, cursor, conn, statements,
+                                                 wait=server_stats.FLUSH_WAIT) if args.server_stats else None
+                    levels = throughput.ramp(pool, test["query"], next_params, args.concurrency, args.warmup,
+                                             args.duration, snapshot)
+                    peaks[applied] = max(level["qps"] for level in levels)
+                    saturated_at = throughput.saturation(levels)
+                    if saturated_at:
+                        print(f"   📈 saturates at {saturated_at} client(s), peak {peaks[applied]:,.1f} qps")
+                    records += [{
+                        "type": "throughput",
+                        "run_id": run_id,
+                        "suite": suite,
+                        "index_name": index_name,
+                        "index_applied": applied,
+                        "query": test["query"],
+                        "keys": args.keys,
+                        "saturation_clients": saturated_at,
+                        **level,
+                    } for level in levels]
+                    continue
+
+                before = server_stats.snapshot(cursor, conn, statements) if args.server_stats else None
+                measured = measure(cursor, conn, test["query"], next_params, args.warmup, args.iterations,
+                                   args.time_budget, args.itersize)
+                if not measured:
+                    continue
+                # Taken before the EXPLAIN below, which runs the query once more
+                changes = server_stats.delta(before, server_stats.snapshot(cursor, conn, statements)) if before else None
+                times, rows = measured["timings_ms"], measured["rows"]
+                summary = stats.summarize(times)
+                summaries[applied] = summary
+                budget_exhausted = len(times) < args.iterations
+                print(f"   {'with' if applied else 'without'} index: {format_summary(summary)}"
+                      f"{'  ⏱️ time budget reached' if budget_exhausted else ''}")
+                print(f"      rows per query: mean {sum(rows) / len(rows):,.1f}, max {max(rows):,}")
+                print(f"      {format_client(measured)}")
+                if changes:
+                    print(f"      {server_stats.format_summary(changes)}")
+                plan, plan_summary, index_used = None, None, None
+                explain_params = next_params()
+                if args.explain:
+                    try:
+                        plan = plans.explain(cursor, conn, test["query"], explain_params)
+                    except Exception as e:
+                        print(f"Failed to capture the plan: {e}")
+                        conn.rollback()
+                if plan:
+                    plan_summary = plans.summarize(plan)
+                    print(f"      {plans.format_summary(plan_summary)}")
+                    if applied:
+                        index_used = index_name in plan_summary["indexes_used"]
+                        if not index_used:
+                            print(f"   ⚠️  The planner did not use {index_name}")
+                            unused.append(index_name)
+                records.append({
+                    "type": "measurement",
+                    "run_id": run_id,
+                    "suite": suite,
+                    "index_name": index_name,
+                    "index_applied": applied,
+                    "query": test["query"],
+                    "keys": args.keys,
+                    "budget_exhausted": budget_exhausted,
+                    **measured,
+                    "stats_ms": summary,
+                    "index_used": index_used,
+                    "explain_params": explain_params if plan else None,
+                    "plan_summary": plan_summary,
+                    "plan": plan,
+                    "server_stats": changes,
+                })
+
+            if len(peaks) == 2:
+                print(f"   peak throughput: {peaks[False]:,.1f} -> {peaks[True]:,.1f} qps")
+            if len(summaries) == 2:
+                print(f"   speedup (p50): {summaries[False]['p50'] / max(summaries[True]['p50'], 1e-9):.1f}x")
+    finally:
+        # Keep whatever was measured if the run is interrupted
+        write_records(output, records)
+        cursor.close()
+        conn.close()
+        if pool:
+            pool.closeall()
+    if unused:
+        print(f"\n⚠️  Indexes not used by their own query: {', '.join(unused)}")
+    print(f"\nResults have been written to {output}")
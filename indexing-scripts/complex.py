@@ -1,25 +1,8 @@
-import psycopg2
-import time
-import csv
-from datetime import datetime, timedelta
-import os
-from dotenv import load_dotenv
+import argparse
 
-# Load environment variables
-load_dotenv()
+import benchmark
 
-# Create results directory if it doesn't exist
-RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
-os.makedirs(RESULTS_DIR, exist_ok=True)
-
-# Database connection parameters from environment variables
-DB_PARAMS = {
-    "dbname": os.getenv("DB_NAME", "cinema"),
-    "user": os.getenv("DB_USER", "postgres"),
-    "password": os.getenv("DB_PASSWORD", "postgres"),
-    "host": os.getenv("DB_HOST", "localhost"),
-    "port": os.getenv("DB_PORT", "5432")
-}
+# Multi-join queries, one per index. Timing, statistics and results are handled by benchmark.py.
 
 # Index definitions with their CREATE statements
 index_definitions = {
@@ -45,9 +28,9 @@ test_queries = {
         FROM cinemas c
         LEFT JOIN theaters t ON c.id = t.cinema_id
         LEFT JOIN screenings s ON t.id = s.theater_id
-        WHERE c.city = 'Phnom Penh' 
-        AND c.state = 'Phnom Penh' 
-        AND c.country = 'Cambodia'
+        WHERE c.city = %(city)s 
+        AND c.state = %(state)s 
+        AND c.country = %(country)s
         GROUP BY c.id;
     """,
     
@@ -58,7 +41,7 @@ test_queries = {
         FROM theaters t
         JOIN cinemas c ON t.cinema_id = c.id
         LEFT JOIN screenings s ON t.id = s.theater_id
-        WHERE t.cinema_id = 1
+        WHERE t.cinema_id = %(cinema_id)s
         GROUP BY t.id, c.name;
     """,
     
@@ -70,8 +53,8 @@ test_queries = {
         JOIN movies m ON s.movie_id = m.id
         JOIN theaters t ON s.theater_id = t.id
         LEFT JOIN bookings b ON s.id = b.screening_id
-        WHERE s.movie_id = 1 
-        AND s.screening_date = CURRENT_DATE
+        WHERE s.movie_id = %(movie_id)s 
+        AND s.screening_date = %(screening_date)s
         GROUP BY s.id, m.title, t.name;
     """,
     
@@ -84,8 +67,8 @@ test_queries = {
         JOIN movies m ON s.movie_id = m.id
         JOIN cinemas c ON t.cinema_id = c.id
         LEFT JOIN bookings b ON s.id = b.screening_id
-        WHERE s.theater_id = 1 
-        AND s.screening_date = CURRENT_DATE
+        WHERE s.theater_id = %(theater_id)s 
+        AND s.screening_date = %(screening_date)s
         GROUP BY s.id, m.title, t.name, c.name;
     """,
     
@@ -99,7 +82,7 @@ test_queries = {
         LEFT JOIN payments p ON b.id = p.booking_id
         LEFT JOIN screenings s ON b.screening_id = s.id
         LEFT JOIN movies m ON s.movie_id = m.id
-        WHERE c.email = 'test@example.com'
+        WHERE c.email = %(email)s
         GROUP BY c.id;
     """,
     
@@ -111,7 +94,7 @@ test_queries = {
         FROM customers c
         LEFT JOIN bookings b ON c.id = b.customer_id
         LEFT JOIN screenings s ON b.screening_id = s.id
-        WHERE c.phone = '+855123456789'
+        WHERE c.phone = %(phone)s
         GROUP BY c.id;
     """,
     
@@ -128,7 +111,7 @@ test_queries = {
         JOIN theaters t ON s.theater_id = t.id
         LEFT JOIN payments p ON b.id = p.booking_id
         LEFT JOIN tickets tk ON b.id = tk.booking_id
-        WHERE b.customer_id = 1
+        WHERE b.customer_id = %(customer_id)s
         GROUP BY b.id, c.name, m.title, t.name, p.amount;
     """,
     
@@ -142,7 +125,7 @@ test_queries = {
         JOIN movies m ON s.movie_id = m.id
         LEFT JOIN tickets t ON b.id = t.booking_id
         LEFT JOIN payments p ON b.id = p.booking_id
-        WHERE b.screening_id = 1
+        WHERE b.screening_id = %(screening_id)s
         GROUP BY b.id, s.screening_date, s.screening_time, m.title;
     """,
     
@@ -155,7 +138,8 @@ test_queries = {
         FROM bookings b
         LEFT JOIN payments p ON b.id = p.booking_id
         JOIN screenings s ON b.screening_id = s.id
-        WHERE b.created_at >= CURRENT_DATE - INTERVAL '1 day'
+        WHERE b.created_at >= %(day)s::date - INTERVAL '1 day'
+        AND b.created_at < %(day)s::date + INTERVAL '1 day'
         GROUP BY DATE(b.created_at);
     """,
     
@@ -170,7 +154,7 @@ test_queries = {
         JOIN screenings sc ON b.screening_id = sc.id
         JOIN movies m ON sc.movie_id = m.id
         JOIN theaters th ON sc.theater_id = th.id
-        WHERE t.booking_id = 1;
+        WHERE t.booking_id = %(booking_id)s;
     """,
     
     "idx_tickets_seat": """
@@ -184,7 +168,7 @@ test_queries = {
         JOIN bookings b ON t.booking_id = b.id
         JOIN screenings sc ON b.screening_id = sc.id
         JOIN movies m ON sc.movie_id = m.id
-        WHERE t.seat_id = 1;
+        WHERE t.seat_id = %(seat_id)s;
     """,
     
     "idx_payments_booking": """
@@ -198,7 +182,7 @@ test_queries = {
         JOIN screenings s ON b.screening_id = s.id
         JOIN movies m ON s.movie_id = m.id
         LEFT JOIN tickets t ON b.id = t.booking_id
-        WHERE p.booking_id = 1
+        WHERE p.booking_id = %(booking_id)s
         GROUP BY p.id, b.status, c.name, m.title;
     """,
     
@@ -210,103 +194,21 @@ test_queries = {
         COUNT(DISTINCT b.screening_id) as unique_screenings
         FROM payments p
         JOIN bookings b ON p.booking_id = b.id
-        WHERE p.status = 'pending'
+        WHERE p.status = %(status)s
         GROUP BY p.status;
     """
 }
 
-def run_test(cursor, conn, query, runs=3):
-    times = []
-    for _ in range(runs):
-        start = time.perf_counter()
-        try:
-            cursor.execute(query)
-            cursor.fetchall()  # Ensure query completes
-            conn.commit()  # Commit after each query
-        except Exception as e:
-            print(f"Query failed: {e}")
-            conn.rollback()  # Rollback on error
-            return None
-        end = time.perf_counter()
-        times.append((end - start) * 1000)  # Convert to milliseconds
-    return times
-
-def write_results(results, filename='results_complex.csv'):
-    file_path = os.path.join(RESULTS_DIR, filename)
-    file_exists = os.path.isfile(file_path)
-    
-    with open(file_path, 'a', newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(['index_name', 'query_type', 'run_1_ms', 'run_2_ms', 'run_3_ms', 'avg_ms', 'index_applied', 'query'])
-        writer.writerows(results)
+TESTS = [
+    {"index": index_name, "create": index_definitions[index_name], "query": query}
+    for index_name, query in test_queries.items()
+]
 
 def main():
-    results = []
-    
-    try:
-        conn = psycopg2.connect(**DB_PARAMS)
-        cursor = conn.cursor()
-        
-        for index_name, query in test_queries.items():
-            print(f"\nTesting {index_name}...")
-            
-            # Drop index if exists
-            try:
-                cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
-                conn.commit()
-            except Exception as e:
-                print(f"Failed to drop index: {e}")
-                conn.rollback()
-                continue
-            
-            # Test without index
-            times_without = run_test(cursor, conn, query)
-            if times_without:
-                avg_without = sum(times_without) / len(times_without)
-                results.append([
-                    index_name,
-                    'complex',
-                    *times_without,
-                    avg_without,
-                    False,
-                    query
-                ])
-            
-            # Create index using predefined statement
-            create_index_sql = index_definitions[index_name]
-            print(f"Creating index with: {create_index_sql}")
-            try:
-                cursor.execute(create_index_sql)
-                conn.commit()
-            except Exception as e:
-                print(f"Failed to create index: {e}")
-                conn.rollback()
-                continue
-            
-            # Test with index
-            times_with = run_test(cursor, conn, query)
-            if times_with:
-                avg_with = sum(times_with) / len(times_with)
-                results.append([
-                    index_name,
-                    'complex',
-                    *times_with,
-                    avg_with,
-                    True,
-                    query
-                ])
-        
-        write_results(results)
-        print(f"\nResults have been written to {os.path.join(RESULTS_DIR, 'results_complex.csv')}")
-        
-    except Exception as e:
-        print(f"Database connection failed: {e}")
-    finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
+    parser = argparse.ArgumentParser(description='Complex query index benchmark')
+    benchmark.add_arguments(parser)
+    args = parser.parse_args()
+    benchmark.run_suite('complex', TESTS, args)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,136 @@
+import random
+import threading
+from datetime import date, timedelta
+
+# Key sampling for the parameterized benchmark queries (--keys), reproducible on the same data.
+
+MODES = ["uniform", "hot", "miss", "literal"]  # any sampled key, one of HOT_KEYS, missing keys, original constants
+DEFAULT_SAMPLE = 10_000
+HOT_KEYS = 10
+SEED = 0.42  # setseed() takes a value in [-1, 1]
+
+MISSING_DAY = date(1900, 1, 1)
+
+# Per index: where its keys come from (columns named like the placeholders), the original
+# constants, and how to make the n-th missing key (None: every value of the domain exists)
+KEY_SOURCES = {
+    "idx_cinemas_location": {
+        "sample": "SELECT city, state, country FROM cinemas",
+        "literal": {"city": "Phnom Penh", "state": "Phnom Penh", "country": "Cambodia"},
+        "miss": lambda n: {"city": f"Nowhere {n}", "state": f"Nowhere {n}", "country": "Nowhere"},
+    },
+    "idx_theaters_cinema": {
+        "sample": "SELECT id AS cinema_id FROM cinemas",
+        "literal": {"cinema_id": 1},
+        "miss": lambda n: {"cinema_id": -n},
+    },
+    "idx_screenings_movie_date": {
+        "sample": "SELECT movie_id, screening_date FROM screenings",
+        "literal": {"movie_id": 1, "screening_date": date.today()},
+        "miss": lambda n: {"movie_id": -n, "screening_date": MISSING_DAY},
+    },
+    "idx_screenings_theater_date": {
+        "sample": "SELECT theater_id, screening_date FROM screenings",
+        "literal": {"theater_id": 1, "screening_date": date.today()},
+        "miss": lambda n: {"theater_id": -n, "screening_date": MISSING_DAY},
+    },
+    "idx_customers_email": {
+        "sample": "SELECT email FROM customers",
+        "literal": {"email": "test@example.com"},
+        "miss": lambda n: {"email": f"missing-{n}@example.invalid"},
+    },
+    "idx_customers_phone": {
+        "sample": "SELECT phone FROM customers WHERE phone IS NOT NULL",
+        "literal": {"phone": "+855123456789"},
+        "miss": lambda n: {"phone": f"+000{n:09d}"},
+    },
+    "idx_bookings_customer": {
+        "sample": "SELECT id AS customer_id FROM customers",
+        "literal": {"customer_id": 1},
+        "miss": lambda n: {"customer_id": -n},
+    },
+    "idx_bookings_screening": {
+        "sample": "SELECT id AS screening_id FROM screenings",
+        "literal": {"screening_id": 1},
+        "miss": lambda n: {"screening_id": -n},
+    },
+    "idx_bookings_date": {
+        # Days weighted by their booking volume; the queries read that day and the one before
+        "sample": "SELECT created_at::date AS day FROM bookings",
+        "literal": {"day": date.today()},
+        "miss": lambda n: {"day": MISSING_DAY - timedelta(days=n)},
+    },
+    "idx_tickets_booking": {
+        "sample": "SELECT id AS booking_id FROM bookings",
+        "literal": {"booking_id": 1},
+        "miss": lambda n: {"booking_id": -n},
+    },
+    "idx_tickets_seat": {
+        "sample": "SELECT id AS seat_id FROM seats",
+        "literal": {"seat_id": 1},
+        "miss": lambda n: {"seat_id": -n},
+    },
+    "idx_payments_booking": {
+        "sample": "SELECT id AS booking_id FROM bookings",
+        "literal": {"booking_id": 1},
+        "miss": lambda n: {"booking_id": -n},
+    },
+    "idx_payments_status": {
+        "sample": "SELECT status::text AS status FROM payments",
+        "literal": {"status": "pending"},
+        "miss": None,  # an enum: a value outside it is an error, not a miss
+    },
+}
+
+def sample_keys(cursor, conn, index_name, size):
+    """Random rows of the index's key source, as parameter dicts"""
+    cursor.execute("SELECT setseed(%s)", (SEED,))
+    cursor.execute(f"SELECT * FROM ({KEY_SOURCES[index_name]['sample']}) keys ORDER BY random() LIMIT %s",
+                   (size,))
+    columns = [column.name for column in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    conn.commit()
+    return rows
+
+class KeySampler:
+    """Callable returning the parameters of the next execution. Threads sharing it draw under a lock, so
+    no draw is lost or repeated, though which thread gets which draw depends on scheduling."""
+
+    def __init__(self, mode, keys=None, literal=None, miss=None):
+        self.lock = threading.Lock()
+        self.mode = mode
+        self.keys = keys[:HOT_KEYS] if mode == "hot" else keys
+        self.literal = literal
+        self.miss = miss
+        self.restart()
+
+    def restart(self):
+        """Start the draws over, so both index states of a test see the same key sequence"""
+        with self.lock:
+            self.rng = random.Random(SEED)
+            self.count = 0
+
+    def __call__(self):
+        if self.mode == "literal":
+            return self.literal
+        with self.lock:
+            self.count += 1
+            if self.mode == "miss":
+                return self.miss(self.count)
+            return self.rng.choice(self.keys)
+
+def sampler(cursor, conn, index_name, mode, sample_size):
+    """KeySampler for a test, or None (with the reason printed) when the mode can't be used"""
+    source = KEY_SOURCES[index_name]
+    if mode == "literal":
+        return KeySampler(mode, literal=source["literal"])
+    if mode == "miss":
+        if source["miss"] is None:
+            print(f"⚠️  No missing keys exist for {index_name}, skipping it")
+            return None
+        return KeySampler(mode, miss=source["miss"])
+    keys = sample_keys(cursor, conn, index_name, sample_size)
+    if not keys:
+        print(f"⚠️  No keys to sample for {index_name}, its tables are empty")
+        return None
+    return KeySampler(mode, keys=keys)
@@ -0,0 +1,356 @@
+import os
+import re
+import math
+import time
+import argparse
+from datetime import timedelta
+
+import psycopg2
+
+import benchmark
+import keys
+import plans
+import stats
+import server_stats
+import strategies
+import complex as complex_suite
+
+# Declarative partitioning benchmark: the complex.py workload and maintenance on range-partitioned
+# copies of bookings, tickets and screenings, built in PARTITIONED_SCHEMA, against the plain tables.
+
+PARTITIONED_SCHEMA = "partitioned"
+PARTITION_KEYS = {"screenings": "screening_date", "bookings": "created_at", "tickets": "created_at"}
+DEFAULT_PARTITIONS = 12
+SHARED_RANGES = {"tickets": "bookings"}  # partitioned on the ranges of another table
+RETENTION_TABLES = ["payments", "tickets", "bookings"]  # referencing rows first
+DDL_INDEX = re.compile(r"create index if not exists (\w+)\s+on (\w+) using \?\?\? (\([^)]*\));")
+
+def ddl_indexes():
+    """(name, table, columns) of the DDL_UPDATED.sql indexes on the partitioned tables"""
+    with open(strategies.DDL_PATH) as f:
+        ddl = f.read()
+    return [match.groups() for match in DDL_INDEX.finditer(ddl) if match.group(2) in PARTITION_KEYS]
+
+def _scalar(cursor, conn, sql, params=None):
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+def _timed(cursor, conn, statements):
+    """Run statements in one transaction, returns seconds"""
+    start = time.perf_counter()
+    for statement in statements:
+        cursor.execute(statement)
+    conn.commit()
+    return time.perf_counter() - start
+
+def _size(value):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if value < 1024:
+            return f"{value:,.1f}{unit}"
+        value /= 1024
+    return f"{value:,.1f}TB"
+
+def bounds(cursor, conn, table, column, count):
+    """count consecutive [low, high) day ranges covering the column's values in the loaded table"""
+    cursor.execute(f"SELECT MIN({column})::date, MAX({column})::date FROM public.{table}")
+    low, high = cursor.fetchone()
+    conn.commit()
+    if low is None:
+        return []
+    step = max(1, math.ceil(((high - low).days + 1) / count))
+    ranges = []
+    start = low
+    while start <= high:
+        ranges.append((start, start + timedelta(days=step)))
+        start = ranges[-1][1]
+    return ranges
+
+def partition_ddl(table, column, ranges):
+    """Statements creating the partitioned table and its partitions, without indexes"""
+    schema = PARTITIONED_SCHEMA
+    statements = [f"CREATE TABLE {schema}.{table} (LIKE public.{table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+                  f"PARTITION BY RANGE ({column});"]
+    for number, (low, high) in enumerate(ranges, 1):
+        statements.append(f"CREATE TABLE {schema}.{table}_p{number:02d} PARTITION OF {schema}.{table} "
+                          f"FOR VALUES FROM ('{low}') TO ('{high}');")
+    statements.append(f"CREATE TABLE {schema}.{table}_default PARTITION OF {schema}.{table} DEFAULT;")
+    return statements
+
+def index_ddl(table, column, indexes):
+    """Primary key including the partition key, then the DDL_UPDATED.sql indexes.
+
+    No foreign key can point into a partitioned table, so none are declared."""
+    statements = [f"ALTER TABLE {PARTITIONED_SCHEMA}.{table} ADD PRIMARY KEY (id, {column});"]
+    statements += [f"CREATE INDEX {name} ON {PARTITIONED_SCHEMA}.{table} {columns};"
+                   for name, index_table, columns in indexes if index_table == table]
+    return statements
+
+def build(cursor, conn, count):
+    """Create and fill the partitioned schema; returns per-table setup costs and the DDL that was run"""
+    cursor.execute(f"DROP SCHEMA IF EXISTS {PARTITIONED_SCHEMA} CASCADE;")
+    cursor.execute(f"CREATE SCHEMA {PARTITIONED_SCHEMA};")
+    conn.commit()
+    indexes = ddl_indexes()
+    setup, ddl, table_ranges = {}, [], {}
+    for table, column in PARTITION_KEYS.items():
+        if table in SHARED_RANGES:
+            ranges = table_ranges[SHARED_RANGES[table]]
+        else:
+            ranges = bounds(cursor, conn, table, column, count)
+        table_ranges[table] = ranges
+        statements = partition_ddl(table, column, ranges)
+        _timed(cursor, conn, statements)
+        start = time.perf_counter()
+        cursor.execute(f"INSERT INTO {PARTITIONED_SCHEMA}.{table} SELECT * FROM public.{table};")
+        rows = cursor.rowcount
+        conn.commit()
+        migrate_s = time.perf_counter() - start
+        in_default = _scalar(cursor, conn, f"SELECT COUNT(*) FROM {PARTITIONED_SCHEMA}.{table}_default")
+        index_statements = index_ddl(table, column, indexes)
+        index_s = _timed(cursor, conn, index_statements)
+        setup[table] = {"partition_key": column, "partitions": len(ranges),
+                        "first_day": ranges[0][0] if ranges else None,
+                        "days_per_partition": (ranges[0][1] - ranges[0][0]).days if ranges else None,
+                        "rows": rows, "rows_in_default": in_default, "migrate_s": migrate_s, "index_build_s": index_s}
+        ddl += statements + index_statements
+        print(f"   {table}: {len(ranges)} partition(s) of {setup[table]['days_per_partition']} day(s) by {column}, "
+              f"{rows:,} rows copied in {migrate_s:.1f}s, indexes built in {index_s:.1f}s")
+    # Set the hint bits and visibility map of the fresh copies, as the loaded tables already have them
+    conn.autocommit = True
+    try:
+        for table in PARTITION_KEYS:
+            cursor.execute(f"VACUUM (ANALYZE) {PARTITIONED_SCHEMA}.{table};")
+    finally:
+        conn.autocommit = False
+    return setup, ddl
+
+def partitions(cursor, conn):
+    """Partition names per partitioned table"""
+    cursor.execute("""
+        SELECT parent.relname, child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = inhparent JOIN pg_class child ON child.oid = inhrelid
+        JOIN pg_namespace n ON n.oid = parent.relnamespace
+        WHERE n.nspname = %s AND parent.relkind = 'p'
+    """, (PARTITIONED_SCHEMA,))
+    result = {}
+    for parent, child in cursor.fetchall():
+        result.setdefault(parent, set()).add(child)
+    conn.commit()
+    return result
+
+def pruning(plan, partition_names):
+    """Per partitioned table in the plan: partitions planned, actually executed, and in total"""
+    nodes = list(plans.walk(plan["Plan"]))
+    result = {}
+    for table, names in partition_names.items():
+        planned = {node["Relation Name"] for node in nodes if node.get("Relation Name") in names}
+        executed = {node["Relation Name"] for node in nodes
+                    if node.get("Relation Name") in names and node.get("Actual Loops", 0) > 0}
+        if planned:
+            result[table] = {"planned": len(planned), "executed": len(executed), "total": len(names)}
+    return result
+
+def maintenance(cursor, conn, schema, oldest_before):
+    """VACUUM (ANALYZE), REINDEX and retention timings of the bookings/tickets/screenings of schema"""
+    result = {}
+    conn.autocommit = True
+    try:
+        for operation in ["VACUUM (ANALYZE)", "REINDEX TABLE"]:
+            start = time.perf_counter()
+            for table in PARTITION_KEYS:
+                cursor.execute(f"{operation} {schema}.{table};")
+            result[operation.split()[0].lower() + "_s"] = time.perf_counter() - start
+    finally:
+        conn.autocommit = False
+
+    # Remove the bookings and tickets created before oldest_before and the payments of those bookings,
+    # then roll back. The partitioned tables drop their oldest partition, and delete the older rows that
+    # went to the DEFAULT partition, so both variants remove the same rows.
+    partitioned = schema == PARTITIONED_SCHEMA
+    if partitioned:
+        dropped = {table: _scalar(cursor, conn, f"SELECT COUNT(*) FROM {schema}.{table}_p01")
+                   for table in ["tickets", "bookings"]}
+    removed = {}
+    try:
+        start = time.perf_counter()
+        # Payments (and the loaded tickets) reference the bookings, so they go first
+        cursor.execute(f"DELETE FROM public.payments WHERE booking_id IN "
+                       f"(SELECT id FROM {schema}.bookings WHERE created_at < %s);", (oldest_before,))
+        removed["payments"] = cursor.rowcount
+        for table in ["tickets", "bookings"]:
+            if partitioned:
+                cursor.execute(f"DELETE FROM {schema}.{table}_default WHERE created_at < %s;", (oldest_before,))
+                removed[table] = dropped[table] + cursor.rowcount
+                cursor.execute(f"ALTER TABLE {schema}.{table} DETACH PARTITION {schema}.{table}_p01;")
+                cursor.execute(f"DROP TABLE {schema}.{table}_p01;")
+            else:
+                cursor.execute(f"DELETE FROM {schema}.{table} WHERE created_at < %s;", (oldest_before,))
+                removed[table] = cursor.rowcount
+        result["retention_s"] = time.perf_counter() - start
+        result["retention_rows"] = {table: removed[table] for table in RETENTION_TABLES}
+    finally:
+        conn.rollback()
+    # The rolled back deletes leave dead row versions in the loaded tables
+    conn.autocommit = True
+    try:
+        for table in RETENTION_TABLES:
+            cursor.execute(f"VACUUM public.{table};")
+    finally:
+        conn.autocommit = False
+    result["size_bytes"] = sum(_scalar(cursor, conn, "SELECT pg_total_relation_size(c.oid) + COALESCE(("
+                                       "SELECT SUM(pg_total_relation_size(inhrelid)) FROM pg_inherits "
+                                       "WHERE inhparent = c.oid), 0) FROM pg_class c JOIN pg_namespace n "
+                                       "ON n.oid = c.relnamespace WHERE n.nspname = %s AND c.relname = %s",
+                                       (schema, table)) for table in PARTITION_KEYS)
+    return result
+
+def ensure_indexes(cursor, conn):
+    """The loaded tables get the same DDL_UPDATED.sql indexes as plain btrees"""
+    for name, table, columns in ddl_indexes():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON public.{table} {columns};")
+    conn.commit()
+
+def measure_query(cursor, conn, test, next_params, args, statements, partition_names=None):
+    next_params.restart()
+    before = server_stats.snapshot(cursor, conn, statements) if args.server_stats else None
+    measured = benchmark.measure(cursor, conn, test["query"], next_params, args.warmup, args.iterations,
+                                 args.time_budget, args.itersize)
+    if not measured:
+        return None
+    result = {**measured, "stats_ms": stats.summarize(measured["timings_ms"]), "plan_summary": None, "pruning": None,
+              "server_stats": server_stats.delta(before, server_stats.snapshot(cursor, conn, statements))
+              if before else None}
+    if not args.explain:
+        return result
+    try:
+        plan = plans.explain(cursor, conn, test["query"], next_params())
+        result["plan_summary"] = plans.summarize(plan)
+        if partition_names:
+            result["pruning"] = pruning(plan, partition_names)
+    except Exception as e:
+        print(f"Failed to capture the plan: {e}")
+        conn.rollback()
+    return result
+
+def format_pruning(pruned):
+    if not pruned:
+        return "no partitioned table"
+    return ", ".join(f"{table} {p['executed']}/{p['total']}" + (f" (planned {p['planned']})"
+                     if p["planned"] != p["executed"] else "") for table, p in pruned.items())
+
+def main():
+    parser = argparse.ArgumentParser(description='Declarative partitioning benchmark')
+    benchmark.add_arguments(parser, throughput_mode=False)
+    parser.add_argument('--partitions', type=int, default=DEFAULT_PARTITIONS,
+                        help=f'Date ranges each table is split into (default: {DEFAULT_PARTITIONS})')
+    parser.add_argument('--keep', action='store_true',
+                        help=f'Keep the {PARTITIONED_SCHEMA} schema afterwards instead of dropping it')
+    parser.add_argument('--ddl-output', default=os.path.join(benchmark.RESULTS_DIR, 'DDL_partitioned.sql'),
+                        help='Where the partitioning DDL is written (default: results/DDL_partitioned.sql)')
+    args = parser.parse_args()
+
+    tests = [test for test in complex_suite.TESTS if not args.only or test["index"] in args.only]
+    output = args.output or os.path.join(benchmark.RESULTS_DIR, "results_partitioning.jsonl")
+    config = {"warmup": args.warmup, "iterations": args.iterations, "time_budget_s": args.time_budget,
+              "explain": args.explain, "keys": args.keys, "key_sample": args.key_sample,
+              "server_stats": args.server_stats, "itersize": args.itersize, "partitions": args.partitions}
+    conn = benchmark.connect()
+    cursor = conn.cursor()
+    records = [benchmark.run_record(conn, "partitioning", config)]
+    run_id = records[0]["run_id"]
+    print(f"📍 Run {run_id}: {len(tests)} complex queries, {args.keys} keys, {args.partitions} partitions per table")
+
+    statements = args.server_stats and server_stats.statements_available(cursor, conn)
+    partitioned_conn = None
+    results, failed = [], []
+    try:
+        print(f"\n🏗️  Building the {PARTITIONED_SCHEMA} schema...")
+        ensure_indexes(cursor, conn)
+        setup, ddl = build(cursor, conn, args.partitions)
+        with open(args.ddl_output, 'w') as f:
+            f.write("\n".join(ddl) + "\n")
+        empty = [table for table, info in setup.items() if not info["partitions"]]
+        if empty:
+            print(f"❌ Load the dataset first: {', '.join(empty)} is empty")
+            return
+        partition_names = partitions(cursor, conn)
+        partitioned_conn = psycopg2.connect(**benchmark.DB_PARAMS,
+                                            options=f"-c search_path={PARTITIONED_SCHEMA},public")
+        partitioned_cursor = partitioned_conn.cursor()
+
+        for test in tests:
+            index_name = test["index"]
+            print(f"\nTesting {index_name}...")
+            try:
+                next_params = keys.sampler(cursor, conn, index_name, args.keys, args.key_sample)
+            except Exception as e:
+                print(f"Failed to sample keys: {e}")
+                conn.rollback()
+                continue
+            if next_params is None:
+                continue
+            measured = {"unpartitioned": measure_query(cursor, conn, test, next_params, args, statements),
+                        "partitioned": measure_query(partitioned_cursor, partitioned_conn, test, next_params, args,
+                                                     statements, partition_names)}
+            for variant, result in measured.items():
+                if not result:
+                    print(f"   {variant:<14} ❌ failed, see above")
+                    continue
+                summary = result["plan_summary"]
+                planning = f", planning {summary['planning_ms']:.2f}ms" if summary else ""
+                pruned = f", partitions {format_pruning(result['pruning'])}" if result["pruning"] is not None else ""
+                print(f"   {variant:<14} {benchmark.format_summary(result['stats_ms'])}{planning}{pruned}")
+                records.append({"type": "partitioning", "run_id": run_id, "suite": "partitioning",
+                                "index_name": index_name, "variant": variant, "query": test["query"],
+                                "keys": args.keys, **result})
+            if all(measured.values()):
+                results.append((index_name, measured))
+            elif measured["unpartitioned"]:
+                failed.append(index_name)
+
+        print("\n🧹 Maintenance...")
+        bookings = setup["bookings"]
+        oldest_before = bookings["first_day"] + timedelta(days=bookings["days_per_partition"])
+        costs = {"unpartitioned": maintenance(cursor, conn, "public", oldest_before),
+                 "partitioned": maintenance(partitioned_cursor, partitioned_conn, PARTITIONED_SCHEMA, oldest_before)}
+        print(f"   {'':<15}{'VACUUM (ANALYZE)':>18}{'REINDEX':>10}{'retention':>11}{'size':>11}   removed rows "
+              f"({', '.join(RETENTION_TABLES)})")
+        for variant, cost in costs.items():
+            print(f"   {variant:<15}{cost['vacuum_s']:>17.2f}s{cost['reindex_s']:>9.2f}s{cost['retention_s']:>10.2f}s"
+                  f"{_size(cost['size_bytes']):>11}   {' / '.join(f'{n:,}' for n in cost['retention_rows'].values())}")
+        if costs["unpartitioned"]["retention_rows"] != costs["partitioned"]["retention_rows"]:
+            print("   ⚠️  The retention paths removed different rows, their timings don't compare")
+        records.append({"type": "partitioning_setup", "run_id": run_id, "suite": "partitioning",
+                        "tables": setup, "maintenance": costs, "retention_before": oldest_before})
+    finally:
+        if partitioned_conn is not None:
+            partitioned_conn.close()
+        if not args.keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {PARTITIONED_SCHEMA} CASCADE;")
+            conn.commit()
+        benchmark.write_records(output, records)
+        cursor.close()
+        conn.close()
+
+    if results:
+        print(f"\n📊 {'query':<30}{'plain p50':>12}{'partitioned':>13}{'change':>9}{'planning':>20}  "
+              f"partitions executed")
+        for index_name, measured in results:
+            plain, part = measured["unpartitioned"], measured["partitioned"]
+            change = part["stats_ms"]["p50"] / max(plain["stats_ms"]["p50"], 1e-9) - 1
+            planning = "-"
+            if plain["plan_summary"] and part["plan_summary"]:
+                planning = f"{plain['plan_summary']['planning_ms']:.2f} -> {part['plan_summary']['planning_ms']:.2f}ms"
+            print(f"   {index_name:<30}{plain['stats_ms']['p50']:>10.2f}ms{part['stats_ms']['p50']:>11.2f}ms"
+                  f"{change:>+9.1%}{planning:>20}  {format_pruning(part['pruning'])}")
+    if failed:
+        print(f"\n⚠️  Only run on the plain tables: {', '.join(failed)}")
+        print("💡 A partitioned table's primary key includes the partition key, so GROUP BY id no longer "
+              "covers the other columns of the row")
+    print(f"\n💾 Partitioning DDL written to {args.ddl_output}")
+    print(f"Results have been written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# EXPLAIN (ANALYZE, BUFFERS) capture for the benchmarks, from one extra untimed execution.
+
+# Nodes that read through a named index
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+def explain(cursor, conn, query, params=None):
+    """Run query under EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and return the top-level plan object"""
+    cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", params)
+    plan = cursor.fetchone()[0]
+    conn.commit()
+    return plan[0]
+
+def plan(cursor, conn, query, params=None):
+    """The plan the query would get, without running it"""
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+    result = cursor.fetchone()[0]
+    conn.commit()
+    return result[0]
+
+def walk(node):
+    """Every node of a plan tree, parents first"""
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+def indexes_used(plan):
+    return sorted({node["Index Name"] for node in walk(plan["Plan"]) if node.get("Index Name")})
+
+def summarize(plan):
+    """Planning/execution time, buffer totals and per-node rows of an EXPLAIN result"""
+    root = plan["Plan"]
+    return {
+        "planning_ms": plan.get("Planning Time"),
+        "execution_ms": plan.get("Execution Time"),
+        # The root node's buffers include those of every node below it
+        "shared_hit_blocks": root.get("Shared Hit Blocks", 0),
+        "shared_read_blocks": root.get("Shared Read Blocks", 0),
+        "temp_written_blocks": root.get("Temp Written Blocks", 0),
+        "indexes_used": indexes_used(plan),
+        "nodes": [{
+            "node": node["Node Type"],
+            "relation": node.get("Relation Name"),
+            "index": node.get("Index Name"),
+            "plan_rows": node.get("Plan Rows"),
+            "actual_rows": node.get("Actual Rows"),
+            "loops": node.get("Actual Loops"),
+            "shared_hit_blocks": node.get("Shared Hit Blocks", 0),
+            "shared_read_blocks": node.get("Shared Read Blocks", 0),
+        } for node in walk(root)],
+    }
+
+def format_summary(summary):
+    used = ", ".join(summary["indexes_used"]) or "no index"
+    return (f"server: planning {summary['planning_ms']:.2f}ms, execution {summary['execution_ms']:.2f}ms, "
+            f"buffers hit {summary['shared_hit_blocks']:,} read {summary['shared_read_blocks']:,}, {used}")
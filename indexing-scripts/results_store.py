@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+import stats
+
+# Results store: every benchmark run in one SQLite file, and a regression check between two runs.
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'benchmarks.sqlite')
+STORE_VERSION = 1  # PRAGMA user_version of the store's own tables
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_DELTA_MS = 0.05  # sub-millisecond lookups move by more than 10% from run to run
+MIN_SAMPLES = 8  # below this the test can't reach significance, the pair is reported as skipped
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    suite TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    host TEXT,
+    git_revision TEXT,
+    schema_version TEXT,
+    dataset_profile TEXT,
+    config TEXT,
+    environment TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    type TEXT NOT NULL,
+    index_name TEXT,
+    index_applied INTEGER,
+    variant TEXT,
+    keys TEXT,
+    clients INTEGER,
+    n INTEGER,
+    p50_ms REAL,
+    p95_ms REAL,
+    p99_ms REAL,
+    mean_ms REAL,
+    timings_ms TEXT,
+    record TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_measurements_run ON measurements(run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_identity ON runs(suite, host, schema_version, dataset_profile, started_at);
+"""
+
+# What identifies the same measurement in two runs
+MEASUREMENT_KEY = ["type", "index_name", "index_applied", "variant", "keys", "clients"]
+
+def connect(path=STORE_PATH):
+    store = sqlite3.connect(path)
+    store.row_factory = sqlite3.Row
+    store.execute("PRAGMA foreign_keys = ON")
+    version = store.execute("PRAGMA user_version").fetchone()[0]
+    if version > STORE_VERSION:
+        raise RuntimeError(f"{path} was written by a newer version of results_store.py (store version {version})")
+    store.executescript(SCHEMA)
+    store.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    return store
+
+def _measurement_row(record):
+    summary = record.get("stats_ms") or {}
+    # The plan is in the JSON Lines file; the store keeps the summary and what the record says about it
+    rest = {k: v for k, v in record.items() if k not in ("plan", "timings_ms")}
+    return (record["run_id"], record["type"], record.get("index_name") or record.get("configuration"),
+            record.get("index_applied"), record.get("variant"), record.get("keys"), record.get("clients"),
+            summary.get("n"), summary.get("p50"), summary.get("p95"), summary.get("p99"), summary.get("mean"),
+            json.dumps(record["timings_ms"]) if record.get("timings_ms") else None, json.dumps(rest, default=str))
+
+def save(records, path=STORE_PATH):
+    """Store the runs and measurements of a list of records; runs already stored are skipped.
+
+    Returns (runs added, measurements added)."""
+    store = connect(path)
+    added_runs, added = set(), 0
+    try:
+        with store:
+            for record in records:
+                if "run_id" not in record:
+                    continue  # written before runs had ids
+                if record["type"] == "run":
+                    environment = record.get("environment") or {}
+                    cursor = store.execute(
+                        "INSERT OR IGNORE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (record["run_id"], record["suite"], record["started_at"], environment.get("host"),
+                         environment.get("git_revision"), record.get("schema_version"),
+                         record.get("dataset_profile"), json.dumps(record.get("config")),
+                         json.dumps(environment, default=str)))
+                    if cursor.rowcount:
+                        added_runs.add(record["run_id"])
+                elif record["run_id"] in added_runs:
+                    store.execute("INSERT INTO measurements (run_id, type, index_name, index_applied, variant, keys, "
+                                  "clients, n, p50_ms, p95_ms, p99_ms, mean_ms, timings_ms, record) "
+                                  "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", _measurement_row(record))
+                    added += 1
+    finally:
+        store.close()
+    return len(added_runs), added
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def get_run(store, run_id):
+    """A run by id or unique id prefix"""
+    rows = store.execute("SELECT * FROM runs WHERE run_id LIKE ? ORDER BY started_at", (run_id + "%",)).fetchall()
+    if not rows:
+        print(f"❌ No run {run_id} in the results store")
+        sys.exit(2)
+    if len(rows) > 1:
+        print(f"❌ Run id prefix {run_id} is ambiguous: {', '.join(row['run_id'] for row in rows)}")
+        sys.exit(2)
+    return rows[0]
+
+def latest_run(store, suite=None, before=None, like=None):
+    """Newest run of suite started before the given run, optionally with the same identity as like"""
+    sql = ("SELECT runs.* FROM runs WHERE EXISTS (SELECT 1 FROM measurements m "
+           "WHERE m.run_id = runs.run_id AND m.timings_ms IS NOT NULL)")
+    params = []
+    if suite:
+        sql += " AND suite = ?"
+        params.append(suite)
+    if before is not None:
+        sql += " AND started_at < ? AND run_id != ?"
+        params += [before["started_at"], before["run_id"]]
+    if like is not None:
+        sql += " AND suite = ? AND host IS ? AND schema_version IS ? AND dataset_profile IS ?"
+        params += [like["suite"], like["host"], like["schema_version"], like["dataset_profile"]]
+    return store.execute(sql + " ORDER BY started_at DESC LIMIT 1", params).fetchone()
+
+def samples(store, run_id):
+    """Timed measurements of a run by measurement key"""
+    rows = store.execute("SELECT * FROM measurements WHERE run_id = ? AND timings_ms IS NOT NULL ORDER BY id",
+                         (run_id,)).fetchall()
+    return {tuple(row[k] for k in MEASUREMENT_KEY): json.loads(row["timings_ms"]) for row in rows}
+
+def label(key):
+    kind, index_name, applied, variant, key_mode = key[:5]
+    state = variant or ("with index" if applied else "without index")
+    return f"{index_name} {state} ({key_mode})"
+
+def compare(baseline, candidate, threshold, alpha, min_delta_ms):
+    """Mann-Whitney comparison of every measurement both runs have: list of result dicts"""
+    results = []
+    for key, after in candidate.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        result = {"key": key, "label": label(key), "p50_before": stats.summarize(before)["p50"],
+                  "p50_after": stats.summarize(after)["p50"], "p_value": None, "verdict": "skipped"}
+        result["change"] = result["p50_after"] / max(result["p50_before"], 1e-9) - 1
+        if min(len(before), len(after)) >= MIN_SAMPLES:
+            _, result["p_value"] = stats.mann_whitney(after, before)
+            significant = result["p_value"] < alpha and abs(result["p50_after"] - result["p50_before"]) >= min_delta_ms
+            if significant and result["change"] > threshold:
+                result["verdict"] = "regression"
+            elif significant and result["change"] < -threshold:
+                result["verdict"] = "improvement"
+            else:
+                result["verdict"] = "unchanged"
+        results.append(result)
+    return results
+
+def describe(run):
+    return (f"{run['run_id']} ({run['suite']}, {run['started_at']}, git {run['git_revision'] or '?'}, "
+            f"{run['dataset_profile'] or '?'}, schema {run['schema_version'] or '?'}, {run['host'] or '?'})")
+
+def command_import(args):
+    total_runs = total = 0
+    for path in args.files:
+        runs, added = save(read_records(path), args.store)
+        print(f"📤 {path}: {runs} new run(s), {added} measurement(s)")
+        total_runs += runs
+        total += added
+    print(f"✅ Imported {total_runs} run(s) and {total} measurement(s) into {args.store}")
+
+def command_runs(args):
+    store = connect(args.store)
+    sql = ("SELECT runs.*, COUNT(m.id) AS measurements FROM runs LEFT JOIN measurements m USING (run_id)"
+           + (" WHERE suite = ?" if args.suite else "") + " GROUP BY run_id ORDER BY started_at DESC LIMIT ?")
+    rows = store.execute(sql, ([args.suite] if args.suite else []) + [args.limit]).fetchall()
+    print(f"{'run':<14}{'suite':<12}{'started':<27}{'git':<10}{'profile':<16}{'schema':<12}{'host':<20}{'records':>8}")
+    for row in rows:
+        print(f"{row['run_id']:<14}{row['suite']:<12}{row['started_at']:<27}{row['git_revision'] or '-':<10}"
+              f"{row['dataset_profile'] or '-':<16}{row['schema_version'] or '-':<12}{row['host'] or '-':<20}"
+              f"{row['measurements']:>8}")
+    store.close()
+
+def command_compare(args):
+    store = connect(args.store)
+    candidate = get_run(store, args.candidate) if args.candidate else latest_run(store, args.suite)
+    if candidate is None:
+        print("❌ No run with timed measurements in the results store")
+        sys.exit(2)
+    if args.baseline:
+        baseline = get_run(store, args.baseline)
+    else:
+        baseline = latest_run(store, before=candidate, like=candidate)
+        if baseline is None:
+            print(f"❌ No earlier run to compare {candidate['run_id']} with: none has the same suite, host, "
+                  f"schema version and dataset profile")
+            print("💡 Pass --baseline RUN_ID to compare with any run")
+            sys.exit(2)
+    print(f"📍 Baseline:  {describe(baseline)}")
+    print(f"📍 Candidate: {describe(candidate)}")
+    for field in ["suite", "host", "schema_version", "dataset_profile"]:
+        if baseline[field] != candidate[field]:
+            print(f"⚠️  The runs differ in {field}: {baseline[field]} vs {candidate[field]}")
+
+    results = compare(samples(store, baseline["run_id"]), samples(store, candidate["run_id"]),
+                      args.threshold, args.alpha, args.min_delta_ms)
+    store.close()
+    if not results:
+        print("❌ The runs have no measurement in common")
+        sys.exit(2)
+    marks = {"regression": "❌", "improvement": "🚀", "unchanged": "", "skipped": "(too few samples)"}
+    print(f"\n   {'measurement':<58}{'base p50':>11}{'new p50':>11}{'change':>9}{'p':>9}")
+    for result in results:
+        p_value = f"{result['p_value']:.4f}" if result["p_value"] is not None else "-"
+        print(f"   {result['label']:<58}{result['p50_before']:>9.2f}ms{result['p50_after']:>9.2f}ms"
+              f"{result['change']:>+9.1%}{p_value:>9}  {marks[result['verdict']]}")
+
+    regressions = [r for r in results if r["verdict"] == "regression"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): p50 more than {args.threshold:.0%} and {args.min_delta_ms:g}ms "
+              f"slower (p < {args.alpha:g})")
+        sys.exit(1)
+    print(f"\n✅ No regression beyond {args.threshold:.0%} in {len(results)} measurement(s)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark results store')
+    parser.add_argument('--store', default=STORE_PATH,
+                        help='SQLite file of the store (default: results/benchmarks.sqlite)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help='Import runs from JSON Lines results files')
+    importer.add_argument('files', nargs='+', metavar='FILE')
+    importer.set_defaults(handler=command_import)
+
+    runs = commands.add_parser('runs', help='List the stored runs, newest first')
+    runs.add_argument('--suite', help='Only runs of this suite (simple, complex, strategies, write_cost)')
+    runs.add_argument('--limit', type=int, default=20, help='Number of runs shown (default: 20)')
+    runs.set_defaults(handler=command_runs)
+
+    comparer = commands.add_parser('compare', help='Compare a run with a baseline; exits 1 on a regression')
+    comparer.add_argument('candidate', nargs='?',
+                          help='Run id or prefix (default: the newest run with timed measurements)')
+    comparer.add_argument('--baseline',
+                          help='Run id or prefix (default: the previous run of the same suite, host, schema '
+                               'version and dataset profile)')
+    comparer.add_argument('--suite', help='Default candidate: the newest run of this suite')
+    comparer.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                          help=f'Relative p50 slowdown counted as a regression (default: {DEFAULT_THRESHOLD})')
+    comparer.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                          help=f'Significance level of the Mann-Whitney U test (default: {DEFAULT_ALPHA})')
+    comparer.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                          help=f'Smallest p50 change in milliseconds that counts (default: {DEFAULT_MIN_DELTA_MS})')
+    comparer.set_defaults(handler=command_compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
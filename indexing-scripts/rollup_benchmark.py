@@ -0,0 +1,341 @@
+import os
+import time
+import random
+import argparse
+import threading
+
+import benchmark
+import keys
+import rollups
+import stats
+import write_cost
+import complex as complex_suite
+
+# Rollups vs raw joins for the dashboard aggregates of complex.py (see rollups.py): read latency,
+# write overhead and staleness.
+
+VERIFY_KEYS = 20
+DEFAULT_BATCHES = 20
+DEFAULT_DURATION = 20.0
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+# Per complex.py query: the raw aggregate and the same answer served from the rollups. Only the
+# measures that add up are kept (no distinct customers).
+QUERIES = {
+    "idx_bookings_date": {
+        "raw": """
+            SELECT DATE(b.created_at) as booking_date,
+            COUNT(DISTINCT b.id) as total_bookings,
+            COUNT(DISTINCT s.movie_id) as unique_movies,
+            SUM(p.amount) as total_revenue
+            FROM bookings b
+            LEFT JOIN payments p ON b.id = p.booking_id
+            JOIN screenings s ON b.screening_id = s.id
+            WHERE b.created_at >= %(day)s::date - INTERVAL '1 day'
+            AND b.created_at < %(day)s::date + INTERVAL '1 day'
+            GROUP BY DATE(b.created_at);
+        """,
+        "rollup": """
+            SELECT m.day as booking_date, m.total_bookings, m.unique_movies, r.total_revenue
+            FROM (
+                SELECT day, SUM(bookings) as total_bookings, COUNT(*) FILTER (WHERE bookings > 0) as unique_movies
+                FROM rollup_daily_movies
+                WHERE day >= %(day)s::date - 1 AND day < %(day)s::date + 1
+                GROUP BY day HAVING SUM(bookings) > 0
+            ) m
+            LEFT JOIN (
+                SELECT day, SUM(revenue) as total_revenue FROM rollup_daily_revenue
+                WHERE day >= %(day)s::date - 1 AND day < %(day)s::date + 1
+                GROUP BY day
+            ) r USING (day);
+        """,
+    },
+    "idx_payments_status": {
+        "raw": """
+            SELECT p.status,
+            COUNT(*) as total_payments,
+            SUM(p.amount) as total_amount
+            FROM payments p
+            JOIN bookings b ON p.booking_id = b.id
+            WHERE p.status = %(status)s
+            GROUP BY p.status;
+        """,
+        "rollup": """
+            SELECT payment_status as status,
+            SUM(payments) as total_payments,
+            SUM(revenue) as total_amount
+            FROM rollup_daily_revenue
+            WHERE payment_status = %(status)s
+            GROUP BY payment_status HAVING SUM(payments) > 0;
+        """,
+    },
+    "idx_theaters_cinema": {
+        "raw": complex_suite.test_queries["idx_theaters_cinema"],
+        "rollup": """
+            SELECT t.*, c.name as cinema_name,
+            COUNT(r.movie_id) FILTER (WHERE r.screenings > 0) as unique_movies,
+            COALESCE(SUM(r.screenings), 0) as total_screenings
+            FROM theaters t
+            JOIN cinemas c ON t.cinema_id = c.id
+            LEFT JOIN rollup_theater_movies r ON t.id = r.theater_id
+            WHERE t.cinema_id = %(cinema_id)s
+            GROUP BY t.id, c.name;
+        """,
+    },
+    "idx_screenings_movie_date": {
+        "raw": """
+            SELECT s.id,
+            COUNT(DISTINCT b.id) as total_bookings,
+            COUNT(tk.id) as tickets_sold
+            FROM screenings s
+            LEFT JOIN bookings b ON s.id = b.screening_id
+            LEFT JOIN tickets tk ON b.id = tk.booking_id
+            WHERE s.movie_id = %(movie_id)s
+            AND s.screening_date = %(screening_date)s
+            GROUP BY s.id;
+        """,
+        "rollup": """
+            SELECT s.id,
+            COALESCE(r.bookings, 0) as total_bookings,
+            COALESCE(r.tickets, 0) as tickets_sold
+            FROM screenings s
+            LEFT JOIN rollup_screening_tickets r ON s.id = r.screening_id
+            WHERE s.movie_id = %(movie_id)s
+            AND s.screening_date = %(screening_date)s;
+        """,
+    },
+}
+
+def _rows(cursor, conn, query, params):
+    cursor.execute(query, params)
+    rows = sorted(cursor.fetchall(), key=repr)
+    conn.commit()
+    return rows
+
+def verify(cursor, conn, query, next_params):
+    """Keys (out of VERIFY_KEYS) for which the rollup answer differs from the raw one"""
+    next_params.restart()
+    mismatches = []
+    for _ in range(VERIFY_KEYS):
+        params = next_params()
+        if _rows(cursor, conn, query["raw"], params) != _rows(cursor, conn, query["rollup"], params):
+            mismatches.append(params)
+    return mismatches
+
+def set_capture(cursor, conn, enabled):
+    for source in rollups.CAPTURE:
+        for event in rollups.EVENTS:
+            cursor.execute(f"ALTER TABLE {source} {'ENABLE' if enabled else 'DISABLE'} TRIGGER "
+                           f"{rollups.trigger_name(source, event)};")
+    conn.commit()
+
+def insert_batches(cursor, conn, args, key_ranges, refresh=False):
+    """Insert args.batches batches, refreshing after each one if asked: (rows, insert s, refresh s)"""
+    rng = random.Random(write_cost.SEED)
+    rows, insert_s, refresh_s = 0, 0.0, 0.0
+    for _ in range(args.batches):
+        start = time.perf_counter()
+        rows += write_cost.insert_batch(cursor, conn, rng, args.batch_size, key_ranges)
+        insert_s += time.perf_counter() - start
+        if refresh:
+            start = time.perf_counter()
+            rollups.refresh(cursor, conn)
+            refresh_s += time.perf_counter() - start
+    return rows, insert_s, refresh_s
+
+def staleness(args, key_ranges):
+    """Writer and refresher running together for args.duration seconds.
+
+    A batch's staleness is the time from its commit to the end of the first refresh started after it."""
+    commits, refreshes, errors = [], [], []
+    stop, written = threading.Event(), threading.Event()
+
+    def writer():
+        conn = benchmark.connect()
+        cursor = conn.cursor()
+        rng = random.Random(write_cost.SEED + 1)
+        try:
+            while not stop.is_set():
+                write_cost.insert_batch(cursor, conn, rng, args.batch_size, key_ranges)
+                commits.append(time.perf_counter())
+        except Exception as e:
+            errors.append(f"writer: {e}")
+        finally:
+            written.set()
+            conn.close()
+
+    def refresher():
+        conn = benchmark.connect()
+        cursor = conn.cursor()
+        try:
+            while True:
+                done = written.is_set()  # then this refresh picks up the last batch
+                start = time.perf_counter()
+                applied = rollups.refresh(cursor, conn)
+                refreshes.append((start, time.perf_counter(), sum(rows for rows, _ in applied.values())))
+                if done:
+                    break
+                written.wait(args.refresh_interval)
+        except Exception as e:
+            errors.append(f"refresher: {e}")
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=refresher)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    delays = []
+    for commit in commits:
+        ends = [end for start, end, _ in refreshes if start >= commit]
+        if ends:
+            delays.append((min(ends) - commit) * 1000)
+    return {
+        "batches": len(commits),
+        "refreshes": len(refreshes),
+        "refresh_ms": stats.summarize([(end - start) * 1000 for start, end, _ in refreshes]) if refreshes else None,
+        "changes_per_refresh": sum(changes for _, _, changes in refreshes) / max(len(refreshes), 1),
+        "staleness_ms": stats.summarize(delays) if delays else None,
+        "errors": errors,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Rollups vs raw aggregate queries')
+    benchmark.add_arguments(parser, throughput_mode=False)
+    parser.add_argument('--batches', type=int, default=DEFAULT_BATCHES,
+                        help=f'Insert batches per write measurement (default: {DEFAULT_BATCHES})')
+    parser.add_argument('--batch-size', type=int, default=write_cost.DEFAULT_BATCH_SIZE,
+                        help=f'Bookings per batch, each with {write_cost.TICKETS_PER_BOOKING} tickets and a payment '
+                             f'(default: {write_cost.DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                        help=f'Seconds of concurrent writing and refreshing for the staleness '
+                             f'(default: {DEFAULT_DURATION:g})')
+    parser.add_argument('--refresh-interval', type=float, default=DEFAULT_REFRESH_INTERVAL,
+                        help=f'Seconds between refreshes while measuring staleness '
+                             f'(default: {DEFAULT_REFRESH_INTERVAL:g})')
+    parser.add_argument('--keep', action='store_true', help='Leave the rollups installed afterwards')
+    args = parser.parse_args()
+
+    names = [name for name in QUERIES if not args.only or name in args.only]
+    output = args.output or os.path.join(benchmark.RESULTS_DIR, "results_rollups.jsonl")
+    config = {"warmup": args.warmup, "iterations": args.iterations, "time_budget_s": args.time_budget,
+              "keys": args.keys, "key_sample": args.key_sample, "itersize": args.itersize, "batches": args.batches,
+              "batch_size": args.batch_size, "duration_s": args.duration, "refresh_interval_s": args.refresh_interval}
+    conn = benchmark.connect()
+    cursor = conn.cursor()
+    try:
+        records = [benchmark.run_record(conn, "rollups", config)]
+        run_id = records[0]["run_id"]
+        key_ranges = {table: write_cost._scalar(cursor, conn, f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                      for table in ["customers", "screenings", "staff", "seats"]}
+        if not key_ranges["screenings"] or not key_ranges["seats"]:
+            print("❌ Load the dataset first: screenings and seats are needed to insert bookings")
+            return
+        write_cost.sync_sequences(cursor, conn)  # the batches take their ids from the sequences
+        print(f"📍 Run {run_id}: {len(names)} queries, {args.keys} keys")
+
+        was_installed = rollups.installed(cursor, conn)
+        last_ids = {table: write_cost._scalar(cursor, conn, f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                    for table in write_cost.WRITE_TABLES}
+        reads = []
+        try:
+            rollups.install(cursor, conn)
+            build_s = rollups.rebuild(cursor, conn)
+            print(f"\n🏗️  Rollups built from scratch in {build_s:.1f}s")
+            rollups.print_sizes(cursor, conn)
+
+            for name in names:
+                query = QUERIES[name]
+                print(f"\nTesting {name}...")
+                try:
+                    next_params = keys.sampler(cursor, conn, name, args.keys, args.key_sample)
+                except Exception as e:
+                    print(f"Failed to sample keys: {e}")
+                    conn.rollback()
+                    continue
+                if next_params is None:
+                    continue
+                summaries = {}
+                for variant in ["raw", "rollup"]:
+                    next_params.restart()
+                    measured = benchmark.measure(cursor, conn, query[variant], next_params, args.warmup,
+                                                 args.iterations, args.time_budget, args.itersize)
+                    if not measured:
+                        continue
+                    summaries[variant] = stats.summarize(measured["timings_ms"])
+                    print(f"   {variant:<7}{benchmark.format_summary(summaries[variant])}")
+                    records.append({"type": "rollup_read", "run_id": run_id, "suite": "rollups", "index_name": name,
+                                    "variant": variant, "query": query[variant], "keys": args.keys,
+                                    **measured, "stats_ms": summaries[variant]})
+                mismatches = verify(cursor, conn, query, next_params)
+                if mismatches:
+                    print(f"   ❌ {len(mismatches)} of {VERIFY_KEYS} keys answered differently, e.g. {mismatches[0]}")
+                else:
+                    print(f"   ✅ Same answer for {VERIFY_KEYS} keys")
+                if len(summaries) == 2:
+                    speedup = summaries["raw"]["p50"] / max(summaries["rollup"]["p50"], 1e-9)
+                    print(f"   speedup (p50): {speedup:.1f}x")
+                    reads.append((name, summaries, len(mismatches)))
+
+            print(f"\n✍️  Inserting {args.batches} batch(es) of {args.batch_size} bookings without, "
+                  f"then with capture...")
+            set_capture(cursor, conn, False)
+            try:
+                plain_rows, plain_s, _ = insert_batches(cursor, conn, args, key_ranges)
+            finally:
+                # Not captured, so they must go before capturing again
+                write_cost.remove_inserted(cursor, conn, last_ids)
+                set_capture(cursor, conn, True)
+            rows, insert_s, refresh_s = insert_batches(cursor, conn, args, key_ranges, refresh=True)
+            overhead = (insert_s / rows) / (plain_s / plain_rows) - 1
+            print(f"   inserts: {plain_rows / plain_s:,.0f} rows/s without capture, {rows / insert_s:,.0f} with "
+                  f"({overhead:+.1%})")
+            print(f"   refresh after each batch: {refresh_s / args.batches * 1000:.1f}ms, "
+                  f"{refresh_s / rows * 1e6:.1f}µs per inserted row")
+
+            print(f"\n⏱️  Writing for {args.duration:g}s, refreshing every {args.refresh_interval:g}s...")
+            lag = staleness(args, key_ranges)
+            for error in lag["errors"]:
+                print(f"   ❌ {error}")
+            if lag["staleness_ms"]:
+                summary = lag["staleness_ms"]
+                print(f"   {lag['batches']} batch(es), {lag['refreshes']} refresh(es) of "
+                      f"{lag['refresh_ms']['p50']:.1f}ms (p50), {lag['changes_per_refresh']:,.0f} changes each")
+                print(f"   staleness: p50 {summary['p50']:.0f}ms  p95 {summary['p95']:.0f}ms  "
+                      f"max {summary['max']:.0f}ms")
+
+            differences = rollups.check(cursor, conn)
+            if any(differences.values()):
+                print(f"❌ Rollups differ from the raw tables: {differences}")
+            else:
+                print("✅ Rollups match the raw tables")
+            records.append({"type": "rollup_refresh", "run_id": run_id, "suite": "rollups", "build_s": build_s,
+                            "rows_without_capture": plain_rows, "insert_s_without_capture": plain_s,
+                            "rows_with_capture": rows, "insert_s_with_capture": insert_s, "capture_overhead": overhead,
+                            "refresh_s": refresh_s, "staleness": lag, "differences": differences})
+        finally:
+            conn.rollback()
+            write_cost.remove_inserted(cursor, conn, last_ids)
+            if was_installed or args.keep:
+                rollups.refresh(cursor, conn)
+            else:
+                rollups.drop(cursor, conn)
+            benchmark.write_records(output, records)
+    finally:
+        cursor.close()
+        conn.close()
+
+    if reads:
+        print(f"\n📊 {'query':<30}{'raw p50':>12}{'rollup p50':>12}{'speedup':>10}  answers")
+        for name, summaries, mismatched in reads:
+            speedup = summaries["raw"]["p50"] / max(summaries["rollup"]["p50"], 1e-9)
+            print(f"   {name:<30}{summaries['raw']['p50']:>10.2f}ms{summaries['rollup']['p50']:>10.2f}ms"
+                  f"{speedup:>9.1f}x  {'✅' if not mismatched else f'❌ {mismatched} differ'}")
+    print(f"Results have been written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import time
+import argparse
+
+import benchmark
+
+# Rollups: summary tables for the dashboard aggregates of complex.py, kept up to date incrementally
+# from signed rows that statement-level triggers write to a <rollup>_delta table.
+
+# Per rollup: key and measure columns with their types
+ROLLUPS = {
+    "rollup_daily_revenue": {
+        "keys": {"day": "date", "payment_status": "payment_status"},
+        "measures": {"payments": "bigint", "revenue": "numeric"},
+    },
+    "rollup_daily_movies": {
+        "keys": {"day": "date", "movie_id": "integer"},
+        "measures": {"bookings": "bigint"},
+    },
+    "rollup_screening_tickets": {
+        "keys": {"screening_id": "integer"},
+        "measures": {"bookings": "bigint", "tickets": "bigint"},
+    },
+    "rollup_theater_movies": {
+        "keys": {"theater_id": "integer", "movie_id": "integer"},
+        "measures": {"screenings": "bigint"},
+    },
+}
+
+# Per source table: the rows each change adds to a rollup's delta, selected from {rows} (the
+# trigger's transition table, or the table itself for a rebuild) and multiplied by {sign}
+CAPTURE = {
+    "payments": [
+        ("rollup_daily_revenue", """
+            SELECT b.created_at::date, r.status, {sign}, {sign} * r.amount
+            FROM {rows} r JOIN bookings b ON b.id = r.booking_id
+            WHERE b.created_at IS NOT NULL AND r.status IS NOT NULL"""),
+    ],
+    "bookings": [
+        ("rollup_daily_movies", """
+            SELECT r.created_at::date, s.movie_id, {sign}
+            FROM {rows} r JOIN screenings s ON s.id = r.screening_id
+            WHERE r.created_at IS NOT NULL"""),
+        ("rollup_screening_tickets", """
+            SELECT r.screening_id, {sign}, 0 FROM {rows} r"""),
+    ],
+    # A delete cascading from bookings finds no booking left for its tickets: delete tickets first or rebuild
+    "tickets": [
+        ("rollup_screening_tickets", """
+            SELECT b.screening_id, 0, {sign}
+            FROM {rows} r JOIN bookings b ON b.id = r.booking_id"""),
+    ],
+    "screenings": [
+        ("rollup_theater_movies", """
+            SELECT r.theater_id, r.movie_id, {sign} FROM {rows} r"""),
+    ],
+}
+
+# Trigger events and the transition tables each one provides
+EVENTS = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
+
+def trigger_name(source, event):
+    return f"rollup_{source}_{event.lower()}"
+
+def _columns(rollup):
+    return list(ROLLUPS[rollup]["keys"]) + list(ROLLUPS[rollup]["measures"])
+
+def _sources(rollup):
+    return [(source, select) for source, captures in CAPTURE.items() for name, select in captures if name == rollup]
+
+def install_ddl():
+    """Rollup and delta tables, capture functions and triggers"""
+    statements = []
+    for rollup, spec in ROLLUPS.items():
+        keys = ", ".join(spec["keys"])
+        columns = ",\n    ".join(f"{name} {kind} NOT NULL"
+                                  for name, kind in {**spec["keys"], **spec["measures"]}.items())
+        statements.append(f"CREATE TABLE IF NOT EXISTS {rollup} (\n    {columns},\n    PRIMARY KEY ({keys})\n);")
+        statements.append(f"CREATE TABLE IF NOT EXISTS {rollup}_delta (LIKE {rollup});")
+    for source, captures in CAPTURE.items():
+        removed = "\n".join(f"        INSERT INTO {rollup}_delta {select.format(rows='old_rows', sign=-1)};"
+                            for rollup, select in captures)
+        added = "\n".join(f"        INSERT INTO {rollup}_delta {select.format(rows='new_rows', sign=1)};"
+                          for rollup, select in captures)
+        statements.append(f"""CREATE OR REPLACE FUNCTION rollup_capture_{source}() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'INSERT' THEN
+{removed}
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+{added}
+    END IF;
+    RETURN NULL;
+END
+$$;""")
+        for event, referencing in EVENTS.items():
+            trigger = trigger_name(source, event)
+            statements.append(f"DROP TRIGGER IF EXISTS {trigger} ON {source};")
+            statements.append(f"CREATE TRIGGER {trigger} AFTER {event} ON {source} REFERENCING {referencing} "
+                              f"FOR EACH STATEMENT EXECUTE FUNCTION rollup_capture_{source}();")
+    return statements
+
+def drop_ddl():
+    statements = []
+    for source in CAPTURE:
+        for event in EVENTS:
+            statements.append(f"DROP TRIGGER IF EXISTS {trigger_name(source, event)} ON {source};")
+        statements.append(f"DROP FUNCTION IF EXISTS rollup_capture_{source}();")
+    for rollup in ROLLUPS:
+        statements.append(f"DROP TABLE IF EXISTS {rollup}, {rollup}_delta;")
+    return statements
+
+def recompute_sql(rollup):
+    """The rollup's rows computed from scratch"""
+    spec = ROLLUPS[rollup]
+    selects = " UNION ALL ".join(select.format(rows=source, sign=1) for source, select in _sources(rollup))
+    aliases = [f"c{i}" for i in range(len(_columns(rollup)))]
+    keys = aliases[:len(spec["keys"])]
+    sums = ", ".join(f"SUM({alias})" for alias in aliases[len(keys):])
+    return (f"SELECT {', '.join(keys)}, {sums} FROM ({selects}) AS source ({', '.join(aliases)}) "
+            f"GROUP BY {', '.join(keys)}")
+
+def refresh_sql(rollup):
+    spec = ROLLUPS[rollup]
+    keys, measures = list(spec["keys"]), list(spec["measures"])
+    updates = ", ".join(f"{m} = r.{m} + excluded.{m}" for m in measures)
+    return f"""
+        WITH batch AS (DELETE FROM {rollup}_delta RETURNING *),
+        upserted AS (
+            INSERT INTO {rollup} AS r
+            SELECT {', '.join(keys)}, {', '.join(f'SUM({m})' for m in measures)} FROM batch GROUP BY {', '.join(keys)}
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}
+            RETURNING 1
+        )
+        SELECT (SELECT COUNT(*) FROM batch), (SELECT COUNT(*) FROM upserted)
+    """
+
+def install(cursor, conn):
+    for statement in install_ddl():
+        cursor.execute(statement)
+    conn.commit()
+
+def drop(cursor, conn):
+    for statement in drop_ddl():
+        cursor.execute(statement)
+    conn.commit()
+
+def installed(cursor, conn):
+    cursor.execute("SELECT to_regclass(%s)", (next(iter(ROLLUPS)),))
+    found = cursor.fetchone()[0] is not None
+    conn.commit()
+    return found
+
+def rebuild(cursor, conn):
+    """Recompute every rollup from the raw tables; writers wait until it is done. Returns seconds."""
+    start = time.perf_counter()
+    # SHARE blocks writes, so no delta is captured after the snapshot the rollups are computed from
+    cursor.execute(f"LOCK TABLE {', '.join(CAPTURE)} IN SHARE MODE;")
+    for rollup in ROLLUPS:
+        cursor.execute(f"TRUNCATE {rollup}, {rollup}_delta;")
+        cursor.execute(f"INSERT INTO {rollup} {recompute_sql(rollup)};")
+    conn.commit()
+    cursor.execute(f"ANALYZE {', '.join(ROLLUPS)};")
+    conn.commit()
+    return time.perf_counter() - start
+
+def refresh(cursor, conn):
+    """Apply the pending deltas: {rollup: (delta rows applied, rollup rows changed)}.
+
+    Deltas are consumed with DELETE ... RETURNING, so each is applied once even with concurrent refreshes."""
+    applied = {}
+    for rollup in ROLLUPS:
+        cursor.execute(refresh_sql(rollup))
+        applied[rollup] = cursor.fetchone()
+    conn.commit()
+    return applied
+
+def check(cursor, conn):
+    """Rows differing from a recomputation, per rollup (pending deltas count as differences)"""
+    differences = {}
+    for rollup in ROLLUPS:
+        columns = ", ".join(_columns(rollup))
+        nonzero = " OR ".join(f"{m} <> 0" for m in ROLLUPS[rollup]["measures"])
+        stored = f"SELECT {columns} FROM {rollup} WHERE {nonzero}"
+        fresh = recompute_sql(rollup)
+        cursor.execute(f"SELECT COUNT(*) FROM (({stored} EXCEPT {fresh}) UNION ALL ({fresh} EXCEPT {stored})) diff")
+        differences[rollup] = cursor.fetchone()[0]
+    conn.commit()
+    return differences
+
+def print_sizes(cursor, conn):
+    for rollup in ROLLUPS:
+        cursor.execute(f"SELECT COUNT(*), pg_total_relation_size('{rollup}'), (SELECT COUNT(*) FROM {rollup}_delta) "
+                       f"FROM {rollup}")
+        rows, size, pending = cursor.fetchone()
+        print(f"   {rollup:<26}{rows:>10,} rows{size / 1024 ** 2:>9.1f}MB{pending:>10,} pending")
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description='Incrementally refreshed rollups of the dashboard aggregates')
+    parser.add_argument('command', choices=['install', 'refresh', 'rebuild', 'check', 'drop'],
+                        help='install (tables, triggers, first build), refresh (apply pending changes), '
+                             'rebuild (from scratch), check (against the raw tables) or drop')
+    parser.add_argument('--watch', type=float, metavar='SECONDS',
+                        help='With refresh: keep refreshing every SECONDS until interrupted')
+    args = parser.parse_args()
+
+    conn = benchmark.connect()
+    cursor = conn.cursor()
+    try:
+        if args.command == 'install':
+            install(cursor, conn)
+            print(f"✅ Rollups installed and built in {rebuild(cursor, conn):.1f}s")
+            print_sizes(cursor, conn)
+        elif args.command == 'drop':
+            drop(cursor, conn)
+            print("✅ Rollups, their triggers and pending changes dropped")
+        elif not installed(cursor, conn):
+            print("❌ The rollups are not installed")
+            print("💡 Run: python rollups.py install")
+        elif args.command == 'rebuild':
+            print(f"✅ Rollups rebuilt in {rebuild(cursor, conn):.1f}s")
+            print_sizes(cursor, conn)
+        elif args.command == 'check':
+            differences = check(cursor, conn)
+            for rollup, count in differences.items():
+                print(f"   {rollup:<26}{'✅' if not count else f'❌ {count:,} row(s) differ'}")
+            if any(differences.values()):
+                print("💡 Pending changes count as differences: refresh first, or rebuild")
+        else:
+            while True:
+                start = time.perf_counter()
+                applied = refresh(cursor, conn)
+                changes = sum(rows for rows, _ in applied.values())
+                print(f"✅ Refreshed in {(time.perf_counter() - start) * 1000:.1f}ms, {changes:,} change(s) applied")
+                if not args.watch:
+                    break
+                time.sleep(args.watch)
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted")
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import time
+
+# Server statistics around each measurement: what the cumulative statistics views counted in between.
+
+FLUSH_WAIT = 1.1  # seconds, PGSTAT_MIN_INTERVAL of other backends plus margin
+LEGACY_FLUSH_WAIT = 0.6  # before PostgreSQL 15 the statistics collector lagged by up to 500ms
+
+TABLE_STATS = """
+    SELECT t.relname, t.seq_scan, t.seq_tup_read, COALESCE(t.idx_scan, 0), COALESCE(t.idx_tup_fetch, 0),
+           io.heap_blks_hit, io.heap_blks_read, COALESCE(io.idx_blks_hit, 0), COALESCE(io.idx_blks_read, 0)
+    FROM pg_stat_user_tables t JOIN pg_statio_user_tables io USING (relid)
+"""
+TABLE_COLUMNS = ["seq_scan", "seq_tup_read", "idx_scan", "idx_tup_fetch",
+                 "heap_blks_hit", "heap_blks_read", "idx_blks_hit", "idx_blks_read"]
+
+INDEX_STATS = """
+    SELECT i.indexrelname, i.idx_scan, i.idx_tup_read, i.idx_tup_fetch, io.idx_blks_hit, io.idx_blks_read
+    FROM pg_stat_user_indexes i JOIN pg_statio_user_indexes io USING (indexrelid)
+"""
+INDEX_COLUMNS = ["idx_scan", "idx_tup_read", "idx_tup_fetch", "idx_blks_hit", "idx_blks_read"]
+
+DATABASE_STATS = """
+    SELECT temp_files, temp_bytes, blks_hit, blks_read FROM pg_stat_database WHERE datname = current_database()
+"""
+DATABASE_COLUMNS = ["temp_files", "temp_bytes", "blks_hit", "blks_read"]
+
+STATEMENT_STATS = """
+    SELECT queryid, query, calls, total_exec_time, rows, shared_blks_hit, shared_blks_read,
+           temp_blks_read, temp_blks_written
+    FROM pg_stat_statements WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+STATEMENT_COLUMNS = ["calls", "total_exec_ms", "rows", "shared_blks_hit", "shared_blks_read",
+                     "temp_blks_read", "temp_blks_written"]
+
+def statements_available(cursor, conn):
+    """Whether pg_stat_statements can be read, printing how to enable it when not"""
+    try:
+        cursor.execute("SELECT 1 FROM pg_stat_statements LIMIT 1")
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        print(f"💡 pg_stat_statements is not available ({str(e).strip().splitlines()[0]}); add it to "
+              f"shared_preload_libraries and CREATE EXTENSION pg_stat_statements for per-statement totals")
+        return False
+
+def _flush(cursor, conn, wait):
+    """Get this backend's pending counters published, and the others' if wait is given"""
+    if conn.server_version >= 150000:
+        cursor.execute("SELECT pg_stat_force_next_flush()")
+        conn.commit()  # the flush happens as the backend goes idle, before the commit returns
+    else:
+        wait = max(wait, LEGACY_FLUSH_WAIT)
+    if wait:
+        time.sleep(wait)
+
+def snapshot(cursor, conn, statements=False, wait=0):
+    """Current values of the cumulative counters"""
+    _flush(cursor, conn, wait)
+    cursor.execute("SELECT pg_stat_clear_snapshot()")  # don't reuse values cached earlier in the transaction
+    cursor.execute(TABLE_STATS)
+    tables = {row[0]: dict(zip(TABLE_COLUMNS, row[1:])) for row in cursor.fetchall()}
+    cursor.execute(INDEX_STATS)
+    indexes = {row[0]: dict(zip(INDEX_COLUMNS, row[1:])) for row in cursor.fetchall()}
+    cursor.execute(DATABASE_STATS)
+    database = dict(zip(DATABASE_COLUMNS, cursor.fetchone()))
+    queries = None
+    if statements:
+        cursor.execute(STATEMENT_STATS)
+        queries = {row[0]: {"query": row[1], **dict(zip(STATEMENT_COLUMNS, row[2:]))} for row in cursor.fetchall()}
+    conn.commit()
+    return {"tables": tables, "indexes": indexes, "database": database, "statements": queries}
+
+def _changes(before, after, columns):
+    """Counter increases of every relation that changed; relations created in between start at 0"""
+    changes = {}
+    for name, values in after.items():
+        previous = before.get(name, {})
+        delta = {column: values[column] - previous.get(column, 0) for column in columns}
+        if any(delta.values()):
+            changes[name] = delta
+    return changes
+
+def delta(before, after):
+    """What happened on the server between two snapshots"""
+    result = {
+        "tables": _changes(before["tables"], after["tables"], TABLE_COLUMNS),
+        "indexes": _changes(before["indexes"], after["indexes"], INDEX_COLUMNS),
+        "database": {column: after["database"][column] - before["database"][column] for column in DATABASE_COLUMNS},
+        "statement": None,
+    }
+    if after["statements"] is not None:
+        statements = _changes(before["statements"], after["statements"], STATEMENT_COLUMNS)
+        if statements:
+            queryid = max(statements, key=lambda q: statements[q]["total_exec_ms"])
+            result["statement"] = {"queryid": queryid, "query": after["statements"][queryid]["query"],
+                                   **statements[queryid]}
+    return result
+
+def totals(changes):
+    """Scan, tuple and block counts summed over the tables"""
+    return {column: sum(table[column] for table in changes["tables"].values()) for column in TABLE_COLUMNS}
+
+def format_summary(changes):
+    total = totals(changes)
+    line = (f"server stats: seq scans {total['seq_scan']:,} ({total['seq_tup_read']:,} tuples), "
+            f"index scans {total['idx_scan']:,} ({total['idx_tup_fetch']:,} tuples), "
+            f"heap blocks hit {total['heap_blks_hit']:,} read {total['heap_blks_read']:,}, "
+            f"index blocks hit {total['idx_blks_hit']:,} read {total['idx_blks_read']:,}")
+    if changes["database"]["temp_files"]:
+        line += f", temp files {changes['database']['temp_files']:,} ({changes['database']['temp_bytes']:,} bytes)"
+    return line
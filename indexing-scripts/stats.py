@@ -0,0 +1,76 @@
+import math
+
+# Summary statistics for benchmark timings, dependency-free.
+
+# Two-sided 95% t critical values by degrees of freedom; beyond the table the normal value is close
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+        10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110,
+        18: 2.101, 19: 2.093, 20: 2.086, 25: 2.060, 30: 2.042, 40: 2.021, 60: 2.000, 120: 1.980}
+Z_95 = 1.960
+
+def t_critical(df):
+    """95% two-sided t value, taking the next smaller tabulated df (slightly conservative)"""
+    if df > 120:
+        return Z_95
+    return T_95[max(d for d in T_95 if d <= df)]
+
+def percentile(ordered, p):
+    """p-th percentile (0..100) of an already sorted list, interpolated like numpy's default"""
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * p / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(values):
+    """n, mean, stddev, min/max, p50/p95/p99 and the 95% confidence interval of the mean"""
+    ordered = sorted(values)
+    n = len(ordered)
+    mean = sum(ordered) / n
+    stddev = math.sqrt(sum((v - mean) ** 2 for v in ordered) / (n - 1)) if n > 1 else 0.0
+    margin = t_critical(n - 1) * stddev / math.sqrt(n) if n > 1 else 0.0
+    return {
+        "n": n,
+        "mean": mean,
+        "stddev": stddev,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "ci95_low": mean - margin,
+        "ci95_high": mean + margin,
+    }
+
+def _ranks(values):
+    """1-based ranks, ties sharing their average rank, and the tie correction term sum(t^3 - t)"""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = 0
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        size = end - start + 1
+        ties += size ** 3 - size
+        start = end + 1
+    return ranks, ties
+
+def mann_whitney(a, b):
+    """Two-sided Mann-Whitney U test of a against b: (U of a, p-value).
+
+    Normal approximation with tie and continuity correction, fine from about 8 values per side."""
+    n1, n2 = len(a), len(b)
+    n = n1 + n2
+    ranks, ties = _ranks(list(a) + list(b))
+    u = sum(ranks[:n1]) - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0  # all values equal
+    z = max(abs(u - mean) - 0.5, 0) / math.sqrt(variance)
+    return u, math.erfc(z / math.sqrt(2))
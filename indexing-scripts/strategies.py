@@ -0,0 +1,268 @@
+import os
+import re
+import time
+import argparse
+
+import benchmark
+import keys
+import plans
+import stats
+import server_stats
+import simple
+import complex as complex_suite
+
+# Index access-method comparison, to fill in the `using ???` placeholders of DDL_UPDATED.sql.
+
+SUITES = {"simple": simple.TESTS, "complex": complex_suite.TESTS}
+TIE = 0.10
+USAGE_KEYS = 20  # distinct keys the planner must use a variant for
+USAGE_DRAWS = 200  # draws to find them in
+DDL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'schema', 'DDL_UPDATED.sql')
+TABLE_ACCESS_METHOD = "heap"
+
+# Variants tried on top of a plain btree. Hash indexes only exist for single columns and only
+# serve equality; BRIN only pays off when the column follows the physical row order.
+VARIANTS = {
+    "idx_theaters_cinema": [{"name": "hash", "method": "hash"}],
+    "idx_customers_email": [{"name": "hash", "method": "hash"}],
+    "idx_customers_phone": [{"name": "hash", "method": "hash"}],
+    "idx_bookings_customer": [{"name": "hash", "method": "hash"}],
+    "idx_bookings_screening": [{"name": "hash", "method": "hash"}],
+    "idx_bookings_date": [
+        {"name": "brin", "method": "brin"},
+        {"name": "covering", "method": "btree", "include": "(customer_id, screening_id)"},
+    ],
+    "idx_tickets_booking": [{"name": "hash", "method": "hash"}],
+    "idx_tickets_seat": [{"name": "hash", "method": "hash"}],
+    "idx_payments_booking": [{"name": "hash", "method": "hash"}],
+    "idx_payments_status": [
+        {"name": "partial", "method": "btree", "where": "status = 'pending'"},
+        {"name": "covering", "method": "btree", "include": "(booking_id, amount)"},
+    ],
+}
+
+CORRELATION = """
+    SELECT correlation FROM pg_stats
+    WHERE schemaname = current_schema() AND tablename = %s AND attname = %s
+"""
+
+def variants(index_name):
+    return [{"name": "btree", "method": "btree"}] + VARIANTS.get(index_name, [])
+
+def index_clause(variant, columns):
+    """`using <method> (<columns>) [include (...)] [where ...]`, as written in the DDL"""
+    clause = f"using {variant['method']} {columns}"
+    if variant.get("include"):
+        clause += f" include {variant['include']}"
+    if variant.get("where"):
+        clause += f" where {variant['where']}"
+    return clause
+
+def _size(value):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if value < 1024:
+            return f"{value:,.1f}{unit}"
+        value /= 1024
+    return f"{value:,.1f}TB"
+
+def _scalar(cursor, conn, sql, params=None):
+    cursor.execute(sql, params)
+    row = cursor.fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+def usage_keys(next_params):
+    """Up to USAGE_KEYS distinct parameter sets of the sampler's draws"""
+    next_params.restart()
+    distinct = {}
+    for _ in range(USAGE_DRAWS):
+        params = next_params()
+        distinct.setdefault(tuple(sorted(params.items())), params)
+        if len(distinct) == USAGE_KEYS:
+            break
+    next_params.restart()
+    return list(distinct.values())
+
+def keys_using(cursor, conn, query, index_name, usage):
+    """How many of the usage keys the query is planned through the index for"""
+    return sum(index_name in plans.indexes_used(plans.plan(cursor, conn, query, params)) for params in usage)
+
+def measure_variant(cursor, conn, test, definition, variant, next_params, usage, args, statements=False):
+    """Build one variant (None: no index), check which usage keys it serves and time the query against it"""
+    index_name = test["index"]
+    cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+    conn.commit()
+    variant = variant or {"name": "none", "method": None}
+    result = {"variant": variant["name"], "method": variant["method"], "include": variant.get("include"),
+              "where": variant.get("where"), "build_s": None, "size_bytes": None}
+    if variant["method"]:
+        result["create"] = (f"CREATE INDEX {index_name} ON {definition['table']} "
+                            f"{index_clause(variant, definition['columns'])};")
+        try:
+            start = time.perf_counter()
+            cursor.execute(result["create"])
+            conn.commit()
+            result["build_s"] = time.perf_counter() - start
+        except Exception as e:
+            print(f"Failed to create index: {e}")
+            conn.rollback()
+            return None
+        result["size_bytes"] = _scalar(cursor, conn, "SELECT pg_relation_size(%s::regclass)", (index_name,))
+
+    next_params.restart()
+    before = server_stats.snapshot(cursor, conn, statements) if args.server_stats else None
+    measured = benchmark.measure(cursor, conn, test["query"], next_params, args.warmup, args.iterations,
+                                 args.time_budget, args.itersize)
+    if not measured:
+        return None
+    result["server_stats"] = server_stats.delta(before, server_stats.snapshot(cursor, conn, statements)) if before else None
+    result.update(measured)
+    result["stats_ms"] = stats.summarize(result["timings_ms"])
+    result["index_used"] = None
+    if variant["method"]:
+        try:
+            result["keys_using_index"] = keys_using(cursor, conn, test["query"], index_name, usage)
+            result["keys_checked"] = len(usage)
+            result["index_used"] = result["keys_using_index"] == len(usage)
+        except Exception as e:
+            print(f"Failed to plan the query: {e}")
+            conn.rollback()
+    if args.explain:
+        try:
+            result["plan_summary"] = plans.summarize(plans.explain(cursor, conn, test["query"], next_params()))
+        except Exception as e:
+            print(f"Failed to capture the plan: {e}")
+            conn.rollback()
+    return result
+
+def recommend(results):
+    """The variant to put in the DDL, or None when the planner used none of them for every key.
+
+    Variants within TIE of the fastest are equal, the smallest of them wins."""
+    candidates = [r for r in results if r["variant"] != "none" and r["index_used"]]
+    if not candidates:
+        return None
+    fastest = min(r["stats_ms"]["p50"] for r in candidates)
+    tied = [r for r in candidates if r["stats_ms"]["p50"] <= fastest * (1 + TIE)]
+    return min(tied, key=lambda r: r["size_bytes"])
+
+def print_results(results, chosen):
+    print(f"   {'variant':<12}{'build':>9}{'size':>12}{'p50':>12}{'p95':>12}{'used':>8}")
+    for r in results:
+        build = f"{r['build_s']:.2f}s" if r["build_s"] is not None else "-"
+        size = _size(r["size_bytes"]) if r["size_bytes"] is not None else "-"
+        used = f"{r['keys_using_index']}/{r['keys_checked']}" if r["index_used"] is not None else "-"
+        mark = "  ⭐" if r is chosen else ""
+        print(f"   {r['variant']:<12}{build:>9}{size:>12}{r['stats_ms']['p50']:>10.2f}ms"
+              f"{r['stats_ms']['p95']:>10.2f}ms{used:>8}{mark}")
+
+def write_ddl(choices, path):
+    """Copy of DDL_UPDATED.sql with the `using ???` placeholders resolved"""
+    with open(DDL_PATH) as f:
+        ddl = f.read()
+
+    def index(match):
+        name, columns = match.group(2), match.group(4)
+        if name not in choices:
+            return match.group(0)  # not measured, left open
+        clause = index_clause(choices[name], columns) if choices[name] else f"using btree {columns}"
+        note = "" if choices[name] else f"-- {name}: its query never used it, consider dropping it\n"
+        return f"{note}{match.group(1)}{clause};"
+
+    ddl = re.sub(r"(create index if not exists (\w+)\s+on (\w+) )using \?\?\? (\([^)]*\));", index, ddl)
+    ddl = re.sub(r"\)(\s+)using \?\?\?;", rf")\1using {TABLE_ACCESS_METHOD};", ddl)
+    with open(path, 'w') as f:
+        f.write(ddl)
+    return ddl.count("???")
+
+def main():
+    parser = argparse.ArgumentParser(description='Index access-method comparison')
+    benchmark.add_arguments(parser, throughput_mode=False)
+    parser.add_argument('--suite', choices=SUITES, default='complex',
+                        help='Query set the variants are timed with (default: complex)')
+    parser.add_argument('--ddl-output', default=os.path.join(benchmark.RESULTS_DIR, 'DDL_recommended.sql'),
+                        help='Where the DDL with the recommended access methods is written '
+                             '(default: results/DDL_recommended.sql)')
+    args = parser.parse_args()
+
+    tests = [test for test in SUITES[args.suite] if not args.only or test["index"] in args.only]
+    output = args.output or os.path.join(benchmark.RESULTS_DIR, "results_strategies.jsonl")
+    config = {"warmup": args.warmup, "iterations": args.iterations, "time_budget_s": args.time_budget,
+              "explain": args.explain, "keys": args.keys, "key_sample": args.key_sample,
+              "query_suite": args.suite, "tie": TIE, "server_stats": args.server_stats, "itersize": args.itersize}
+    conn = benchmark.connect()
+    cursor = conn.cursor()
+    records = [benchmark.run_record(conn, "strategies", config)]
+    run_id = records[0]["run_id"]
+    print(f"📍 Run {run_id}: {len(tests)} index(es), {args.suite} queries, {args.keys} keys")
+    statements = args.server_stats and server_stats.statements_available(cursor, conn)
+
+    choices = {}
+    try:
+        for test in tests:
+            index_name = test["index"]
+            definition = simple.index_definitions[index_name]
+            print(f"\nTesting {index_name} on {definition['table']} {definition['columns']}...")
+            try:
+                next_params = keys.sampler(cursor, conn, index_name, args.keys, args.key_sample)
+            except Exception as e:
+                print(f"Failed to sample keys: {e}")
+                conn.rollback()
+                continue
+            if next_params is None:
+                continue
+            if any(v["method"] == "brin" for v in variants(index_name)):
+                column = definition["columns"].strip("()").split(",")[0].strip()
+                correlation = _scalar(cursor, conn, CORRELATION, (definition["table"], column))
+                if correlation is not None:
+                    print(f"   {definition['table']}.{column} physical order correlation: {correlation:+.2f} "
+                          f"(BRIN needs close to ±1)")
+
+            usage = usage_keys(next_params)
+            results = []
+            for variant in [None] + variants(index_name):
+                result = measure_variant(cursor, conn, test, definition, variant, next_params, usage, args,
+                                         statements)
+                if result:
+                    results.append(result)
+            if not results:
+                continue
+            chosen = recommend(results)
+            choices[index_name] = chosen
+            print_results(results, chosen)
+            if chosen is None:
+                print(f"   ⚠️  No variant of {index_name} was used by its query for all {len(usage)} key(s)")
+            records += [{
+                "type": "strategy",
+                "run_id": run_id,
+                "suite": "strategies",
+                "index_name": index_name,
+                "query": test["query"],
+                "keys": args.keys,
+                "recommended": r is chosen,
+                **r,
+            } for r in results]
+
+            # Leave the plain btree the other benchmarks expect
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+            cursor.execute(f"CREATE INDEX {index_name} ON {definition['table']} {definition['columns']};")
+            conn.commit()
+    finally:
+        benchmark.write_records(output, records)
+        cursor.close()
+        conn.close()
+
+    if choices:
+        unresolved = write_ddl(choices, args.ddl_output)
+        print("\n📝 Recommended indexes:")
+        for index_name, chosen in choices.items():
+            definition = simple.index_definitions[index_name]
+            clause = index_clause(chosen, definition["columns"]) if chosen else "(unused, consider dropping)"
+            print(f"   {index_name} on {definition['table']} {clause}")
+        print(f"\n💾 Recommended DDL written to {args.ddl_output}")
+        if unresolved:
+            print(f"💡 {unresolved} index placeholder(s) were not measured and still read `using ???`")
+    print(f"Results have been written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import time
+import argparse
+import threading
+
+import stats
+import server_stats
+
+# Multi-client load mode for the benchmarks (--concurrency), one pooled connection per client thread.
+
+# A level whose throughput is less than 10% above the previous one is past the saturation point
+SATURATION_GAIN = 0.10
+
+def parse_levels(text):
+    """argparse type for --concurrency: comma-separated client counts, e.g. 1,2,4,8"""
+    try:
+        levels = sorted({int(level) for level in text.split(',')})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated client counts, got {text!r}")
+    if levels[0] < 1:
+        raise argparse.ArgumentTypeError("client counts must be at least 1")
+    return levels
+
+def _client(pool, query, next_params, warmup, barrier, window, latencies, errors):
+    conn = None
+    try:
+        conn = pool.getconn()
+        with conn.cursor() as cursor:
+            for _ in range(warmup):
+                cursor.execute(query, next_params())
+                cursor.fetchall()
+                conn.commit()
+            barrier.wait()
+            while True:
+                params = next_params()
+                start = time.perf_counter()
+                if start >= window["end"]:
+                    break
+                cursor.execute(query, params)
+                cursor.fetchall()
+                conn.commit()
+                end = time.perf_counter()
+                # Queries that finish after the window closed are not counted
+                if end <= window["end"]:
+                    latencies.append((end - start) * 1000)
+    except Exception as e:
+        barrier.abort()  # don't leave the other clients waiting for this one
+        if not isinstance(e, threading.BrokenBarrierError):
+            errors.append(str(e).strip() or type(e).__name__)
+        if conn is not None and not conn.closed:
+            conn.rollback()
+    finally:
+        if conn is not None:
+            pool.putconn(conn)
+
+def run_level(pool, query, next_params, clients, warmup, duration):
+    """Run query from clients threads for duration seconds, returns throughput and latency stats"""
+    window = {}
+
+    def open_window():
+        window["start"] = time.perf_counter()
+        window["end"] = window["start"] + duration
+
+    barrier = threading.Barrier(clients, action=open_window)
+    latencies = [[] for _ in range(clients)]
+    errors = []
+    threads = [threading.Thread(target=_client, args=(pool, query, next_params, warmup, barrier, window, latencies[i], errors))
+               for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    timings = [latency for client in latencies for latency in client]
+    return {
+        "clients": clients,
+        "duration_s": duration,
+        "queries": len(timings),
+        "errors": errors[:5],  # a sample, they are usually all the same
+        "error_count": len(errors),
+        "qps": len(timings) / duration,
+        "stats_ms": stats.summarize(timings) if timings else None,
+    }
+
+def ramp(pool, query, next_params, levels, warmup, duration, snapshot=None):
+    """Run every concurrency level in turn, printing one line per level; returns the level results.
+
+    snapshot, if given, returns server statistics; their delta over each level is stored in its result."""
+    results = []
+    for clients in levels:
+        before = snapshot() if snapshot else None
+        result = run_level(pool, query, next_params, clients, warmup, duration)
+        result["server_stats"] = server_stats.delta(before, snapshot()) if snapshot else None
+        if result["stats_ms"]:
+            summary = result["stats_ms"]
+            line = (f"{result['qps']:>10,.1f} qps  p50 {summary['p50']:.2f}ms  p95 {summary['p95']:.2f}ms  "
+                    f"p99 {summary['p99']:.2f}ms")
+        else:
+            line = "no query completed within the window"
+        if result["error_count"]:
+            line += f"  ❌ {result['error_count']} client(s) failed: {result['errors'][0]}"
+        print(f"   {clients:>4} client(s): {line}")
+        results.append(result)
+    return results
+
+def saturation(results):
+    """Client count after which adding clients stops raising throughput (None if it never flattens)"""
+    for previous, current in zip(results, results[1:]):
+        if current["qps"] < previous["qps"] * (1 + SATURATION_GAIN):
+            return previous["clients"]
+    return None
@@ -0,0 +1,207 @@
+import os
+import time
+import random
+import argparse
+
+from psycopg2.extras import execute_values
+
+import benchmark
+import simple
+
+# Index write-cost benchmark: insert rate, WAL and index growth of the high-volume tables
+# with no secondary index, each index alone and all of them.
+
+WRITE_TABLES = ["bookings", "tickets", "payments"]
+WRITE_INDEXES = [name for name, info in simple.index_definitions.items() if info["table"] in WRITE_TABLES]
+
+DEFAULT_BATCHES = 50
+DEFAULT_BATCH_SIZE = 500  # bookings per batch, each with its tickets and payment
+DEFAULT_WARMUP = 2  # untimed batches per configuration
+TICKETS_PER_BOOKING = 2
+SEED = 42
+
+PAYMENT_METHODS = ["cash", "card", "digital_wallet", "bank_transfer"]
+
+def configurations(only=None):
+    """(name, indexes) pairs: none, every index alone, all"""
+    singles = [name for name in WRITE_INDEXES if not only or name in only]
+    return [("none", [])] + [(name, [name]) for name in singles] + [("all", WRITE_INDEXES)]
+
+def _scalar(cursor, conn, sql, params=None):
+    cursor.execute(sql, params)
+    value = cursor.fetchone()[0]
+    conn.commit()
+    return value
+
+def _size(value):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(value) < 1024:
+            return f"{value:,.1f}{unit}"
+        value /= 1024
+    return f"{value:,.1f}TB"
+
+def set_indexes(cursor, conn, indexes):
+    """Drop every write-table index, then build the given ones as plain btrees"""
+    for name in WRITE_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {name};")
+    for name in indexes:
+        info = simple.index_definitions[name]
+        cursor.execute(f"CREATE INDEX {name} ON {info['table']} {info['columns']};")
+    conn.commit()
+
+def index_sizes(cursor, conn, indexes):
+    sizes = {}
+    for name in indexes:
+        sizes[name] = _scalar(cursor, conn, "SELECT pg_relation_size(%s::regclass)", (name,))
+    return sizes
+
+def sync_sequences(cursor, conn):
+    """Move the id sequences of the write tables past their largest id, never back: rows COPYed with
+    explicit ids leave the sequences behind, and the inserts would collide with the loaded ids"""
+    for table in WRITE_TABLES:
+        sequence = _scalar(cursor, conn, "SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+        cursor.execute(f"SELECT setval(%s, GREATEST(COALESCE(MAX(id), 0), "
+                       f"COALESCE(pg_sequence_last_value(%s), 0), 1)) FROM {table}", (sequence, sequence))
+    conn.commit()
+
+def insert_batch(cursor, conn, rng, size, key_ranges):
+    """One box-office transaction of size bookings, their tickets and payments; returns rows inserted"""
+    bookings = [(rng.randint(1, key_ranges["customers"]), rng.randint(1, key_ranges["screenings"]), 'confirmed',
+                 rng.randint(1, key_ranges["staff"]) if key_ranges["staff"] else None)
+                for _ in range(size)]
+    booking_ids = [row[0] for row in execute_values(
+        cursor, "INSERT INTO bookings (customer_id, screening_id, status, created_by_staff_id) VALUES %s RETURNING id",
+        bookings, page_size=size, fetch=True)]
+    tickets = [(booking_id, rng.randint(1, key_ranges["seats"]))
+               for booking_id in booking_ids for _ in range(TICKETS_PER_BOOKING)]
+    execute_values(cursor, "INSERT INTO tickets (booking_id, seat_id) VALUES %s", tickets, page_size=len(tickets))
+    payments = [(booking_id, TICKETS_PER_BOOKING * rng.choice([8.5, 10.0, 12.5]), rng.choice(PAYMENT_METHODS),
+                 'completed') for booking_id in booking_ids]
+    execute_values(cursor, "INSERT INTO payments (booking_id, amount, method, status) VALUES %s", payments,
+                   page_size=size)
+    conn.commit()
+    return len(bookings) + len(tickets) + len(payments)
+
+def remove_inserted(cursor, conn, last_ids):
+    """Delete the benchmark rows and VACUUM, which also gives the emptied tail pages back"""
+    # Deleting bookings checks tickets and payments per row, a sequential scan each without these
+    for name in ["idx_tickets_booking", "idx_payments_booking"]:
+        info = simple.index_definitions[name]
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {info['table']} {info['columns']};")
+    for table in ["payments", "tickets", "bookings"]:
+        cursor.execute(f"DELETE FROM {table} WHERE id > %s", (last_ids[table],))
+    conn.commit()
+    conn.autocommit = True
+    try:
+        for table in WRITE_TABLES:
+            cursor.execute(f"VACUUM {table}")
+    finally:
+        conn.autocommit = False
+
+def checkpoint(cursor, conn):
+    """Start every window with the same full-page images to log"""
+    try:
+        cursor.execute("CHECKPOINT")
+        conn.commit()
+    except Exception as e:
+        # Needs superuser (or pg_checkpoint on PostgreSQL 15+)
+        conn.rollback()
+        if not getattr(checkpoint, "warned", False):
+            print(f"⚠️  CHECKPOINT failed, WAL sizes include uneven full-page writes: {str(e).strip()}")
+            checkpoint.warned = True
+
+def run_configuration(cursor, conn, name, indexes, args, key_ranges):
+    set_indexes(cursor, conn, indexes)
+    last_ids = {table: _scalar(cursor, conn, f"SELECT COALESCE(MAX(id), 0) FROM {table}") for table in WRITE_TABLES}
+    rng = random.Random(SEED)  # every configuration inserts the same rows
+    try:
+        for _ in range(args.warmup):
+            insert_batch(cursor, conn, rng, args.batch_size, key_ranges)
+        sizes_before = index_sizes(cursor, conn, indexes)
+        checkpoint(cursor, conn)
+        wal_before = _scalar(cursor, conn, "SELECT pg_current_wal_insert_lsn()")
+        rows = 0
+        start = time.perf_counter()
+        for _ in range(args.batches):
+            rows += insert_batch(cursor, conn, rng, args.batch_size, key_ranges)
+        seconds = time.perf_counter() - start
+        wal_bytes = int(_scalar(cursor, conn, "SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s)", (wal_before,)))
+        sizes_after = index_sizes(cursor, conn, indexes)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        remove_inserted(cursor, conn, last_ids)
+    return {
+        "configuration": name,
+        "indexes": indexes,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_s": rows / seconds,
+        "wal_bytes": wal_bytes,
+        "wal_bytes_per_row": wal_bytes / rows,
+        "index_growth_bytes": {index: sizes_after[index] - sizes_before[index] for index in indexes},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Index write-cost benchmark')
+    parser.add_argument('--batches', type=int, default=DEFAULT_BATCHES,
+                        help=f'Timed insert transactions per configuration (default: {DEFAULT_BATCHES})')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Bookings per transaction, each with {TICKETS_PER_BOOKING} tickets and a payment '
+                             f'(default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'Untimed batches per configuration (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--only', nargs='+', metavar='INDEX', choices=WRITE_INDEXES,
+                        help='Only test these indexes alone (none and all are always run)')
+    parser.add_argument('--output',
+                        help='JSON Lines file the results are appended to (default: results/results_write_cost.jsonl)')
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(benchmark.RESULTS_DIR, "results_write_cost.jsonl")
+    config = {"batches": args.batches, "batch_size": args.batch_size, "warmup": args.warmup,
+              "tickets_per_booking": TICKETS_PER_BOOKING}
+    conn = benchmark.connect()
+    cursor = conn.cursor()
+    try:
+        records = [benchmark.run_record(conn, "write_cost", config)]
+        run_id = records[0]["run_id"]
+        key_ranges = {table: _scalar(cursor, conn, f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+                      for table in ["customers", "screenings", "staff", "seats"]}
+        if not key_ranges["screenings"] or not key_ranges["seats"]:
+            print("❌ Load the dataset first: screenings and seats are needed to insert bookings")
+            return
+        sync_sequences(cursor, conn)
+        print(f"📍 Run {run_id}: {args.batches} batch(es) of {args.batch_size} bookings per configuration")
+
+        results = []
+        try:
+            for name, indexes in configurations(args.only):
+                print(f"\nTesting {name}...")
+                result = run_configuration(cursor, conn, name, indexes, args, key_ranges)
+                growth = sum(result["index_growth_bytes"].values())
+                print(f"   {result['rows_per_s']:,.0f} rows/s, WAL {_size(result['wal_bytes'])} "
+                      f"({result['wal_bytes_per_row']:,.0f} B/row), index growth {_size(growth)}")
+                results.append(result)
+                records.append({"type": "write_cost", "run_id": run_id, "suite": "write_cost", **result})
+        finally:
+            # Leave the plain btrees the read benchmarks expect
+            set_indexes(cursor, conn, WRITE_INDEXES)
+            benchmark.write_records(output, records)
+    finally:
+        cursor.close()
+        conn.close()
+
+    baseline = results[0]
+    print(f"\n📊 {'configuration':<26}{'rows/s':>10}{'slowdown':>10}{'WAL/row':>10}{'WAL x':>7}{'index growth':>14}")
+    for result in results:
+        slowdown = baseline["rows_per_s"] / result["rows_per_s"]
+        wal_ratio = result["wal_bytes"] / max(baseline["wal_bytes"], 1)
+        print(f"   {result['configuration']:<26}{result['rows_per_s']:>10,.0f}{slowdown:>9.2f}x"
+              f"{result['wal_bytes_per_row']:>9,.0f}B{wal_ratio:>6.2f}x"
+              f"{_size(sum(result['index_growth_bytes'].values())):>14}")
+    print("\n💡 Weigh the slowdowns against the read speedups in results/results_simple.jsonl and results_complex.jsonl")
+    print(f"Results have been written to {output}")
+
+if __name__ == "__main__":
+    main()
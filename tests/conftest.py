@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules, run from their own directory
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path[:0] = [os.path.join(ROOT, 'data-scripts'), os.path.join(ROOT, 'indexing-scripts')]
@@ -0,0 +1,30 @@
+import gzip
+
+import pandas as pd
+
+import append
+
+def test_last_id_from_tail_reads_the_final_line(tmp_path):
+    path = tmp_path / "bookings.csv"
+    path.write_text("id,note\n1,a\n2,\"x\ny\"\n" + "".join(f"{i},z\n" for i in range(3, 5000)) + "\n")
+    assert append.last_id_from_tail([str(path)]) == 4999
+
+def test_last_id_from_tail_header_only(tmp_path):
+    path = tmp_path / "bookings.csv"
+    path.write_text("id,note\n")
+    assert append.last_id_from_tail([str(path)]) == 0
+
+def test_last_id_across_formats(tmp_path):
+    plain, compressed, parquet = tmp_path / "a.csv", tmp_path / "b.csv.gz", tmp_path / "c.parquet"
+    plain.write_text("id,value\n1,1\n2,2\n")
+    with gzip.open(compressed, "wt") as f:
+        f.write("id,value\n3,3\n7,7\n")
+    pd.DataFrame({"id": [5, 6], "value": [5, 6]}).to_parquet(parquet)
+    assert append.last_id_from_tail([str(plain), str(compressed), str(parquet)]) == 7
+
+def test_seats_per_theater():
+    assert append.seats_per_theater([1, 2, 3, 4, 5, 6], [1, 1, 1, 2, 2, 2], 2) == 3
+    assert append.seats_per_theater([1, 2, 3, 4, 5], [1, 1, 1, 2, 2], 2) is None  # uneven
+    assert append.seats_per_theater([1, 2, 3, 4], [1, 2, 1, 2], 2) is None  # interleaved
+    assert append.seats_per_theater([1, 1, 3, 4], [1, 1, 2, 2], 2) is None  # duplicate ids
+    assert append.seats_per_theater([], [], 2) is None
@@ -0,0 +1,22 @@
+import numpy as np
+
+from distributions import zipf_ids
+
+def test_uniform_at_exponent_zero():
+    ids = zipf_ids(np.random.default_rng(1), 100_000, 10, 0, seed=7, first_id=5)
+    assert ids.min() == 5 and ids.max() == 14
+    counts = np.bincount(ids - 5)
+    assert counts.max() < 1.1 * counts.min()
+
+def test_zipf_stays_in_range_and_skews_to_hot_ids():
+    ids = zipf_ids(np.random.default_rng(1), 100_000, 1000, 1.1, seed=7, first_id=101)
+    assert ids.min() >= 101 and ids.max() <= 1100
+    counts = np.sort(np.bincount(ids - 101, minlength=1000))[::-1]
+    assert counts[:10].sum() > 0.3 * len(ids)  # uniform would give the top 10 ids about 1%
+
+def test_hot_ids_depend_on_the_seed_only():
+    first = zipf_ids(np.random.default_rng(1), 10_000, 1000, 1.1, seed=7)
+    second = zipf_ids(np.random.default_rng(2), 10_000, 1000, 1.1, seed=7)
+    other = zipf_ids(np.random.default_rng(1), 10_000, 1000, 1.1, seed=8)
+    assert np.bincount(first).argmax() == np.bincount(second).argmax()
+    assert np.bincount(first).argmax() != np.bincount(other).argmax()
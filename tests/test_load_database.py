@@ -0,0 +1,32 @@
+from load_database import parse_dependencies, plan_chunks
+
+DDL = """
+create table if not exists cinemas (id serial primary key, name text);
+-- create table old_theaters (id int references cinemas);
+create table theaters
+(
+    id        serial primary key,
+    cinema_id integer references public.cinemas (id),
+    check (id > 0)
+);
+create table seats (id serial, theater_id integer references "theaters", parent integer references seats);
+"""
+
+def test_parse_dependencies(tmp_path):
+    path = tmp_path / "DDL.sql"
+    path.write_text(DDL)
+    assert parse_dependencies(path) == {"cinemas": set(), "theaters": {"cinemas"}, "seats": {"theaters"}}
+
+def test_plan_chunks_split_whole_records(tmp_path):
+    path = tmp_path / "movies.csv"
+    rows = [f'{i},"line one\nline two, {i}"\n' for i in range(1, 500)]
+    path.write_text("id,description\n" + "".join(rows))
+    columns, ranges = plan_chunks(str(path), 100)
+    assert columns == "id,description"
+    assert len(ranges) > 10
+    data = path.read_bytes()
+    assert ranges[0][0] == len(b"id,description\n") and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    for start, end in ranges:
+        chunk = data[start:end]
+        assert chunk.count(b'"') % 2 == 0 and chunk.endswith(b'"\n')
@@ -0,0 +1,48 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import vector_engine
+from occupancy import SeatOccupancy
+
+NOW = datetime(2025, 1, 1)
+
+def test_reserve_never_sells_a_seat_twice():
+    rng = np.random.default_rng(1)
+    seating = SeatOccupancy(3, 100)
+    screenings = rng.permutation(np.repeat([1, 2, 3], 120))
+    seats = np.concatenate([seating.reserve(part, rng) for part in np.array_split(screenings, 4)])
+    for screening in (1, 2, 3):
+        sold = seats[(screenings == screening) & (seats >= 0)]
+        assert len(sold) == 100
+        assert len(np.unique(sold)) == 100
+        assert sold.min() >= 0 and sold.max() < 100
+    assert (seats == -1).sum() == 60
+    assert seating.fill_rate() == 1.0
+
+def test_padding_bits_are_never_reserved():
+    seating = SeatOccupancy(1, 70)
+    seats = seating.reserve(np.ones(80, dtype=np.int64), np.random.default_rng(2))
+    assert sorted(seats[seats >= 0]) == list(range(70))
+
+def test_tickets_stay_in_their_theater_and_match_payments():
+    seats_per_theater, screening_count, booking_count = 8, 50, 3000
+    params = dict(now=NOW, customer_count=100, screening_count=screening_count, staff_count=5)
+    theaters, prices = vector_engine.screening_keys(screening_count, 20, 10, 5, first_day=NOW.date())
+    amounts = np.zeros(booking_count + 1, dtype=np.int64)
+    tickets = pd.concat(vector_engine.ticket_frames(booking_count, 700, **params, screening_theaters=theaters,
+                                                    screening_prices=prices, seats_per_theater=seats_per_theater,
+                                                    tickets_per_booking=2.0, amounts_out=amounts), ignore_index=True)
+    bookings = pd.concat(vector_engine.table_frames("bookings", booking_count, 700, **params), ignore_index=True)
+
+    tickets = tickets.merge(bookings[["id", "screening_id"]], left_on="booking_id", right_on="id")
+    assert ((tickets["seat_id"] - 1) // seats_per_theater + 1 == theaters[tickets["screening_id"]]).all()
+    assert not tickets.duplicated(["screening_id", "seat_id"]).any()
+    # Sold out: more tickets were wanted than the screenings hold
+    assert len(tickets) == screening_count * seats_per_theater
+
+    seated = np.bincount(tickets["booking_id"], minlength=booking_count + 1)
+    screening_of = np.zeros(booking_count + 1, dtype=np.int64)
+    screening_of[bookings["id"]] = bookings["screening_id"]
+    assert (amounts[1:] == seated[1:] * prices[screening_of[1:]]).all()
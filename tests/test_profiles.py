@@ -0,0 +1,24 @@
+import pytest
+
+import profiles
+
+def test_scale_one_is_the_values_file():
+    import values_small
+    assert profiles.load_profile("small")["TICKETS"] == values_small.TICKETS
+    assert profiles.profile_name("small", 1) == "small"
+
+def test_scale_multiplies_totals_and_keeps_rates():
+    base = profiles.load_profile("small")
+    scaled = profiles.load_profile("small", 2)
+    assert scaled["CINEMAS"] == 2 * base["CINEMAS"]
+    assert scaled["CUSTOMERS"] == 2 * base["CUSTOMERS"]
+    assert scaled["TOTAL_SEATS"] == 2 * base["TOTAL_SEATS"]
+    assert scaled["TICKETS"] == 2 * base["TICKETS"]
+    assert scaled["MAXIMUM_TICKETS_PER_CINEMA"] == base["MAXIMUM_TICKETS_PER_CINEMA"]
+    assert scaled["FIXED_SEATS_PER_THEATER"] == base["FIXED_SEATS_PER_THEATER"]
+    assert scaled["OCCUPANCY_RATE"] == pytest.approx(base["OCCUPANCY_RATE"])
+    assert scaled["VALUE_TYPE"] == "small_x2"
+
+def test_profile_name():
+    assert profiles.profile_name("large", 10) == "large_x10"
+    assert profiles.profile_name("small", 0.5) == "small_x0.5"
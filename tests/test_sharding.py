@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pandas as pd
+
+import sharding
+import vector_engine
+
+PARAMS = dict(now=datetime(2025, 1, 1), customer_count=500, screening_count=200, staff_count=20)
+
+def test_shards_match_sequential_output():
+    sequential = pd.concat(vector_engine.table_frames("bookings", 2500, 1000, **PARAMS), ignore_index=True)
+    sharded = pd.concat(sharding.shard_frames("bookings", 2500, 1000, 2, **PARAMS), ignore_index=True)
+    pd.testing.assert_frame_equal(sequential, sharded)
+
+def test_worker_count_does_not_change_output():
+    one = pd.concat(sharding.shard_frames("bookings", 2500, 1000, 1, **PARAMS), ignore_index=True)
+    three = pd.concat(sharding.shard_frames("bookings", 2500, 1000, 3, **PARAMS), ignore_index=True)
+    pd.testing.assert_frame_equal(one, three)
+    assert one["id"].tolist() == list(range(1, 2501))
@@ -0,0 +1,37 @@
+import pytest
+
+import stats
+
+def test_summarize():
+    summary = stats.summarize([4.0, 1.0, 3.0, 2.0, 5.0])
+    assert summary["n"] == 5
+    assert summary["mean"] == 3.0
+    assert summary["min"] == 1.0 and summary["max"] == 5.0
+    assert summary["p50"] == 3.0
+    assert summary["p95"] == pytest.approx(4.8)
+    assert summary["stddev"] == pytest.approx(1.5811, abs=1e-4)
+    # t(4) = 2.776
+    assert summary["ci95_high"] - summary["mean"] == pytest.approx(2.776 * 1.5811 / 5 ** 0.5, abs=1e-3)
+
+def test_summarize_single_value():
+    summary = stats.summarize([7.0])
+    assert summary["stddev"] == 0.0
+    assert summary["p99"] == 7.0
+    assert summary["ci95_low"] == summary["ci95_high"] == 7.0
+
+def test_mann_whitney_separated_samples():
+    u, p = stats.mann_whitney(range(1, 9), range(9, 17))
+    assert u == 0
+    # z = (32 - 0.5) / sqrt(8 * 8 * 17 / 12)
+    assert p == pytest.approx(0.000939, abs=1e-5)
+
+def test_mann_whitney_is_symmetric_with_ties():
+    a, b = [1, 2, 2, 3, 5, 8, 8, 9], [2, 4, 4, 6, 7, 9, 10, 11]
+    u_a, p_a = stats.mann_whitney(a, b)
+    u_b, p_b = stats.mann_whitney(b, a)
+    assert u_a + u_b == len(a) * len(b)
+    assert p_a == pytest.approx(p_b)
+    assert 0.05 < p_a < 1
+
+def test_mann_whitney_identical_values():
+    assert stats.mann_whitney([3.0] * 8, [3.0] * 8) == (32, 1.0)
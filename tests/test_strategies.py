@@ -0,0 +1,17 @@
+import strategies
+
+def test_write_ddl_resolves_the_measured_indexes(tmp_path):
+    path = tmp_path / "DDL_recommended.sql"
+    choices = {"idx_bookings_customer": {"name": "hash", "method": "hash"},
+               "idx_payments_status": {"name": "partial", "method": "btree", "where": "status = 'pending'"},
+               "idx_tickets_seat": None}
+    with open(strategies.DDL_PATH) as f:
+        placeholders = f.read().count("???")
+    unresolved = strategies.write_ddl(choices, path)
+    ddl = path.read_text()
+    assert "on bookings using hash (customer_id);" in ddl
+    assert "using btree (status) where status = 'pending';" in ddl
+    assert "-- idx_tickets_seat: its query never used it" in ddl
+    assert ")\n    using heap;" in ddl
+    assert 0 < unresolved < placeholders
+    assert ddl.count("???") == unresolved